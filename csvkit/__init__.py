@@ -12,9 +12,11 @@ CSV reader and writer. This module is supported for legacy purposes only and you
 should migrate to using agate.
 """
 
-import agate
 
-reader = agate.csv.reader
-writer = agate.csv.writer
-DictReader = agate.csv.DictReader
-DictWriter = agate.csv.DictWriter
+def __getattr__(name):
+    # agate is imported only when these aliases are used, so that importing a csvkit module doesn't import it.
+    if name in ('reader', 'writer', 'DictReader', 'DictWriter'):
+        import agate
+
+        return getattr(agate.csv, name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -1,18 +1,26 @@
 #!/usr/bin/env python
 import argparse
 import ast
-import bz2
+import codecs
 import csv
 import datetime
 import decimal
-import gzip
+import importlib
+import io
 import itertools
-import lzma
+import math
+import mmap
 import os
+import pickle
+import queue
 import re
 import sys
+import tempfile
+import threading
+import time
 import warnings
 from codecs import BOM_UTF8
+from collections import deque
 from glob import glob
 from os.path import splitext
 
@@ -20,16 +28,126 @@ import agate
 from agate.data_types.base import DEFAULT_NULL_VALUES
 
 from csvkit.exceptions import ColumnIdentifierError, RequiredHeaderError
-
-try:
-    import zstandard
-except ImportError:
-    zstandard = None
+from csvkit.inference import SAMPLE_CHOICES, SampleTypeTester, TypeTester
 
 QUOTING_CHOICES = sorted(getattr(csv, name) for name in dir(csv) if name.startswith('QUOTE_'))
+# The number of rows per pickle in a temporary file of rows.
+BLOCK_SIZE = 1024
+# The maximum number of bytes in a range of the input file, to read in parallel.
+CHUNK_SIZE = 1 << 26
+# The minimum number of bytes of an input file to read in parallel. Starting processes and merging their results takes
+# longer than reading a smaller file.
+JOBS_MIN_INPUT_SIZE = 1 << 20
+# The number of bytes of a memory-mapped input file, or of characters of another input file, to read at a time.
+READ_BLOCK_SIZE = 1 << 20
+# The number of blocks of a compressed input file to decompress ahead of reading them.
+READ_AHEAD_BLOCKS = 4
+# The number of characters of CSV output to buffer before writing it to the output file.
+WRITE_BUFFER_SIZE = 1 << 20
+# The number of rows to format at a time, when writing many rows.
+WRITE_BATCH_SIZE = 1024
+# The number of batches of rows to queue between tools in a pipeline.
+PIPE_BLOCKS = 4
+# The number of bytes of a compressed output file to compress at a time.
+WRITE_BLOCK_SIZE = 1 << 20
+# The number of blocks of a compressed output file to queue for compressing.
+WRITE_BEHIND_BLOCKS = 4
+# The modules of compression formats, by file extension. The modules are imported only when used, to start faster.
+COMPRESSION_MODULES = {
+    '.gz': 'gzip',
+    '.bz2': 'bz2',
+    '.xz': 'lzma',
+    '.zst': 'zstandard',
+}
+# The magic numbers of compression formats. A bzip2 magic number is followed by that of a block or of the end of
+# the stream, to not match text.
+COMPRESSION_MAGIC_NUMBERS = [
+    (re.compile(rb'\x1f\x8b'), 'gzip'),
+    (re.compile(rb'BZh[1-9](?:1AY&SY|\x17rE8P\x90)'), 'bz2'),
+    (re.compile(rb'\xfd7zXZ\x00'), 'lzma'),
+    (re.compile(rb'\x28\xb5\x2f\xfd'), 'zstandard'),
+]
+# The number of bytes to read to match a magic number.
+MAGIC_NUMBER_SIZE = 10
+# A line ending, like in a file opened with universal newlines.
+LINE_ENDING = re.compile(rb'\r\n?|\n')
+DIALECT_ATTRIBUTES = ('delimiter', 'doublequote', 'escapechar', 'lineterminator', 'quotechar', 'quoting',
+                      'skipinitialspace')
+
+
+class BlockFile:
+    """
+    A read-only text file, like a File object opened with universal newlines, that is read in large blocks of whole
+    lines. Lines are read from an in-memory text stream of the current block, so that reading a line runs no Python
+    code, and null bytes are removed once per block, instead of once per line.
+
+    Subclasses implement :meth:`_open`, which opens the file and loads the first block, and :meth:`_load`, which loads
+    the block at a position, or the next block if the position is ``None``, and returns whether the file had data.
+    """
+
+    block = None
+    start = None
+
+    def _set_block(self, start, text):
+        self.start = start
+        self.block = io.StringIO(text)
+
+    def __iter__(self):
+        self._open()
+        while True:
+            yield from self.block
+            if not self._load():
+                return
 
+    def __next__(self):
+        line = self.readline()
+        if not line:
+            raise StopIteration
+        return line
+
+    def readline(self, size=-1):
+        self._open()
+        line = self.block.readline(size)
+        while not line and self._load():
+            line = self.block.readline(size)
+        return line
 
-class LazyFile:
+    def read(self, size=-1):
+        self._open()
+        if size is None or size < 0:
+            parts = [self.block.read()]
+            while self._load():
+                parts.append(self.block.read())
+            return ''.join(parts)
+
+        parts = [self.block.read(size)]
+        length = len(parts[0])
+        while length < size and self._load():
+            parts.append(self.block.read(size - length))
+            length += len(parts[-1])
+        return ''.join(parts)
+
+    def tell(self):
+        """
+        Return an opaque number, to pass to :meth:`seek`, like a text file.
+        """
+        self._open()
+        if self.start is None:
+            raise io.UnsupportedOperation('underlying stream is not seekable')
+        return (self.start << 64) | self.block.tell()
+
+    def seek(self, cookie, whence=io.SEEK_SET):
+        if whence != io.SEEK_SET:
+            raise io.UnsupportedOperation('can only seek to a position returned by tell()')
+        self._open()
+        start = cookie >> 64
+        if start != self.start:
+            self._load(start)
+        self.block.seek(cookie & ((1 << 64) - 1))
+        return cookie
+
+
+class LazyFile(BlockFile):
     """
     A proxy for a File object that delays opening it until
     a read method is called.
@@ -50,23 +168,542 @@ class LazyFile:
         self._open()
         return getattr(self.f, name)
 
-    def __iter__(self):
-        return self
-
     def close(self):
         if self._is_lazy_opened:
             self.f.close()
             self.f = None
+            self.block = None
+            self.start = None
             self._is_lazy_opened = False
 
-    def __next__(self):
-        self._open()
-        return next(self.f).replace('\0', '')
-
     def _open(self):
         if not self._is_lazy_opened:
             self.f = self.init(*self._lazy_args, **self._lazy_kwargs)
             self._is_lazy_opened = True
+            self._load()
+
+    def _load(self, start=None):
+        if start is not None:
+            self.f.seek(start)
+
+        try:
+            start = self.f.tell()
+        except (OSError, ValueError):
+            start = None
+
+        # Line endings are already translated to newlines. The block is extended to the end of its last line.
+        text = self.f.read(READ_BLOCK_SIZE)
+        if text and not text.endswith('\n'):
+            text += self.f.readline()
+
+        self._set_block(start, text.replace('\0', '') if '\0' in text else text)
+        return bool(text)
+
+
+class BackgroundReader(io.RawIOBase):
+    """
+    A read-only binary stream that reads another stream in blocks in a background thread, up to a number of blocks
+    ahead, so that decompressing a file overlaps with parsing it. The compression modules release the global
+    interpreter lock while decompressing.
+    """
+
+    def __init__(self, f, blocks=READ_AHEAD_BLOCKS):
+        self.f = f
+        self.blocks = blocks
+        self.position = 0
+        self._start()
+
+    def _start(self):
+        self.data = b''
+        self.eof = False
+        self.queue = queue.Queue(self.blocks)
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        try:
+            while not self.stopped.is_set():
+                data = self.f.read(READ_BLOCK_SIZE)
+                self.queue.put(data)
+                if not data:
+                    return
+        except Exception as e:
+            self.queue.put(e)
+
+    def _stop(self):
+        self.stopped.set()
+        # Unblock the thread, if it is waiting to add a block.
+        while self.thread.is_alive():
+            try:
+                self.queue.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        self.thread.join()
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return self.f.seekable()
+
+    def readinto(self, b):
+        if not self.data:
+            if self.eof:
+                return 0
+            data = self.queue.get()
+            if isinstance(data, Exception):
+                self.eof = True
+                raise data
+            if not data:
+                self.eof = True
+                return 0
+            self.data = memoryview(data)
+
+        n = min(len(b), len(self.data))
+        b[:n] = self.data[:n]
+        self.data = self.data[n:]
+        self.position += n
+        return n
+
+    def tell(self):
+        return self.position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence != io.SEEK_SET:
+            raise io.UnsupportedOperation('can only seek from the start or the current position')
+
+        if offset != self.position:
+            self._stop()
+            self.f.seek(offset)
+            self.position = offset
+            self._start()
+
+        return self.position
+
+    def close(self):
+        if not self.closed:
+            self._stop()
+            self.f.close()
+        super().close()
+
+
+class BatchWriter:
+    """
+    A CSV writer, like :func:`agate.csv.writer` or, if ``fieldnames`` is set, :class:`agate.csv.DictWriter`, that
+    formats rows in batches, and writes them to the file when ``buffer_size`` characters are buffered, or when it is
+    flushed. :meth:`writerows` formats many rows without running Python code per row, unless line numbers are added.
+
+    The ``row_count`` and ``rows_per_second`` attributes measure the rows written.
+    """
+
+    def __init__(self, f, fieldnames=None, line_numbers=False, buffer_size=WRITE_BUFFER_SIZE, **kwargs):
+        kwargs.setdefault('lineterminator', '\n')
+
+        self.f = f
+        self.buffer_size = buffer_size
+        self.line_numbers = line_numbers
+        self.line_number = 0
+        self.row_count = 0
+        self.started = time.perf_counter()
+        self.blocks = []
+        self.size = 0
+        self.batch = io.StringIO()
+
+        # Like agate, embedded carriage returns are converted to newlines, so that they are quoted. Unless the line
+        # terminator has a carriage return, a batch's rows are converted only if its formatted text has one.
+        self.convert_rows = '\r' in kwargs['lineterminator']
+
+        if fieldnames is None:
+            self.writer = csv.writer(self.batch, **kwargs)
+        else:
+            fieldnames = list(fieldnames)
+            if line_numbers:
+                fieldnames.insert(0, 'line_number')
+            self.writer = csv.DictWriter(self.batch, fieldnames, **kwargs)
+        self.fieldnames = fieldnames
+
+    @property
+    def rows_per_second(self):
+        elapsed = time.perf_counter() - self.started
+        return self.row_count / elapsed if elapsed else 0.0
+
+    @staticmethod
+    def _replace(row):
+        if isinstance(row, dict):
+            return {k: v.replace('\r', '\n') if isinstance(v, str) else v for k, v in row.items()}
+        return [v.replace('\r', '\n') if isinstance(v, str) else v for v in row]
+
+    def _convert(self, row):
+        if self.convert_rows:
+            row = self._replace(row)
+        elif isinstance(row, dict):
+            row = dict(row)
+        else:
+            row = list(row)
+
+        if self.line_numbers:
+            if isinstance(row, dict):
+                row['line_number'] = self.line_number or 'line_number'
+            else:
+                row.insert(0, self.line_number or 'line_number')
+            self.line_number += 1
+
+        return row
+
+    def _write_batch(self, rows):
+        self.writer.writerows(rows)
+        text = self.batch.getvalue()
+        self.batch.seek(0)
+        self.batch.truncate()
+
+        if not self.convert_rows and '\r' in text:
+            self.writer.writerows(map(self._replace, rows))
+            text = self.batch.getvalue()
+            self.batch.seek(0)
+            self.batch.truncate()
+
+        self.row_count += len(rows)
+        self.write(text, rows=0)
+
+    def writeheader(self):
+        self.writerow(dict(zip(self.fieldnames, self.fieldnames)))
+
+    def writerow(self, row):
+        if self.line_numbers or self.convert_rows:
+            row = self._convert(row)
+
+        self._write_batch([row])
+
+    def writerows(self, rows):
+        if self.line_numbers or self.convert_rows:
+            rows = map(self._convert, rows)
+        rows = iter(rows)
+
+        while batch := list(itertools.islice(rows, WRITE_BATCH_SIZE)):
+            self._write_batch(batch)
+
+    def write(self, text, rows=1):
+        """
+        Write text that is already formatted as ``rows`` rows.
+        """
+        self.blocks.append(text)
+        self.size += len(text)
+        self.row_count += rows
+
+        if self.size >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if self.blocks:
+            self.f.write(''.join(self.blocks))
+            self.blocks.clear()
+            self.size = 0
+
+
+class RowPipeWriter(BatchWriter):
+    """
+    A :class:`BatchWriter` that sends batches of ``buffer_size`` rows to a :class:`RowPipe`, instead of formatting
+    them. Values are converted to text as the next tool would read them from CSV text.
+    """
+
+    def __init__(self, f, fieldnames=None, line_numbers=False, buffer_size=WRITE_BATCH_SIZE, **kwargs):
+        super().__init__(f, fieldnames, line_numbers, buffer_size, **kwargs)
+        self.rows = []
+
+    def _write_batch(self, rows):
+        if self.fieldnames is not None:
+            rows = [[row.get(name, '') for name in self.fieldnames] for row in rows]
+
+        self.rows.extend(
+            ['' if v is None else v.replace('\r', '\n') if isinstance(v, str) else str(v) for v in row] for row in rows
+        )
+        self.row_count += len(rows)
+
+        if len(self.rows) >= self.buffer_size:
+            self.flush()
+
+    def write(self, text, rows=1):
+        self._write_batch(list(csv.reader(io.StringIO(text))))
+        self.row_count += rows - 1
+
+    def flush(self):
+        if self.rows:
+            self.f.send(self.rows)
+            self.rows = []
+
+
+class RowPipe:
+    """
+    A bounded queue of batches of rows, from one tool to the next in a pipeline of tools running in threads of the
+    same process. The rows are lists of text, as a CSV reader returns them, so that the next tool doesn't need to parse
+    CSV text.
+
+    The tool writing the rows uses it as its output file, and the tool reading the rows uses it as its input file.
+    """
+
+    name = '<pipe>'
+
+    def __init__(self, blocks=PIPE_BLOCKS):
+        self.queue = queue.Queue(blocks)
+        self.closed = False
+        self.rows = itertools.chain.from_iterable(self._batches())
+
+    def _batches(self):
+        while True:
+            batch = self.queue.get()
+            if batch is None:
+                return
+            if isinstance(batch, BaseException):
+                raise batch
+            yield batch
+
+    def send(self, rows):
+        """
+        Send a batch of rows, or raise :class:`BrokenPipeError` if the reading tool has exited.
+        """
+        if self.closed:
+            raise BrokenPipeError('The next tool in the pipeline has exited.')
+        self.queue.put(rows)
+
+    def end(self, error=None):
+        """
+        Signal the end of the rows or, if ``error`` is set, raise the error in the reading tool.
+        """
+        if not self.closed:
+            self.queue.put(error)
+
+    def __iter__(self):
+        return self.rows
+
+    def reader(self, header=True, line_numbers=False, **kwargs):
+        """
+        Return an iterator of the rows, like :func:`agate.csv.reader` of their CSV text. The dialect's arguments are
+        ignored.
+        """
+        if not line_numbers:
+            return self.rows
+        return self._numbered_rows(header)
+
+    def _numbered_rows(self, header):
+        for i, row in enumerate(self.rows, 1):
+            if header and i == 1:
+                row.insert(0, 'line_numbers')
+            else:
+                row.insert(0, str(i - 1 if header else i))
+            yield row
+
+    def readline(self):
+        """
+        Read a row, as CSV text. This is used to skip rows.
+        """
+        row = next(self.rows, None)
+        if row is None:
+            return ''
+        text = io.StringIO()
+        csv.writer(text, lineterminator='\n').writerow(row)
+        return text.getvalue()
+
+    def isatty(self):
+        return False
+
+    def close(self):
+        """
+        Stop reading rows. The writing tool's next batch raises :class:`BrokenPipeError`.
+        """
+        self.closed = True
+        # Unblock the writing tool, if the queue is full.
+        while True:
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                return
+
+
+class BackgroundWriter(io.RawIOBase):
+    """
+    A write-only binary stream that writes to another stream in a background thread, up to a number of blocks
+    behind, so that compressing the output overlaps with producing it.
+    """
+
+    def __init__(self, f, blocks=WRITE_BEHIND_BLOCKS):
+        self.f = f
+        self.error = None
+        self.queue = queue.Queue(blocks)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            data = self.queue.get()
+            if data is None:
+                return
+            # After an error, blocks are discarded, so that writing never waits on a full queue.
+            if self.error is None:
+                try:
+                    self.f.write(data)
+                except Exception as e:
+                    self.error = e
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        if self.error is not None:
+            raise self.error
+        self.queue.put(bytes(b))
+        return len(b)
+
+    def close(self):
+        if not self.closed:
+            self.queue.put(None)
+            self.thread.join()
+            self.f.close()
+        super().close()
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+
+def open_in_background(func, path, encoding=None):
+    """
+    Open a compressed file in text mode with universal newlines, like ``func(path, 'rt', encoding=encoding)``, but
+    decompress it in a background thread. ``path`` can also be a binary file object.
+    """
+    return io.TextIOWrapper(io.BufferedReader(BackgroundReader(func(path, 'rb'))), encoding=encoding)
+
+
+def import_compression_module(name):
+    """
+    Import and return a compression module, or return ``None`` if it is an optional module that is not installed.
+    """
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+def sniff_compression(data):
+    """
+    Return the function that opens a compressed file, like :func:`gzip.open`, if ``data`` starts with the magic number
+    of its compression format, or ``None``.
+    """
+    for pattern, name in COMPRESSION_MAGIC_NUMBERS:
+        if pattern.match(data):
+            module = import_compression_module(name)
+            return module.open if module else None
+    return None
+
+
+def get_compression_opener(path):
+    """
+    Return the function that opens a compressed file, like :func:`gzip.open`, if the file's extension is that of a
+    compression format or, for a regular file without such an extension, if it starts with the magic number of a
+    compression format. Otherwise, return ``None``.
+    """
+    extension = splitext(path)[1]
+
+    if extension in COMPRESSION_MODULES:
+        module = import_compression_module(COMPRESSION_MODULES[extension])
+        if module:
+            return module.open
+
+    # Reading the start of another type of file, like a named pipe, would consume it.
+    if os.path.isfile(path):
+        with open(path, 'rb') as f:
+            return sniff_compression(f.read(MAGIC_NUMBER_SIZE))
+
+    return None
+
+
+class MappedFile(BlockFile):
+    """
+    A :class:`BlockFile` that memory-maps a regular file, and decodes it in blocks that end at line endings. Line
+    endings are translated once per block, instead of once per line.
+
+    The encoding must encode carriage returns, newlines and null bytes as ASCII does, like UTF-8. Like
+    :class:`LazyFile`, the file isn't opened until a read method is called.
+    """
+
+    def __init__(self, path, encoding):
+        self.name = path
+        self.encoding = encoding
+        self.f = None
+        self.map = None
+
+    @staticmethod
+    def supports(encoding):
+        """
+        Return whether an encoding encodes carriage returns, newlines and null bytes as ASCII does.
+        """
+        try:
+            return '\r\n\0'.encode(encoding).endswith(b'\r\n\0')
+        except LookupError:
+            return False
+
+    def _open(self):
+        if self.map is None:
+            self.f = open(self.name, 'rb')
+            try:
+                self.map = mmap.mmap(self.f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # An empty file can't be memory-mapped. Some files, like those in /proc, have no size until read.
+                self.map = self.f.read()
+            self.decoder = codecs.getincrementaldecoder(self.encoding)()
+            self.state = None
+            self.end = 0
+            self._load(0)
+
+    def _load(self, start=None):
+        size = len(self.map)
+        if start is None:
+            if self.end == size:
+                return False
+            start = self.end
+        end = start + READ_BLOCK_SIZE
+
+        if end < size:
+            # The block ends after the last line ending in its range. A carriage return can end the block only if a
+            # newline doesn't follow it, in which case a newline after it would be in the range.
+            boundary = max(self.map.rfind(b'\n', start, end), self.map.rfind(b'\r', start, end - 1))
+            if boundary == -1:
+                match = LINE_ENDING.search(self.map, end)
+                end = match.end() if match else size
+            else:
+                end = boundary + 1
+        else:
+            end = size
+
+        data = self.map[start:end]
+        if b'\r' in data:
+            data = data.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+
+        if start == 0:
+            self.decoder.reset()
+        elif self.state is not None:
+            self.decoder.setstate(self.state)
+        text = self.decoder.decode(data, end == size)
+        if start == 0:
+            # The state after the first block, for example, after a byte order mark, is the state at every block.
+            self.state = self.decoder.getstate()
+
+        # Null bytes are removed after decoding, like a text file, in which a null byte can precede a byte order mark.
+        if b'\0' in data:
+            text = text.replace('\0', '')
+
+        self.end = end
+        self._set_block(start, text)
+        return True
+
+    def close(self):
+        if self.f is not None:
+            if isinstance(self.map, mmap.mmap):
+                self.map.close()
+            self.f.close()
+            self.f = None
+            self.map = None
 
 
 class CSVKitUtility:
@@ -74,7 +711,7 @@ class CSVKitUtility:
     epilog = ''
     override_flags = ''
 
-    def __init__(self, args=None, output_file=None, error_file=None):
+    def __init__(self, args=None, output_file=None, error_file=None, input_file=None):
         """
         Perform argument processing and other setup for a CSVKitUtility.
         """
@@ -87,12 +724,18 @@ class CSVKitUtility:
         self.add_arguments()
         self.args = self.argparser.parse_args(args)
 
-        # Output file is only set during testing.
+        # Input file is only set by pipelines.
+        self.input_file = input_file
+
+        # Output file is only set during testing or by pipelines.
         if output_file is None:
             self.output_file = sys.stdout
         else:
             self.output_file = output_file
 
+        # The batch writers of the output file, to flush when the utility exits.
+        self.output_writers = []
+
         # Error file is only set during testing.
         if error_file is None:
             self.error_file = sys.stderr
@@ -132,9 +775,12 @@ class CSVKitUtility:
         A wrapper around the main loop of the utility which handles opening and
         closing files.
         """
-        if 'f' not in self.override_flags:
+        if 'f' not in self.override_flags and self.input_file is None:
             self.input_file = self._open_input_file(self.args.input_path)
 
+        if getattr(self.args, 'output_path', None):
+            self.output_file = self._open_output_file(self.args.output_path)
+
         if getattr(self.args, 'add_bom', False):
             self.output_file.buffer.write(BOM_UTF8)
 
@@ -145,8 +791,12 @@ class CSVKitUtility:
 
                 self.main()
         finally:
+            for writer in self.output_writers:
+                writer.flush()
             if 'f' not in self.override_flags:
                 self.input_file.close()
+            if getattr(self.args, 'output_path', None):
+                self.output_file.close()
 
     def main(self):
         """
@@ -230,6 +880,15 @@ class CSVKitUtility:
             self.argparser.add_argument(
                 '--no-leading-zeroes', dest='no_leading_zeroes', action='store_true',
                 help='Do not convert a numeric value with leading zeroes to a number.')
+            self.argparser.add_argument(
+                '--infer-rows', dest='infer_rows', type=int,
+                help='Infer column types from a sample of this many rows, instead of from all rows. If a value in '
+                     'another row does not match its column\'s inferred type, the column is re-typed as the next type '
+                     'that matches all its values, or as text.')
+            self.argparser.add_argument(
+                '--infer-sample', dest='infer_sample', choices=SAMPLE_CHOICES, default='head',
+                help='How to sample rows with --infer-rows: "head" for the first rows, or "random" for rows at '
+                     'random. Defaults to "head".')
         if 'H' not in self.override_flags:
             self.argparser.add_argument(
                 '-H', '--no-header-row', dest='no_header_row', action='store_true',
@@ -254,6 +913,15 @@ class CSVKitUtility:
             self.argparser.add_argument(
                 '--add-bom', dest='add_bom', action='store_true',
                 help='Add the UTF-8 byte-order mark (BOM) to the output, for Excel compatibility')
+        if 'o' not in self.override_flags:
+            self.argparser.add_argument(
+                '-o', '--output', dest='output_path',
+                help='A path to write the output to, instead of standard output. The output is compressed if the path '
+                     'ends with .gz, .bz2, .xz or .zst.')
+            self.argparser.add_argument(
+                '--compression-level', dest='compression_level', type=int,
+                help='The compression level of a compressed --output file, e.g. from 1 (fastest) to 9 (smallest) for '
+                     'gzip, bzip2 and xz. Defaults to the level of the compression library.')
 
         # Input/Output
         if 'zero' not in self.override_flags:
@@ -274,25 +942,66 @@ class CSVKitUtility:
             # "UnsupportedOperation: It is not possible to set the encoding or newline of stream after the first read"
             if not opened:
                 sys.stdin.reconfigure(encoding=self.args.encoding)
+            # Peeking at a terminal would wait for input.
+            if not isatty(sys.stdin):
+                func = sniff_compression(sys.stdin.buffer.peek(MAGIC_NUMBER_SIZE))
+                if func is not None:
+                    # Standard input is replaced, so that it can be compared to sys.stdin, and sniffed by peeking. Its
+                    # buffer is detached, so that it isn't closed if the replaced object is garbage collected.
+                    sys.stdin = open_in_background(func, sys.stdin.detach(), encoding=self.args.encoding)
             f = sys.stdin
         else:
-            extension = splitext(path)[1]
-
-            if extension == '.gz':
-                func = gzip.open
-            elif extension == '.bz2':
-                func = bz2.open
-            elif extension == '.xz':
-                func = lzma.open
-            elif extension == '.zst' and zstandard:
-                func = zstandard.open
-            else:
-                func = open
+            func = get_compression_opener(path)
 
-            f = LazyFile(func, path, mode='rt', encoding=self.args.encoding)
+            if func is not None:
+                f = LazyFile(open_in_background, func, path, encoding=self.args.encoding)
+            elif os.path.isfile(path) and MappedFile.supports(self.args.encoding):
+                f = MappedFile(path, self.args.encoding)
+            else:
+                f = LazyFile(open, path, mode='rt', encoding=self.args.encoding)
 
         return f
 
+    def get_output_writer(self, fieldnames=None, **kwargs):
+        """
+        Return a :class:`BatchWriter` of the output file, with the output CSV writer's arguments. The writer is flushed
+        when the utility exits, even if it errors, so any other output must be written with the writer's
+        :meth:`~BatchWriter.write` method, to keep the output in order.
+        """
+        if isinstance(self.output_file, RowPipe):
+            writer = RowPipeWriter(self.output_file, fieldnames, **self.writer_kwargs, **kwargs)
+        else:
+            writer = BatchWriter(self.output_file, fieldnames, **self.writer_kwargs, **kwargs)
+        self.output_writers.append(writer)
+        return writer
+
+    def _open_output_file(self, path):
+        """
+        Open the output file specified on the command line. A compressed file is compressed in a background thread.
+        """
+        extension = splitext(path)[1]
+        level = self.args.compression_level
+
+        if extension not in COMPRESSION_MODULES:
+            return open(path, 'w', encoding='utf-8')
+
+        module = import_compression_module(COMPRESSION_MODULES[extension])
+        if not module:
+            self.argparser.error('The zstandard package must be installed to write .zst files.')
+
+        try:
+            if extension == '.xz':
+                f = module.open(path, 'wb', preset=level)
+            elif extension == '.zst':
+                f = module.open(path, 'wb', cctx=module.ZstdCompressor(level=3 if level is None else level))
+            else:  # .gz, .bz2
+                f = module.open(path, 'wb', compresslevel=9 if level is None else level)
+        # lzma raises LZMAError, instead of ValueError, for an invalid preset.
+        except (ValueError, getattr(module, 'LZMAError', ValueError)):
+            self.argparser.error('--compression-level %s is invalid for %s files.' % (level, extension))
+
+        return io.TextIOWrapper(io.BufferedWriter(BackgroundWriter(f), WRITE_BLOCK_SIZE), encoding='utf-8')
+
     def _extract_csv_reader_kwargs(self):
         """
         Extracts those from the command-line arguments those would should be passed through to the input CSV reader(s).
@@ -350,6 +1059,20 @@ class CSVKitUtility:
         sys.excepthook = handler
 
     def get_column_types(self):
+        types = self.get_possible_column_types()
+        infer_rows = getattr(self.args, 'infer_rows', None)
+
+        if infer_rows is None or getattr(self.args, 'no_inference', None):
+            return TypeTester(types)
+        if infer_rows <= 0:
+            self.argparser.error('--infer-rows must be greater than 0.')
+
+        return SampleTypeTester(types, infer_rows, sample=self.args.infer_sample)
+
+    def get_possible_column_types(self):
+        """
+        Return the data types to test when inferring column types, in order of preference.
+        """
         if getattr(self.args, 'blanks', None):
             type_kwargs = {'null_values': []}
         else:
@@ -386,7 +1109,7 @@ class CSVKitUtility:
                 else:
                     types.insert(1, number_type)
 
-        return agate.TypeTester(types=types)
+        return types
 
     def get_column_offset(self):
         if self.args.zero_based:
@@ -403,8 +1126,8 @@ class CSVKitUtility:
 
         return self.input_file
 
-    def get_rows_and_column_names_and_column_ids(self, **kwargs):
-        rows = agate.csv.reader(self.skip_lines(), **kwargs)
+    def get_rows_and_column_names_and_column_ids(self, reader=agate.csv.reader, **kwargs):
+        rows = csv_reader(self.skip_lines(), reader, **kwargs)
 
         try:
             next_row = next(rows)
@@ -419,11 +1142,18 @@ class CSVKitUtility:
         else:
             column_names = next_row
 
+        return rows, column_names, self.get_column_ids(column_names, kwargs.get('line_numbers'))
+
+    def get_column_ids(self, column_names, line_numbers=False):
+        """
+        Return the indices of the columns selected by the :code:`-c` and :code:`-C` options. If ``line_numbers`` is
+        set, the first column is the line numbers column, which is not counted by column indices.
+        """
         column_offset = self.get_column_offset()
-        if kwargs.get('line_numbers'):
+        if line_numbers:
             column_offset -= 1
 
-        column_ids = parse_column_identifiers(
+        return parse_column_identifiers(
             self.args.columns,
             column_names,
             column_offset,
@@ -431,7 +1161,155 @@ class CSVKitUtility:
             ignore_unknown_columns=getattr(self.args, 'ignore_unknown_columns', False),
         )
 
-        return rows, column_names, column_ids
+    def get_rows_and_column_names(self, f=None, sniff_limit=0):
+        """
+        Read the input like :meth:`agate.Table.from_csv`, but return an iterator of uncast rows and the column names,
+        instead of loading all rows into memory.
+        """
+        if f is None:
+            f = self.input_file
+
+        skip_lines = self.args.skip_lines
+        if not isinstance(skip_lines, int):
+            raise ValueError('skip_lines argument must be an int')
+        while skip_lines > 0:
+            f.readline()
+            skip_lines -= 1
+
+        kwargs = dict(self.reader_kwargs)
+        header = kwargs.pop('header', True)
+        handle = f
+
+        # A pipe's rows are already parsed.
+        if isinstance(f, RowPipe):
+            sniff_limit = 0
+
+        if sniff_limit is None:
+            # Sniffing the entire input requires reading it into memory, as agate does.
+            handle = io.StringIO(f.read())
+            sample = handle.getvalue()
+        elif sniff_limit > 0:
+            if f == sys.stdin:
+                # See agate.Table.from_csv for why this reads bytes, not characters.
+                sample = f.buffer.peek(sniff_limit).decode(self.args.encoding, 'ignore')[:sniff_limit]
+            else:
+                offset = f.tell()
+                sample = f.read(sniff_limit)
+                f.seek(offset)
+
+        if sniff_limit is None or sniff_limit > 0:
+            kwargs['dialect'] = agate.csv.Sniffer().sniff(sample)
+
+        rows = csv_reader(handle, header=header, **kwargs)
+
+        if header:
+            column_names = next(rows, [])
+        else:
+            try:
+                row = next(rows)
+            except StopIteration:
+                return iter([]), ()
+            rows = itertools.chain([row], rows)
+            column_names = make_default_headers(len(row))
+
+        if column_names:
+            column_names = agate.utils.deduplicate(column_names, column_names=True)
+
+        return rows, tuple(column_names)
+
+    def get_jobs(self):
+        """
+        Return the number of processes in which to read the input file: at most --jobs and the number of CPU cores, or
+        1 if the input file is small.
+        """
+        jobs = min(self.args.jobs, os.cpu_count() or 1)
+        path = self.args.input_path
+        if jobs > 1 and path and os.path.isfile(path) and os.path.getsize(path) < JOBS_MIN_INPUT_SIZE:
+            return 1
+        return jobs
+
+    def get_input_ranges(self, parts, sniff_limit=0):
+        """
+        Split the input file into at least ``parts`` byte ranges of data rows, to read them in parallel with
+        :func:`read_range_rows`.
+
+        Return the header row (or default headers, if there is no header row), the CSV reader's arguments and the
+        byte ranges, or ``None`` if the input can't be split.
+        """
+        path = self.args.input_path
+        if not path or path == '-' or get_compression_opener(path):
+            return None
+        # Sniffing the entire input requires reading it, and there is no need to read it twice.
+        if sniff_limit is None:
+            return None
+        # The bytes of newlines and quotes must be the same as in ASCII.
+        encoding = self.args.encoding
+        if not '\n"'.encode(encoding).endswith(b'\n"'):
+            return None
+
+        kwargs = dict(self.reader_kwargs)
+        header = kwargs.pop('header', True)
+
+        with open(path, 'rb') as f:
+            # A carriage return without a newline is a line ending that can't be found by searching for newlines.
+            if re.search(rb'\r(?!\n)', f.read(1 << 16)):
+                return None
+            f.seek(0)
+
+            for _ in range(self.args.skip_lines):
+                f.readline()
+            start = f.tell()
+
+            if sniff_limit > 0:
+                sample = f.read(sniff_limit * 4).decode(encoding, 'ignore').replace('\r\n', '\n')[:sniff_limit]
+                dialect = agate.csv.Sniffer().sniff(sample)
+                if dialect is not None:
+                    # The reader's arguments override the dialect's, and the dialect itself can't be pickled.
+                    kwargs = {**{name: getattr(dialect, name) for name in DIALECT_ATTRIBUTES}, **kwargs}
+                f.seek(start)
+
+            def lines():
+                for line in iter(f.readline, b''):
+                    yield line.decode(encoding).replace('\r\n', '\n').replace('\0', '')
+
+            row = next(agate.csv.reader(lines(), **kwargs), None)
+            if row is None:
+                return None
+
+            if header:
+                start = f.tell()
+            else:
+                row = make_default_headers(len(row))
+
+        end = os.path.getsize(path)
+        offsets = record_offsets(path, start, end, max(parts, math.ceil((end - start) / CHUNK_SIZE)), encoding,
+                                 **kwargs)
+        if len(offsets) < 3:
+            return None
+
+        return row, kwargs, list(zip(offsets, offsets[1:]))
+
+    def get_column_types_and_cast_rows(self, rows, column_names, directory):
+        """
+        Infer the column types of uncast rows, and return the column types and an iterator of cast rows.
+
+        Type inference reads every row, so the rows are written to a temporary file in the directory while the types
+        are inferred, instead of being held in memory. If type inference is disabled, no file is written.
+        """
+        if getattr(self.args, 'no_inference', None):
+            column_types = self.get_column_types().run([], column_names)
+            return column_types, cast_rows(rows, column_names, column_types)
+
+        fd, path = tempfile.mkstemp(dir=directory, suffix='.rows')
+        with os.fdopen(fd, 'wb') as f:
+            def spill():
+                for block in chunks(rows, BLOCK_SIZE):
+                    pickle.dump(block, f, pickle.HIGHEST_PROTOCOL)
+                    yield from block
+
+            column_types = self.get_column_types().run(spill(), column_names)
+
+        return column_types, cast_rows(read_rows(path), column_names, column_types)
 
     def print_column_names(self):
         """
@@ -445,14 +1323,52 @@ class CSVKitUtility:
         else:
             start = 1
 
-        rows = agate.csv.reader(self.skip_lines(), **self.reader_kwargs)
+        rows = csv_reader(self.skip_lines(), **self.reader_kwargs)
         column_names = next(rows)
 
         for i, c in enumerate(column_names, start):
             self.output_file.write('%3i: %s\n' % (i, c))
 
     def additional_input_expected(self):
-        return isatty(sys.stdin) and not self.args.input_path
+        return isatty(sys.stdin) and not self.args.input_path and not isinstance(self.input_file, RowPipe)
+
+
+def csv_reader(f, reader=agate.csv.reader, **kwargs):
+    """
+    Return ``reader(f, **kwargs)``, like :func:`agate.csv.reader`, or, if ``f`` is a :class:`RowPipe`, its rows.
+    """
+    if isinstance(f, RowPipe):
+        return f.reader(**kwargs)
+    return reader(f, **kwargs)
+
+
+def table_from_csv(f, **kwargs):
+    """
+    Return :meth:`agate.Table.from_csv(f, **kwargs) <agate.Table.from_csv>` or, if ``f`` is a :class:`RowPipe`, a
+    table of its rows, with the same arguments.
+    """
+    if not isinstance(f, RowPipe):
+        return agate.Table.from_csv(f, **kwargs)
+
+    for _ in range(kwargs.pop('skip_lines', 0)):
+        f.readline()
+
+    header = kwargs.pop('header', True)
+    column_names = kwargs.pop('column_names', None)
+    column_types = kwargs.pop('column_types', None)
+    row_names = kwargs.pop('row_names', None)
+    row_limit = kwargs.pop('row_limit', None)
+    kwargs.pop('sniff_limit', None)
+
+    rows = f.reader(header=header, **kwargs)
+    if header:
+        names = next(rows, [])
+        if column_names is None:
+            column_names = names
+    if row_limit is not None:
+        rows = itertools.islice(rows, row_limit)
+
+    return agate.Table(rows, column_names, column_types, row_names=row_names)
 
 
 def isatty(f):
@@ -485,6 +1401,250 @@ def make_default_headers(n):
     return tuple(agate.utils.letter_name(i) for i in range(n))
 
 
+def chunks(rows, size):
+    """
+    Yield lists of at most ``size`` rows.
+    """
+    rows = iter(rows)
+    while True:
+        chunk = list(itertools.islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def write_rows(directory, rows):
+    """
+    Write rows to a new temporary file in the directory, and return its path.
+    """
+    fd, path = tempfile.mkstemp(dir=directory, suffix='.rows')
+    with os.fdopen(fd, 'wb') as f:
+        for block in chunks(rows, BLOCK_SIZE):
+            pickle.dump(block, f, pickle.HIGHEST_PROTOCOL)
+    return path
+
+
+def read_rows(path):
+    """
+    Yield the rows written by :func:`write_rows`, and delete the file once all rows are read.
+    """
+    with open(path, 'rb') as f:
+        while True:
+            try:
+                block = pickle.load(f)
+            except EOFError:
+                break
+            yield from block
+    os.remove(path)
+
+
+def record_offsets(path, start, end, parts, encoding='utf-8', **kwargs):
+    """
+    Return the byte offsets at which to split a byte range of a CSV file into about ``parts`` equal parts, without
+    splitting a record, including the ``start`` and ``end`` offsets.
+
+    The encoding must encode newlines and quote characters as ASCII does, like UTF-8. ``kwargs`` are the CSV reader's
+    arguments, without a dialect.
+
+    A newline ends a record if the number of quote characters before it is even. If quote characters can be escaped,
+    or if a quote character is neither at the start nor at the end of a field, like in ``12" pipe``, the parity is
+    ambiguous, and the records are parsed instead, which is slower.
+    """
+    targets = [start + (end - start) * i // parts for i in range(1, parts)]
+
+    if kwargs.get('quoting') == csv.QUOTE_NONE:
+        quotechar = None
+    else:
+        quotechar = kwargs.get('quotechar') or '"'
+    delimiter = kwargs.get('delimiter') or ','
+
+    offsets = None
+    if (
+        not kwargs.get('escapechar')
+        and kwargs.get('doublequote', True)
+        and (quotechar is None or quotechar.isascii())
+        and delimiter.isascii()
+    ):
+        offsets = _quote_parity_offsets(path, start, end, targets, quotechar and quotechar.encode('ascii'),
+                                        delimiter.encode('ascii'))
+    if offsets is None:
+        offsets = _parsed_offsets(path, start, targets, encoding, kwargs)
+
+    offsets = [start, *offsets, end]
+    return [offset for i, offset in enumerate(offsets) if i == 0 or offsets[i - 1] < offset <= end]
+
+
+def _quote_parity_offsets(path, start, end, targets, quotechar, delimiter=b','):
+    """
+    Return the offsets after the first newline outside quotes at or after each target offset, or ``None`` if a quote
+    character isn't at the start or end of a field, or if quote characters are so frequent that parsing is faster.
+    """
+    targets = iter(targets)
+    target = next(targets, None)
+    offsets = []
+    # Whether the position is inside a quoted field.
+    odd = False
+
+    field_starts = (delimiter, b'\n')
+    field_ends = (delimiter, b'\r', b'\n', b'')
+
+    with open(path, 'rb') as f:
+        f.seek(start)
+        position = start
+        previous = b'\n'
+
+        while position < end and target is not None:
+            block = f.read(min(1 << 20, end - position))
+            if not block:
+                break
+
+            if quotechar and block.count(quotechar) * 64 > len(block):
+                return None
+
+            # Newlines are searched from index k.
+            k = 0
+            while True:
+                i = block.find(quotechar, k) if quotechar else -1
+                if i == -1:
+                    i = len(block)
+
+                # The newlines before the run of quote characters are outside quotes if the parity is even.
+                while target is not None and not odd and target - position < i:
+                    j = block.find(b'\n', max(target - position, k), i)
+                    if j == -1:
+                        break
+                    k = j + 1
+                    offsets.append(position + k)
+                    while target is not None and target <= position + k:
+                        target = next(targets, None)
+
+                if i == len(block) or target is None:
+                    break
+
+                j = i + 1
+                while block[j:j + 1] == quotechar:
+                    j += 1
+
+                # An odd run of quote characters opens or closes a quoted field, and pairs are escaped quotes.
+                if not odd and (block[i - 1:i] if i else previous) not in field_starts:
+                    return None
+                if (j - i) % 2:
+                    odd = not odd
+                if not odd:
+                    following = block[j:j + 1] if j < len(block) else f.peek(1)[:1]
+                    if following not in field_ends and position + j != end:
+                        return None
+                k = j
+
+            previous = block[-1:]
+            position += len(block)
+
+    return offsets
+
+
+def _parsed_offsets(path, start, targets, encoding, kwargs):
+    """
+    Return the offsets after the first record that ends at or after each target offset.
+    """
+    offsets = []
+
+    with open(path, 'rb') as f:
+        f.seek(start)
+        position = start
+
+        def lines():
+            nonlocal position
+            for line in iter(f.readline, b''):
+                position += len(line)
+                yield line.decode(encoding, 'surrogateescape').replace('\0', '')
+
+        # The reader doesn't read ahead, so the position is at the end of the record that it returned.
+        reader = csv.reader(lines(), **kwargs)
+        for target in targets:
+            if offsets and offsets[-1] >= target:
+                continue
+            for _ in reader:
+                if position >= target:
+                    offsets.append(position)
+                    break
+            else:
+                break
+
+    return offsets
+
+
+def read_range_rows(path, start, end, encoding, reader=agate.csv.reader, **kwargs):
+    """
+    Return a reader of the rows in a byte range of a CSV file, which are read like the rows of the input file.
+    ``kwargs`` are the CSV reader's arguments.
+    """
+    with open(path, 'rb') as f:
+        f.seek(start)
+        text = f.read(end - start).decode(encoding)
+
+    return reader(io.StringIO(text.replace('\0', ''), newline=None), **kwargs)
+
+
+def process_map(function, arguments, jobs, ordered=True):
+    """
+    Yield the results of calling a function with each tuple of arguments, in ``jobs`` processes.
+
+    The results are yielded in the order of the arguments, unless ``ordered`` is ``False``, in which case they are
+    yielded as soon as they are ready. At most two calls per process are pending at a time, so that the results of
+    a slow call don't accumulate in memory. If the generator is closed early, the pending calls are cancelled.
+    """
+    # Importing multiprocessing is slow, and most tools don't use it.
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+    arguments = iter(arguments)
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending = deque(executor.submit(function, *args) for args in itertools.islice(arguments, 2 * jobs))
+
+        try:
+            while pending:
+                if ordered:
+                    done = [pending.popleft()]
+                else:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        pending.remove(future)
+
+                for future in done:
+                    args = next(arguments, None)
+                    if args is not None:
+                        pending.append(executor.submit(function, *args))
+                    yield future.result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def cast_rows(rows, column_names, column_types):
+    """
+    Cast the values of uncast rows to the column types, one row at a time, as :class:`agate.Table` does.
+    Short rows are padded with nulls.
+    """
+    len_column_names = len(column_names)
+    cast_funcs = [column_type.cast for column_type in column_types]
+
+    for i, row in enumerate(rows):
+        len_row = len(row)
+        if len_row > len_column_names:
+            raise ValueError('Row %i has %i values, but Table only has %i columns.' % (i, len_row, len_column_names))
+        elif len_row < len_column_names:
+            row = itertools.chain(row, [None] * (len_column_names - len_row))
+
+        values = []
+        for j, d in enumerate(row):
+            try:
+                values.append(cast_funcs[j](d))
+            except agate.CastError as e:
+                raise agate.CastError(str(e) + f' Error at row {i} column {column_names[j]}.')
+
+        yield tuple(values)
+
+
 def match_column_identifier(column_names, c, column_offset=1):
     """
     Determine what column a single column id (name or index) matches in a series of column names.
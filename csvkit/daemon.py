@@ -0,0 +1,320 @@
+#!/usr/bin/env python
+
+"""
+A server that runs csvkit's tools in a warm interpreter, and a client that forwards a tool's invocation to it.
+
+Starting Python and importing agate takes much longer than running a tool on a small file. csvkitd imports the tools
+once, and then runs each invocation in a forked process, with the client's arguments, working directory, environment
+and standard streams. The client is the entry point of each tool: if the ``CSVKITD_SOCKET`` environment variable is
+set to the socket of a running server, the invocation is forwarded to it, and otherwise the tool runs as usual.
+
+This module imports only the standard library, so that the client starts fast.
+"""
+
+import argparse
+import importlib
+import json
+import os
+import signal
+import socket
+import stat
+import struct
+import sys
+
+SOCKET_ENVIRONMENT_VARIABLE = 'CSVKITD_SOCKET'
+# The tools that can be run by the server. csvpy is excluded, as it runs an interactive shell.
+UTILITIES = (
+    'csvclean', 'csvcut', 'csvformat', 'csvgrep', 'csvjoin', 'csvjson', 'csvlook', 'csvpipe', 'csvsort', 'csvsql',
+    'csvstack', 'csvstat', 'in2csv', 'sql2csv',
+)
+# The optional modules to import before serving, which the tools otherwise import when they are used.
+PRELOAD_MODULES = ('agatedbf', 'agateexcel', 'openpyxl', 'sqlalchemy', 'xlrd')
+
+
+# The socket option that returns the peer's credentials on macOS and the BSDs, as a struct xucred.
+LOCAL_PEERCRED = 1
+XUCRED = struct.Struct('IIh16I')
+
+
+def is_supported():
+    return (
+        hasattr(socket, 'AF_UNIX') and hasattr(socket, 'send_fds') and hasattr(os, 'fork')
+        and (hasattr(socket, 'SO_PEERCRED') or sys.platform == 'darwin' or 'bsd' in sys.platform)
+    )
+
+
+def forward(name, argv=None):
+    """
+    Run a tool in the server whose socket is set by the ``CSVKITD_SOCKET`` environment variable, with this process's
+    standard streams, and return its exit code, or ``-N`` if it was killed by signal ``N``. If no server is
+    configured or running, return ``None``.
+    """
+    path = os.environ.get(SOCKET_ENVIRONMENT_VARIABLE)
+    if not path or not is_supported():
+        return None
+
+    if argv is None:
+        argv = sys.argv
+
+    request = json.dumps({
+        'utility': name,
+        'argv': list(argv),
+        'cwd': os.getcwd(),
+        'environ': dict(os.environ),
+    }).encode()
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(path)
+            # The file descriptors are sent with a single byte, as a large message might be sent in parts.
+            socket.send_fds(sock, [b'\0'], [0, 1, 2])
+        except OSError:
+            return None
+
+        sock.sendall(request)
+        sock.shutdown(socket.SHUT_WR)
+
+        with sock.makefile('rb') as f:
+            line = f.readline()
+            if not line:
+                return None
+            pid = json.loads(line)['pid']
+
+            while True:
+                try:
+                    line = f.readline()
+                    break
+                except KeyboardInterrupt:
+                    os.kill(pid, signal.SIGINT)
+
+    if not line:
+        return 1
+    return json.loads(line)['status']
+
+
+def _launcher(name):
+    def launch():
+        status = forward(name)
+
+        if status is None:
+            importlib.import_module(f'csvkit.utilities.{name}').launch_new_instance()
+            return
+
+        # Exit like the tool did, including if it was killed by a signal, like SIGPIPE.
+        if status < 0:
+            signal.signal(-status, signal.SIG_DFL)
+            os.kill(os.getpid(), -status)
+            status = 128 - status
+        sys.exit(status)
+
+    launch.__name__ = launch.__qualname__ = name
+    launch.__doc__ = f'Run {name} in the csvkitd server, if configured and running, or else in this process.'
+    return launch
+
+
+csvclean = _launcher('csvclean')
+csvcut = _launcher('csvcut')
+csvformat = _launcher('csvformat')
+csvgrep = _launcher('csvgrep')
+csvjoin = _launcher('csvjoin')
+csvjson = _launcher('csvjson')
+csvlook = _launcher('csvlook')
+csvpipe = _launcher('csvpipe')
+csvsort = _launcher('csvsort')
+csvsql = _launcher('csvsql')
+csvstack = _launcher('csvstack')
+csvstat = _launcher('csvstat')
+in2csv = _launcher('in2csv')
+sql2csv = _launcher('sql2csv')
+
+
+def serve(path, preload=True):
+    """
+    Listen on a Unix socket, and run each tool invocation received in a forked process, until interrupted.
+    """
+    if not is_supported():
+        raise OSError('csvkitd requires Unix sockets and fork(), which are not supported on this platform.')
+
+    if preload:
+        for name in UTILITIES:
+            importlib.import_module(f'csvkit.utilities.{name}')
+        for name in PRELOAD_MODULES:
+            try:
+                importlib.import_module(name)
+            except ImportError:
+                pass
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+    # Replace the socket of a server that is no longer running.
+    if os.path.lexists(path):
+        if not stat.S_ISSOCK(os.lstat(path).st_mode):
+            server.close()
+            raise OSError(f'{path} exists and is not a socket.')
+        try:
+            server.connect(path)
+        except ConnectionRefusedError:
+            os.unlink(path)
+        else:
+            server.close()
+            raise OSError(f'A server is already listening on {path}.')
+        server.close()
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+    # Only the user can connect to the socket, as the server runs tools with its own permissions.
+    umask = os.umask(0o177)
+    try:
+        server.bind(path)
+    finally:
+        os.umask(umask)
+    server.listen()
+
+    # Reap each connection's process as soon as it exits.
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    # Remove the socket if terminated.
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    try:
+        while True:
+            conn, _ = server.accept()
+            if os.fork() == 0:
+                server.close()
+                try:
+                    _handle(conn)
+                finally:
+                    os._exit(0)
+            conn.close()
+    finally:
+        server.close()
+        os.unlink(path)
+
+
+def _handle(conn):
+    """
+    Run a tool invocation in a process, and report its process ID and exit code to the client.
+    """
+    # The socket's permissions allow only the user to connect, but the peer is checked too, as it chooses the
+    # environment in which the tool is run.
+    if _peer_uid(conn) != os.getuid():
+        return
+
+    _, fds, _, _ = socket.recv_fds(conn, 1, 3)
+    chunks = []
+    while chunk := conn.recv(1 << 16):
+        chunks.append(chunk)
+    request = json.loads(b''.join(chunks))
+
+    if request['utility'] not in UTILITIES or len(fds) != 3:
+        return
+
+    # This process waits for the tool's process, to report its exit code.
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+
+    pid = os.fork()
+    if pid == 0:
+        conn.close()
+        _run(request, fds)
+
+    for fd in fds:
+        os.close(fd)
+
+    conn.sendall(json.dumps({'pid': pid}).encode() + b'\n')
+    _, status = os.waitpid(pid, 0)
+    conn.sendall(json.dumps({'status': os.waitstatus_to_exitcode(status)}).encode() + b'\n')
+
+
+def _peer_uid(conn):
+    """
+    Return the user ID of the process connected to a Unix socket, or ``None`` if it can't be determined.
+    """
+    try:
+        if hasattr(socket, 'SO_PEERCRED'):
+            credentials = conn.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize('3i'))
+            _, uid, _ = struct.unpack('3i', credentials)
+        else:
+            _, uid, *_ = XUCRED.unpack(conn.getsockopt(0, LOCAL_PEERCRED, XUCRED.size))
+    except (OSError, struct.error):
+        return None
+    return uid
+
+
+def _run(request, fds):
+    """
+    Run a tool with the client's arguments, working directory, environment and standard streams, and exit.
+    """
+    # If the server's standard streams are closed, a received file descriptor can be 0, 1 or 2, so each is moved
+    # above those before replacing them.
+    import fcntl
+
+    moved = [fcntl.fcntl(fd, fcntl.F_DUPFD, 3) for fd in fds]
+    for fd in fds:
+        os.close(fd)
+    for target, fd in enumerate(moved):
+        os.dup2(fd, target)
+        os.close(fd)
+
+    os.chdir(request['cwd'])
+    os.environ.clear()
+    os.environ.update(request['environ'])
+    sys.argv = request['argv']
+
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    encoding, _, errors = os.environ.get('PYTHONIOENCODING', '').partition(':')
+    sys.stdin = open(0, closefd=False, encoding=encoding or None, errors=errors or None)
+    sys.stdout = open(1, 'w', closefd=False, encoding=encoding or None, errors=errors or None)
+    sys.stderr = open(2, 'w', closefd=False, encoding=encoding or None, errors='backslashreplace')
+
+    code = 0
+    try:
+        importlib.import_module(f'csvkit.utilities.{request["utility"]}').launch_new_instance()
+    except SystemExit as e:
+        if e.code is None:
+            code = 0
+        elif isinstance(e.code, int):
+            code = e.code
+        else:
+            sys.stderr.write(f'{e.code}\n')
+            code = 1
+    except BaseException:
+        sys.excepthook(*sys.exc_info())
+        code = 1
+    finally:
+        for f in (sys.stdout, sys.stderr):
+            try:
+                f.flush()
+            except OSError:
+                code = code or 1
+        os._exit(code)
+
+
+def launch_new_instance():
+    parser = argparse.ArgumentParser(
+        prog='csvkitd',
+        description='Run csvkit tools in a warm interpreter, to avoid the time to start each tool. Tools are '
+                    f'forwarded to the server if the {SOCKET_ENVIRONMENT_VARIABLE} environment variable is set to '
+                    'its socket.',
+    )
+    parser.add_argument(
+        '--socket', dest='socket', default=os.environ.get(SOCKET_ENVIRONMENT_VARIABLE),
+        help=f'The path of the Unix socket to listen on. Defaults to the {SOCKET_ENVIRONMENT_VARIABLE} environment '
+             'variable.')
+    parser.add_argument(
+        '--no-preload', dest='preload', action='store_false',
+        help='Do not import the tools and their optional dependencies before serving.')
+    args = parser.parse_args()
+
+    if not args.socket:
+        parser.error(f'You must specify --socket or set the {SOCKET_ENVIRONMENT_VARIABLE} environment variable.')
+
+    try:
+        serve(args.socket, preload=args.preload)
+    except OSError as e:
+        parser.error(str(e))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    launch_new_instance()
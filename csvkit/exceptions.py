@@ -41,3 +41,10 @@ class RequiredHeaderError(CustomException):
     Exception raised when an operation requires a CSV file to have a header row.
     """
     pass
+
+
+class UnsortedInputError(CustomException):
+    """
+    Exception raised when an operation requires a CSV file to be sorted, and it is not.
+    """
+    pass
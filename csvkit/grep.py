@@ -1,8 +1,23 @@
 #!/usr/bin/env python
 
+import ast
+import csv
+import operator
+import re
+from collections import deque
+from math import nan
 
+from agate.data_types.number import DEFAULT_CURRENCY_SYMBOLS
+from agate.exceptions import FieldSizeLimitError
+
+from csvkit.cli import match_column_identifier
 from csvkit.exceptions import ColumnIdentifierError
 
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
 
 class FilteringCSVReader:
     r"""
@@ -11,7 +26,8 @@ class FilteringCSVReader:
     through untested.
 
     The value of patterns may be either a sequence or a dictionary.  Items in the sequence and values in the
-    dictionary may be strings, regular expressions, or functions.  For each row in the wrapped iterator,
+    dictionary may be strings, regular expressions, functions, or NumberRange objects, to test numeric
+    values without type inference.  For each row in the wrapped iterator,
     these values will be used as tests, and the row will only be yielded by the filter if all values pass
     their corresponding tests.  This behavior can be toggled so that all rows which pass any of the tests
     will be yielded by specifying "any_match=True" in the constructor.
@@ -127,3 +143,455 @@ class regex_callable:
 
     def __call__(self, arg):
         return self.pattern.search(arg)
+
+
+class NumberRange:
+    """
+    A callable that returns whether a value is a number within bounds. The value is parsed with
+    :func:`parse_number`; a value that isn't a number is never within bounds.
+
+    :param gt:
+        The number must be greater than this bound.
+    :param lt:
+        The number must be less than this bound.
+    :param ge:
+        The number must be greater than or equal to this bound.
+    :param le:
+        The number must be less than or equal to this bound.
+    """
+
+    def __init__(self, gt=None, lt=None, ge=None, le=None):
+        self.gt = gt
+        self.lt = lt
+        self.ge = ge
+        self.le = le
+
+    def __call__(self, arg):
+        number = parse_number(arg)
+        if number is None:
+            return False
+
+        return (
+            (self.gt is None or number > self.gt)
+            and (self.lt is None or number < self.lt)
+            and (self.ge is None or number >= self.ge)
+            and (self.le is None or number <= self.le)
+        )
+
+
+class AhoCorasick:
+    """
+    A callable that returns whether a string contains any of the keywords, using an Aho-Corasick automaton, such that
+    each string is scanned once, however many keywords there are.
+    """
+
+    def __init__(self, keywords):
+        # The transitions of each state, whether a keyword ends at each state, and each state's failure state, which
+        # is the state of the longest proper suffix of the state's prefix that is also a prefix of a keyword.
+        self.transitions = [{}]
+        self.accepting = [False]
+        self.failures = [0]
+
+        for keyword in keywords:
+            state = 0
+            for character in keyword:
+                transitions = self.transitions[state]
+                if character in transitions:
+                    state = transitions[character]
+                else:
+                    state = transitions[character] = len(self.transitions)
+                    self.transitions.append({})
+                    self.accepting.append(False)
+                    self.failures.append(0)
+            self.accepting[state] = True
+
+        # Set the failure states in breadth-first order, so that a state's failure state is set before its children's.
+        queue = deque(self.transitions[0].values())
+        while queue:
+            state = queue.popleft()
+            for character, child in self.transitions[state].items():
+                failure = self.failures[state]
+                while failure and character not in self.transitions[failure]:
+                    failure = self.failures[failure]
+                failure = self.transitions[failure].get(character, 0)
+                self.failures[child] = failure
+                # A keyword ends at a state if it ends at the state's failure state.
+                self.accepting[child] = self.accepting[child] or self.accepting[failure]
+                queue.append(child)
+
+    def __call__(self, arg):
+        transitions = self.transitions
+        accepting = self.accepting
+        failures = self.failures
+
+        if accepting[0]:
+            return True
+
+        state = 0
+        for character in arg:
+            while state and character not in transitions[state]:
+                state = failures[state]
+            state = transitions[state].get(character, 0)
+            if accepting[state]:
+                return True
+
+        return False
+
+
+class PrefilteringCSVReader:
+    """
+    A CSV reader, like :func:`agate.csv.reader`, that skips the records that don't contain a string, without parsing
+    them.
+
+    The input is read in blocks. At the start of a record, the lines before the next line that contains the string or
+    a quote or escape character are complete records that don't contain the string, and are skipped. The next record
+    is parsed as usual. The first record (normally, the header row) is never skipped. Line numbers count the skipped
+    lines.
+    """
+
+    def __init__(self, f, literal, field_size_limit=None, line_numbers=False, header=True, **kwargs):
+        self.f = f
+        self.literal = literal
+        self.line_numbers = line_numbers
+        self.header = header
+        self.buffer = ''
+        self.index = 0
+        # The index of the next occurrence of the string in the buffer, or of the end of the searched lines.
+        self.next_literal = -1
+        self.eof = False
+        self.skipped = 0
+        self.started = False
+
+        if field_size_limit:
+            csv.field_size_limit(field_size_limit)
+
+        self.reader = csv.reader(self._lines(), **kwargs)
+
+        dialect = self.reader.dialect
+        special = []
+        if dialect.quoting != csv.QUOTE_NONE and dialect.quotechar:
+            special.append(dialect.quotechar)
+        if dialect.escapechar:
+            special.append(dialect.escapechar)
+        self.special = re.compile('|'.join(re.escape(c) for c in special)) if special else None
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.started:
+            self._skip()
+        self.started = True
+
+        try:
+            row = next(self.reader)
+        except csv.Error as e:
+            if 'field larger than field limit' in str(e):
+                raise FieldSizeLimitError(csv.field_size_limit(), self.line_num)
+            raise
+
+        if self.line_numbers:
+            if self.header and self.line_num == 1:
+                row.insert(0, 'line_numbers')
+            else:
+                row.insert(0, str(self.line_num - 1 if self.header else self.line_num))
+
+        return row
+
+    @property
+    def line_num(self):
+        return self.skipped + self.reader.line_num
+
+    def _read(self):
+        block = self.f.read(1 << 20)
+        if block:
+            self.buffer = self.buffer[self.index:] + block.replace('\0', '')
+            self.index = 0
+            self.next_literal = -1
+        else:
+            self.eof = True
+
+    def _lines(self):
+        while True:
+            j = self.buffer.find('\n', self.index)
+            if j == -1:
+                if self.eof:
+                    if self.index < len(self.buffer):
+                        line = self.buffer[self.index:]
+                        self.index = len(self.buffer)
+                        yield line
+                    return
+                self._read()
+                continue
+
+            line = self.buffer[self.index:j + 1]
+            self.index = j + 1
+            yield line
+
+    def _skip(self):
+        while True:
+            buffer = self.buffer
+            index = self.index
+            # Only complete lines are searched.
+            end = buffer.rfind('\n', index) + 1
+            if not end:
+                if self.eof:
+                    return
+                self._read()
+                continue
+
+            if self.next_literal < index:
+                self.next_literal = buffer.find(self.literal, index, end)
+                if self.next_literal == -1:
+                    self.next_literal = end
+
+            candidate = self.next_literal
+            if self.special:
+                match = self.special.search(buffer, index, candidate)
+                if match:
+                    candidate = match.start()
+
+            if candidate < end:
+                start = buffer.rfind('\n', index, candidate) + 1 or index
+                self.skipped += buffer.count('\n', index, start)
+                self.index = start
+                return
+
+            self.skipped += buffer.count('\n', index, end)
+            self.index = end
+            if self.eof:
+                return
+            self._read()
+
+
+def required_substring(pattern):
+    """
+    Return the longest string of literal characters that any string that matches the regular expression must
+    contain, or ``None``.
+    """
+    if pattern.flags & re.IGNORECASE:
+        return None
+
+    try:
+        parsed = sre_parse.parse(pattern.pattern, pattern.flags)
+    except Exception:
+        return None
+
+    longest = current = ''
+    for op, av in parsed:
+        if op == sre_parse.LITERAL:
+            current += chr(av)
+            if len(current) > len(longest):
+                longest = current
+        else:
+            current = ''
+
+    return longest or None
+
+
+def parse_number(value):
+    """
+    Return a cell's value as a float, or ``None`` if it isn't a number. Like :class:`agate.Number` in the default
+    locale, percent signs, currency symbols and group separators are ignored.
+    """
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
+    value = value.strip().strip('%')
+    if value[:1] == '-':
+        value = value[1:]
+        sign = -1
+    else:
+        sign = 1
+
+    for symbol in DEFAULT_CURRENCY_SYMBOLS:
+        value = value.strip(symbol)
+
+    try:
+        return float(value.replace(',', '')) * sign
+    except ValueError:
+        return None
+
+
+class RowExpression:
+    """
+    A callable that returns whether a row satisfies a Python expression, like ``amount > 100 and region == 'EU'``.
+
+    Names are column names. Other column names and column indices can be written between backticks, like
+    ``\\`State Name\\```. The expression is parsed once and compiled to a function of the row, which reads only the
+    columns that are named.
+
+    A column compared to a number, or used in arithmetic, is parsed as a number with :func:`parse_number`. If a value
+    isn't a number, it is not equal to, less than or greater than any number. Otherwise, a column is text. Likewise,
+    the result of invalid arithmetic, like a division by zero or a power that is too large, isn't a number. Powers are
+    calculated with floats, and only numbers can be multiplied, so that an expression can't take very long or use all
+    memory.
+
+    Only comparisons, boolean operators, arithmetic, literals and some string methods are allowed.
+    """
+
+    def __init__(self, expression, column_names, column_offset=1):
+        self.expression = expression
+        self.column_names = list(column_names)
+        self.column_offset = column_offset
+        self.function = _compile_row_expression(expression, self.column_names, column_offset)
+
+    def __call__(self, row):
+        return self.function(row)
+
+    def __getstate__(self):
+        # The compiled function can't be pickled, so it is compiled again.
+        return (self.expression, self.column_names, self.column_offset)
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+
+_EXPRESSION_NODES = (
+    ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not, ast.USub, ast.UAdd, ast.BinOp, ast.Add,
+    ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow, ast.Compare, ast.Eq, ast.NotEq, ast.Lt, ast.LtE,
+    ast.Gt, ast.GtE, ast.In, ast.NotIn, ast.Constant, ast.Name, ast.Load, ast.Tuple, ast.List, ast.Set, ast.Call,
+    ast.Attribute,
+)
+_STRING_METHODS = {'startswith', 'endswith', 'lower', 'upper', 'strip', 'lstrip', 'rstrip'}
+
+
+def _power(a, b):
+    # Integers are raised to a power exactly, which can take very long, like 9 ** 9 ** 9, whereas a float that is too
+    # large raises an OverflowError.
+    return float(a) ** float(b)
+
+
+# The functions of the arithmetic operators that can raise an ArithmeticError, like ZeroDivisionError or OverflowError.
+_CHECKED_OPERATORS = {
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: _power,
+}
+
+
+def _arithmetic(function, a, b):
+    """
+    Return ``function(a, b)``, or NaN if the operation is invalid, like a division by zero.
+    """
+    try:
+        result = function(a, b)
+    except ArithmeticError:
+        return nan
+    # A negative number to a fractional power is a complex number.
+    if isinstance(result, complex):
+        return nan
+    return result
+
+
+def _is_sequence(node):
+    """
+    Return whether an expression's value can be a string or a sequence. Columns in arithmetic are numbers.
+    """
+    if isinstance(node, ast.Constant):
+        return isinstance(node.value, str)
+    if isinstance(node, ast.BinOp):
+        return _is_sequence(node.left) or _is_sequence(node.right)
+    if isinstance(node, ast.BoolOp):
+        return any(_is_sequence(value) for value in node.values)
+    return isinstance(node, (ast.Tuple, ast.List, ast.Set, ast.Call, ast.Attribute))
+
+
+def _compile_row_expression(expression, column_names, column_offset):
+    # Replace the backticked identifiers with valid names.
+    identifiers = []
+
+    def replace(match):
+        identifiers.append(match.group(1))
+        return '__column%d__' % (len(identifiers) - 1)
+
+    source = re.sub(r'`([^`]*)`', replace, expression.strip())
+
+    try:
+        tree = ast.parse(source, mode='eval')
+    except SyntaxError as e:
+        raise ValueError('The expression "%s" is invalid: %s.' % (expression, e.msg))
+
+    for node in ast.walk(tree):
+        if not isinstance(node, _EXPRESSION_NODES):
+            raise ValueError('The expression "%s" is invalid: %s is not allowed.' % (
+                expression, type(node).__name__))
+        if isinstance(node, ast.Constant) and not isinstance(node.value, (str, int, float)):
+            raise ValueError('The expression "%s" is invalid: %r is not allowed.' % (expression, node.value))
+        if isinstance(node, ast.Call) and not (
+            isinstance(node.func, ast.Attribute) and node.func.attr in _STRING_METHODS and not node.keywords
+        ):
+            raise ValueError('The expression "%s" is invalid: only the %s string methods are allowed.' % (
+                expression, ', '.join(sorted(_STRING_METHODS))))
+        if isinstance(node, ast.Attribute) and node.attr not in _STRING_METHODS:
+            raise ValueError('The expression "%s" is invalid: .%s is not allowed.' % (expression, node.attr))
+        # Repeating a string or a sequence can use all memory, like 'x' * 10 ** 12.
+        if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Mult) and (
+            _is_sequence(node.left) or _is_sequence(node.right)
+        ):
+            raise ValueError('The expression "%s" is invalid: only numbers can be multiplied.' % expression)
+
+    # The local variable of each column and type.
+    variables = {}
+
+    def variable(name, numeric):
+        match = re.fullmatch(r'__column(\d+)__', name)
+        if match:
+            column_id = match_column_identifier(column_names, identifiers[int(match.group(1))], column_offset)
+        elif name in column_names:
+            column_id = column_names.index(name)
+        else:
+            raise ColumnIdentifierError("Column '%s' is invalid. It is not a column name. Column names are: %s" % (
+                name, repr(column_names)[1:-1]))
+
+        return variables.setdefault((column_id, numeric), '_%s%d' % ('n' if numeric else 't', column_id))
+
+    def is_numeric(node):
+        if isinstance(node, ast.Constant):
+            return isinstance(node.value, (int, float))
+        if isinstance(node, (ast.Tuple, ast.List, ast.Set)):
+            return bool(node.elts) and all(is_numeric(elt) for elt in node.elts)
+        return isinstance(node, ast.BinOp) or isinstance(node, ast.UnaryOp) and not isinstance(node.op, ast.Not)
+
+    def convert(node, numeric=False):
+        if isinstance(node, ast.Name):
+            return ast.Name(id=variable(node.id, numeric), ctx=ast.Load())
+        if isinstance(node, ast.Compare):
+            numeric = any(is_numeric(operand) for operand in (node.left, *node.comparators))
+            return ast.Compare(left=convert(node.left, numeric), ops=node.ops,
+                               comparators=[convert(operand, numeric) for operand in node.comparators])
+        if isinstance(node, (ast.BinOp, ast.UnaryOp)) and not isinstance(getattr(node, 'op', None), ast.Not):
+            numeric = True
+        elif isinstance(node, (ast.BoolOp, ast.UnaryOp, ast.Call, ast.Attribute)):
+            numeric = False
+
+        for field, value in ast.iter_fields(node):
+            if isinstance(value, ast.AST):
+                setattr(node, field, convert(value, numeric))
+            elif isinstance(value, list):
+                setattr(node, field, [convert(item, numeric) if isinstance(item, ast.AST) else item for item in value])
+
+        if isinstance(node, ast.BinOp) and type(node.op) in _CHECKED_OPERATORS:
+            function = ast.Name(id=_CHECKED_OPERATORS[type(node.op)].__name__, ctx=ast.Load())
+            return ast.Call(func=ast.Name(id='arithmetic', ctx=ast.Load()), args=[function, node.left, node.right],
+                            keywords=[])
+        return node
+
+    body = ast.unparse(convert(tree.body))
+
+    lines = ['def where(row, parse_number=parse_number, nan=nan):', '    n = len(row)']
+    for (column_id, numeric), name in sorted(variables.items()):
+        lines.append("    %s = row[%d] if n > %d else ''" % (name, column_id, column_id))
+        if numeric:
+            lines.append('    %s = parse_number(%s)' % (name, name))
+            lines.append('    if %s is None:' % name)
+            lines.append('        %s = nan' % name)
+    lines.append('    return bool(%s)' % body)
+
+    namespace = {'parse_number': parse_number, 'nan': nan, 'arithmetic': _arithmetic}
+    namespace.update((function.__name__, function) for function in _CHECKED_OPERATORS.values())
+    exec(compile('\n'.join(lines), '<expression>', 'exec'), namespace)
+    return namespace['where']
@@ -0,0 +1,401 @@
+#!/usr/bin/env python
+
+"""
+Type inference that matches :class:`agate.TypeTester`, but that tests common values without casting them, and that
+can infer types from a sample of rows.
+"""
+
+import datetime
+import itertools
+import random
+import re
+from collections import deque
+from collections.abc import Sequence
+from decimal import Decimal
+
+import agate
+
+SAMPLE_CHOICES = ('head', 'random')
+# The seed of random samples, so that the inferred types are the same each time a file is read.
+SAMPLE_SEED = 0
+# The number of distinct values per column to remember, to not test a repeated value again.
+CACHE_SIZE = 1024
+# The years of ISO 8601 dates that are known to be parsed as dates by agate.
+ISO_YEARS = range(1800, 2201)
+
+INTEGER_OR_DECIMAL = re.compile(r'-?[0-9]+(?:\.[0-9]+)?')
+ISO_DATE = re.compile(r'[0-9]{4}-[0-9]{2}-[0-9]{2}')
+ISO_DATETIME = re.compile(r'[0-9]{4}-[0-9]{2}-[0-9]{2}[T ][0-9]{2}:[0-9]{2}:[0-9]{2}')
+
+
+def get_check(data_type):
+    """
+    Return a function that returns whether a value can be cast to the data type, like ``data_type.test(value)``, or
+    :code:`None` if the value must be tested by casting it.
+
+    The function recognizes common values, like integers and ISO 8601 dates, with regular expressions, instead of
+    casting them. Values of subclasses of agate's data types are always tested by casting them.
+    """
+    cls = type(data_type)
+
+    if cls is agate.Text:
+        return _check_text
+    if cls is agate.Boolean:
+        return _boolean_check(data_type)
+    if cls is agate.Number:
+        return _number_check(data_type)
+    if cls is agate.Date and not data_type.date_format:
+        return _date_check(data_type, [(ISO_DATE, datetime.date.fromisoformat)])
+    if cls is agate.DateTime and not data_type.datetime_format:
+        return _date_check(data_type, [
+            (ISO_DATETIME, datetime.datetime.fromisoformat),
+            (ISO_DATE, datetime.date.fromisoformat),
+        ])
+    return _check_unknown
+
+
+def get_cast(data_type):
+    """
+    Return a function that casts a value like ``data_type.cast(value)``, but that casts the common values recognized
+    by :func:`get_check` without parsing them with agate.
+    """
+    cls = type(data_type)
+    check = get_check(data_type)
+
+    if cls is agate.Boolean:
+        parse = _parse_boolean(data_type)
+    elif cls is agate.Number:
+        parse = _parse_plain(data_type, _parse_number)
+    elif cls is agate.Date and check is not _check_unknown:
+        parse = _parse_plain(data_type, datetime.date.fromisoformat)
+    elif cls is agate.DateTime and check is not _check_unknown:
+        parse = _parse_plain(data_type, _parse_datetime)
+    else:
+        return data_type.cast
+
+    cast = data_type.cast
+
+    def fast_cast(value):
+        if isinstance(value, str) and check(value):
+            return parse(value)
+        return cast(value)
+
+    return fast_cast
+
+
+def _parse_boolean(data_type):
+    null_values = frozenset(data_type.null_values)
+    true_values = frozenset(data_type.true_values)
+
+    def parse(value):
+        value = value.replace(',', '').strip().lower()
+        if value in null_values:
+            return None
+        return value in true_values
+
+    return parse
+
+
+def _parse_plain(data_type, parse):
+    null_values = frozenset(data_type.null_values)
+
+    def parse_or_null(value):
+        value = value.strip()
+        if value.lower() in null_values:
+            return None
+        return parse(value)
+
+    return parse_or_null
+
+
+def _parse_number(value):
+    # Like agate, round to the context's precision.
+    return Decimal(value) * 1
+
+
+def _parse_datetime(value):
+    if len(value) == 10:
+        return datetime.datetime.combine(datetime.date.fromisoformat(value), datetime.time.min)
+    return datetime.datetime.fromisoformat(value)
+
+
+def _check_text(value):
+    return True
+
+
+def _check_unknown(value):
+    return None
+
+
+def _boolean_check(data_type):
+    null_values = frozenset(data_type.null_values)
+    true_values = frozenset(data_type.true_values)
+    false_values = frozenset(data_type.false_values)
+
+    def check(value):
+        if value is None:
+            return True
+        if not isinstance(value, str):
+            return None
+        value = value.replace(',', '').strip().lower()
+        return value in null_values or value in true_values or value in false_values
+
+    return check
+
+
+def _number_check(data_type):
+    null_values = frozenset(data_type.null_values)
+    # Integers and decimals like "-1.5" can be cast, unless a symbol is a digit, a sign or a decimal point.
+    plain = data_type.decimal_symbol == '.' and not any(
+        character in '0123456789+-.'
+        for symbol in (data_type.group_symbol, *data_type.currency_symbols)
+        for character in symbol
+    )
+    no_leading_zeroes = data_type.no_leading_zeroes
+
+    def check(value):
+        if value is None:
+            return True
+        if not isinstance(value, str):
+            return None
+        value = value.strip()
+        if value.lower() in null_values:
+            return True
+        if plain and INTEGER_OR_DECIMAL.fullmatch(value):
+            if no_leading_zeroes:
+                digits = value[1:] if value[0] == '-' else value
+                return not (len(digits) > 1 and digits[0] == '0' and digits[1] != '.')
+            return True
+        return None
+
+    return check
+
+
+def _date_check(data_type, formats):
+    null_values = frozenset(data_type.null_values)
+
+    def check(value):
+        if value is None:
+            return True
+        if not isinstance(value, str):
+            return None
+        value = value.strip()
+        if value.lower() in null_values:
+            return True
+        for regex, parse in formats:
+            if regex.fullmatch(value):
+                try:
+                    return parse(value).year in ISO_YEARS or None
+                except ValueError:
+                    return None
+        return None
+
+    return check
+
+
+class Hypotheses:
+    """
+    The data types to which all of a column's values can be cast, in order of preference.
+    """
+    __slots__ = ('types', 'checks', 'seen')
+
+    def __init__(self, types, checks):
+        self.types = types
+        self.checks = checks
+        # The string values that can be cast to all the data types.
+        self.seen = set()
+
+    @property
+    def data_type(self):
+        return self.types[0]
+
+    def test(self, value):
+        """
+        Remove the data types to which the value can't be cast. Each remaining data type is tested once.
+        """
+        if value in self.seen:
+            return
+
+        types = []
+        checks = []
+        for data_type, check in zip(self.types, self.checks):
+            result = check(value)
+            if result is None:
+                result = data_type.test(value)
+            if result:
+                types.append(data_type)
+                checks.append(check)
+
+        if len(types) < len(self.types):
+            self.types = types
+            self.checks = checks
+        if isinstance(value, str) and len(self.seen) < CACHE_SIZE:
+            self.seen.add(value)
+
+    def reset(self, data_type):
+        """
+        Replace the data types with one data type.
+        """
+        self.types = [data_type]
+        self.checks = [get_check(data_type)]
+
+    def test_preferred(self, value):
+        """
+        Return whether the value can be cast to the preferred data type.
+        """
+        if value in self.seen:
+            return True
+
+        result = self.checks[0](value)
+        if result is None:
+            result = self.types[0].test(value)
+        return result
+
+
+class TypeTester(agate.TypeTester):
+    """
+    Infer column types like :class:`agate.TypeTester`.
+
+    Each column's values are tested against the data types that all previous values could be cast to, and common
+    values are recognized without casting them. Once a column has one possible data type, its values aren't tested.
+
+    :param types:
+        The data types to test, in order of preference. The last data type must be :class:`agate.Text`.
+    """
+    def __init__(self, types):
+        super().__init__(types=types)
+        self.checks = [get_check(data_type) for data_type in types]
+
+    def run(self, rows, column_names):
+        hypotheses = self.get_hypotheses(column_names)
+        # The columns that have more than one possible data type.
+        columns = [i for i, h in enumerate(hypotheses) if len(h.types) > 1]
+
+        rows = iter(rows)
+        for row in rows:
+            if not columns:
+                # Read the other rows, as they might be written to a file while they are read.
+                deque(rows, maxlen=0)
+                break
+
+            len_row = len(row)
+            for i in columns:
+                if i < len_row:
+                    hypotheses[i].test(row[i])
+
+            if any(len(hypotheses[i].types) == 1 for i in columns):
+                columns = [i for i in columns if len(hypotheses[i].types) > 1]
+
+        return tuple(h.data_type for h in hypotheses)
+
+    def get_hypotheses(self, column_names):
+        return [Hypotheses(list(self._possible_types), list(self.checks)) for _ in column_names]
+
+
+class SampleTypeTester(TypeTester):
+    """
+    Infer column types from a sample of rows, like :class:`TypeTester`, and then test the other rows' values only
+    against their column's inferred type.
+
+    If another row's value doesn't match its column's inferred type, the column is re-typed as its next preferred type
+    that matches all its values, like :class:`TypeTester`, instead of raising an error when the value is cast. If the
+    rows aren't a sequence and the column has too many distinct values to remember, it is re-typed as text.
+
+    If all of a column's sampled values are null, its type is inferred from the other rows' values, like
+    :class:`TypeTester`.
+
+    :param types:
+        The data types to test, in order of preference. The last data type must be :class:`agate.Text`.
+    :param limit:
+        The number of rows in the sample.
+    :param sample:
+        ``'head'`` to sample the first rows, or ``'random'`` to sample rows at random. If the rows aren't a sequence,
+        like when reading rows from a stream, the first rows are sampled.
+    """
+    def __init__(self, types, limit, sample='head'):
+        super().__init__(types)
+        self.sample_size = limit
+        self.sample = sample
+        self.text_type = types[-1]
+
+    def run(self, rows, column_names):
+        num_columns = len(column_names)
+        hypotheses = self.get_hypotheses(column_names)
+        # The columns with a non-null value, whose types are only tested against their preferred hypothesis.
+        inferred = [False] * num_columns
+
+        # If a value doesn't match its column's inferred type, the previous values are tested against the column's
+        # other hypotheses. They are read again from a sequence, or else their distinct values are remembered.
+        sequence = rows if isinstance(rows, Sequence) else None
+        unverified = [set() for _ in range(num_columns)]
+
+        if self.sample == 'random' and sequence is not None and len(rows) > self.sample_size:
+            indices = random.Random(SAMPLE_SEED).sample(range(len(rows)), self.sample_size)
+            sample_rows = [rows[i] for i in sorted(indices)]
+            # The sampled rows are tested again, which is cheaper than skipping them.
+            other_rows = rows
+            start = 0
+        else:
+            rows = iter(rows)
+            sample_rows = itertools.islice(rows, self.sample_size)
+            other_rows = rows
+            start = self.sample_size
+
+        is_null = self._is_null
+        for row in sample_rows:
+            for i, value in enumerate(row[:num_columns]):
+                h = hypotheses[i]
+                if len(h.types) > 1:
+                    h.test(value)
+                if not inferred[i] and not is_null(value):
+                    inferred[i] = True
+
+        columns = [i for i, h in enumerate(hypotheses) if len(h.types) > 1]
+        for index, row in enumerate(other_rows, start):
+            len_row = len(row)
+            changed = False
+            for i in columns:
+                if i >= len_row:
+                    continue
+                h = hypotheses[i]
+                value = row[i]
+                if inferred[i]:
+                    if h.test_preferred(value):
+                        if sequence is None and unverified[i] is not None and value not in h.seen:
+                            unverified[i].add(value)
+                            if len(unverified[i]) > CACHE_SIZE:
+                                unverified[i] = None
+                    else:
+                        if sequence is not None:
+                            previous = (r[i] for r in itertools.islice(sequence, start, index) if i < len(r))
+                        else:
+                            previous = unverified[i]
+                        self._fall_back(h, value, previous)
+                        changed = True
+                else:
+                    h.test(value)
+                    inferred[i] = not is_null(value)
+                    changed = changed or len(h.types) == 1
+
+            if changed:
+                columns = [i for i in columns if len(hypotheses[i].types) > 1]
+
+        return tuple(h.data_type for h in hypotheses)
+
+    def _fall_back(self, h, value, previous):
+        """
+        Remove the data types to which the value or the previous values can't be cast, or use the text type if the
+        previous values are unknown.
+        """
+        if previous is None:
+            h.reset(self.text_type)
+            return
+
+        h.test(value)
+        for value in previous:
+            if len(h.types) == 1:
+                break
+            h.test(value)
+
+    def _is_null(self, value):
+        return self.text_type.cast(value) is None
@@ -0,0 +1,297 @@
+#!/usr/bin/env python
+
+"""
+Joins that hold only some of their inputs in memory, and that otherwise behave like :meth:`agate.Table.join`.
+"""
+
+import itertools
+import os
+import pickle
+import tempfile
+
+import agate
+
+from csvkit.cli import BLOCK_SIZE, read_rows
+from csvkit.exceptions import UnsortedInputError
+
+
+class StreamingTable:
+    """
+    A table whose rows are an iterator of cast rows, which can be read only once.
+
+    Like :class:`agate.Table`, it has ``column_names``, ``column_types`` and ``rows`` attributes.
+    """
+
+    def __init__(self, rows, column_names, column_types):
+        self.rows = rows
+        self.column_names = tuple(column_names)
+        self.column_types = tuple(column_types)
+
+    def to_csv(self, f, **kwargs):
+        """
+        Write the table to a file-like object, like :meth:`agate.Table.to_csv`.
+        """
+        kwargs.setdefault('lineterminator', '\n')
+
+        writer = agate.csv.writer(f, **kwargs)
+        writer.writerow(self.column_names)
+
+        csv_funcs = [column_type.csvify for column_type in self.column_types]
+        for row in self.rows:
+            writer.writerow(tuple(csv_funcs[i](d) for i, d in enumerate(row)))
+
+
+def _join_columns(left, right, right_key_indices):
+    """
+    Return the names and types of the joined table's columns, like :meth:`agate.Table.join`.
+    """
+    column_names = list(left.column_names)
+    column_types = list(left.column_types)
+
+    for i, (name, column_type) in enumerate(zip(right.column_names, right.column_types)):
+        if i in right_key_indices:
+            continue
+
+        if name in left.column_names:
+            column_names.append('%s2' % name)
+        else:
+            column_names.append(name)
+
+        column_types.append(column_type)
+
+    return agate.utils.deduplicate(column_names, column_names=True), column_types
+
+
+def hash_join(left, right, left_key=None, right_key=None, inner=False, full_outer=False, build_left=False):
+    """
+    Join two tables on the values of a column, like :meth:`agate.Table.join`, but return a :class:`StreamingTable`.
+
+    A hash index of the right table's rows is built in memory, and the left table's rows are read one at a time, such
+    that the left table can be a :class:`StreamingTable` of any size. The rows are in the same order as
+    :meth:`agate.Table.join`.
+
+    If ``build_left`` is set, a hash index of the left table's rows is built instead, and the right table's rows are
+    read one at a time. The rows are then in the order of the right table. This is only supported for inner joins.
+
+    If ``left_key`` is ``None``, the tables are joined on row number, as a full outer join.
+
+    :param left_key:
+        The index of the column in the left table to join on.
+    :param right_key:
+        The index of the column in the right table to join on. Defaults to ``left_key``.
+    """
+    if inner and full_outer:
+        raise ValueError('A join can not be both "inner" and "full_outer".')
+    if build_left and not inner:
+        raise ValueError('The hash index can be built on the left table for inner joins only.')
+
+    if right_key is None:
+        right_key = left_key
+
+    # Sequential join
+    if left_key is None:
+        column_names, column_types = _join_columns(left, right, ())
+        return StreamingTable(_sequential_rows(left, right), column_names, column_types)
+
+    if full_outer:
+        right_key_indices = ()
+    else:
+        right_key_indices = (right_key,)
+
+    column_names, column_types = _join_columns(left, right, right_key_indices)
+
+    if build_left:
+        rows = _build_left_rows(left, right, left_key, right_key)
+    else:
+        rows = _build_right_rows(left, right, left_key, right_key, inner, full_outer)
+
+    return StreamingTable(rows, column_names, column_types)
+
+
+def _sequential_rows(left, right):
+    left_width = len(left.column_names)
+    right_width = len(right.column_names)
+
+    for left_row, right_row in itertools.zip_longest(left.rows, right.rows):
+        if left_row is None:
+            left_row = (None,) * left_width
+        if right_row is None:
+            right_row = (None,) * right_width
+
+        yield tuple(left_row) + tuple(right_row)
+
+
+def _build_right_rows(left, right, left_key, right_key, inner, full_outer):
+    # A full outer join keeps the right key column.
+    right_width = len(right.column_names) - (0 if full_outer else 1)
+
+    right_hash = {}
+    # For a full outer join, the right rows are also kept in order, to add the unmatched rows at the end.
+    ordered = []
+    for row in right.rows:
+        value = row[right_key]
+        if full_outer:
+            row = tuple(row)
+            ordered.append((value, row))
+        else:
+            row = tuple(v for k, v in enumerate(row) if k != right_key)
+        right_hash.setdefault(value, []).append(row)
+
+    matched = set()
+
+    for left_row in left.rows:
+        value = left_row[left_key]
+        matching_rows = right_hash.get(value)
+
+        if matching_rows:
+            if full_outer:
+                matched.add(value)
+            for right_row in matching_rows:
+                yield tuple(left_row) + right_row
+        elif not inner:
+            yield tuple(left_row) + (None,) * right_width
+
+    if full_outer:
+        left_width = len(left.column_names)
+        for value, right_row in ordered:
+            if value not in matched:
+                yield (None,) * left_width + right_row
+
+
+def _build_left_rows(left, right, left_key, right_key):
+    left_hash = {}
+    for row in left.rows:
+        left_hash.setdefault(row[left_key], []).append(tuple(row))
+
+    for right_row in right.rows:
+        matching_rows = left_hash.get(right_row[right_key])
+
+        if matching_rows:
+            right_row = tuple(v for k, v in enumerate(right_row) if k != right_key)
+            for left_row in matching_rows:
+                yield left_row + right_row
+
+
+def merge_join(left, right, left_key=None, right_key=None, inner=False, full_outer=False, directory=None):
+    """
+    Join two tables on the values of a column, like :meth:`agate.Table.join`, but return a :class:`StreamingTable`.
+
+    The rows of both tables must be sorted in ascending order of the values of the join columns, with nulls last, as
+    csvsort sorts them. The rows of both tables are read one at a time, and only the right table's rows with the
+    current value are held in memory. For a full outer join, the right table's unmatched rows are written to a
+    temporary file in ``directory``, to output them last. The rows are in the same order as :meth:`agate.Table.join`.
+
+    :raises UnsortedInputError:
+        If a table's rows aren't sorted. Rows are checked as they are read, so some rows might be joined already.
+    """
+    if inner and full_outer:
+        raise ValueError('A join can not be both "inner" and "full_outer".')
+
+    if right_key is None:
+        right_key = left_key
+
+    if left_key is None:
+        column_names, column_types = _join_columns(left, right, ())
+        return StreamingTable(_sequential_rows(left, right), column_names, column_types)
+
+    left_type = left.column_types[left_key]
+    right_type = right.column_types[right_key]
+    # Booleans and numbers are comparable, and a column of ones and zeros is inferred as Boolean.
+    if type(left_type) is not type(right_type) and not (
+        isinstance(left_type, (agate.Boolean, agate.Number)) and isinstance(right_type, (agate.Boolean, agate.Number))
+    ):
+        raise ValueError('The join columns must have the same type to merge sorted tables, not %s and %s.' % (
+            type(left_type).__name__, type(right_type).__name__))
+
+    if full_outer:
+        right_key_indices = ()
+    else:
+        right_key_indices = (right_key,)
+
+    column_names, column_types = _join_columns(left, right, right_key_indices)
+    rows = _merge_rows(left, right, left_key, right_key, inner, full_outer, directory)
+
+    return StreamingTable(rows, column_names, column_types)
+
+
+def _sorted_groups(table, key, label):
+    """
+    Yield the sort value and the rows of each group of rows with equal values, checking the order of the groups.
+    """
+    previous = None
+
+    for value, rows in itertools.groupby(table.rows, key=lambda row: row[key]):
+        value = agate.NullOrder() if value is None else value
+
+        if previous is not None and not previous < value:
+            raise UnsortedInputError(
+                'The %s file is not sorted by its join column "%s": "%s" comes after "%s".' % (
+                    label, table.column_names[key], _display(value), _display(previous)))
+
+        previous = value
+        yield value, rows
+
+
+def _display(value):
+    return '' if isinstance(value, agate.NullOrder) else value
+
+
+def _merge_rows(left, right, left_key, right_key, inner, full_outer, directory):
+    # A full outer join keeps the right key column.
+    right_width = len(right.column_names) - (0 if full_outer else 1)
+
+    def strip(row):
+        if full_outer:
+            return tuple(row)
+        return tuple(v for k, v in enumerate(row) if k != right_key)
+
+    right_groups = _sorted_groups(right, right_key, 'right')
+    right_value, right_rows = next(right_groups, (None, None))
+    right_matched = False
+
+    if full_outer:
+        fd, path = tempfile.mkstemp(dir=directory, suffix='.rows')
+        unmatched = os.fdopen(fd, 'wb')
+        block = []
+
+        def spill(rows):
+            for row in rows:
+                block.append(strip(row))
+                if len(block) == BLOCK_SIZE:
+                    pickle.dump(block, unmatched, pickle.HIGHEST_PROTOCOL)
+                    block.clear()
+
+    for left_value, left_rows in _sorted_groups(left, left_key, 'left'):
+        # Skip the right rows whose values are smaller than the left value.
+        while right_rows is not None and right_value < left_value:
+            if full_outer and not right_matched:
+                spill(right_rows)
+            right_value, right_rows = next(right_groups, (None, None))
+            right_matched = False
+
+        if right_rows is not None and right_value == left_value:
+            if not right_matched:
+                right_rows = [strip(row) for row in right_rows]
+                right_matched = True
+
+            for left_row in left_rows:
+                for right_row in right_rows:
+                    yield tuple(left_row) + right_row
+        elif not inner:
+            for left_row in left_rows:
+                yield tuple(left_row) + (None,) * right_width
+
+    if full_outer:
+        while right_rows is not None:
+            if not right_matched:
+                spill(right_rows)
+            right_value, right_rows = next(right_groups, (None, None))
+            right_matched = False
+
+        if block:
+            pickle.dump(block, unmatched, pickle.HIGHEST_PROTOCOL)
+        unmatched.close()
+
+        left_width = len(left.column_names)
+        for right_row in read_rows(path):
+            yield (None,) * left_width + right_row
@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+
+"""
+Pipelines of tools that run in one process, like ``csvcut ... | csvgrep ... | csvsort ...``, but without formatting
+and parsing CSV text between the tools.
+"""
+
+import importlib
+import threading
+
+from csvkit.cli import RowPipe
+
+# The tools that can write rows to the next tool, by module name and class name.
+ROW_TOOLS = {
+    'csvcut': 'CSVCut',
+    'csvformat': 'CSVFormat',
+    'csvgrep': 'CSVGrep',
+    'csvsort': 'CSVSort',
+}
+# The tools that can only be the last tool, as they don't write CSV.
+LAST_TOOLS = {
+    'csvjson': 'CSVJSON',
+    'csvlook': 'CSVLook',
+    'csvstat': 'CSVStat',
+}
+# The options that set how CSV is parsed, which have an effect only on the first command, by destination.
+INPUT_OPTIONS = {
+    'delimiter': '-d/--delimiter',
+    'tabs': '-t/--tabs',
+    'quotechar': '-q/--quotechar',
+    'quoting': '-u/--quoting',
+    'doublequote': '-b/--no-doublequote',
+    'escapechar': '-p/--escapechar',
+    'field_size_limit': '-z/--maxfieldsize',
+    'encoding': '-e/--encoding',
+    'skipinitialspace': '-S/--skipinitialspace',
+}
+# The options that set how CSV is formatted, which have an effect only on the last command, by destination.
+OUTPUT_OPTIONS = {
+    'out_delimiter': '-D/--out-delimiter',
+    'out_tabs': '-T/--out-tabs',
+    'out_asv': '-A/--out-asv',
+    'out_quotechar': '-Q/--out-quotechar',
+    'out_quoting': '-U/--out-quoting',
+    'out_doublequote': '-B/--out-no-doublequote',
+    'out_escapechar': '-P/--out-escapechar',
+    'out_lineterminator': '-M/--out-lineterminator',
+    'add_bom': '--add-bom',
+}
+
+
+class PipelineError(Exception):
+    """
+    Exception raised if a pipeline's commands are invalid.
+    """
+    pass
+
+
+def get_utility_class(name, last=False):
+    """
+    Return the class of a tool that can be a stage of a pipeline.
+    """
+    tools = {**ROW_TOOLS, **LAST_TOOLS} if last else ROW_TOOLS
+
+    if name not in tools:
+        if name in LAST_TOOLS:
+            raise PipelineError(f'{name} can only be the last command in a pipeline.')
+        raise PipelineError(f'{name} can not be used in a pipeline. Supported tools: {", ".join(sorted(tools))}.')
+
+    return getattr(importlib.import_module(f'csvkit.utilities.{name}'), tools[name])
+
+
+def run_pipeline(commands, output_file=None):
+    """
+    Run commands like ``[['csvcut', '-c', '1,3', 'data.csv'], ['csvsort', '-c', '3']]`` in threads of this process,
+    each command reading the rows written by the previous command, and the last command writing to ``output_file``
+    (or standard output).
+
+    Only the first command reads its input file (or standard input). Rows are passed between commands in batches,
+    through bounded queues, so that the input is parsed once and the output is formatted once.
+
+    :raises PipelineError:
+        If a tool can't be used in a pipeline, or at its position in the pipeline, or if an option would have no
+        effect at its position in the pipeline, like an input file or an input format option after the first
+        command.
+    """
+    if not commands:
+        raise PipelineError('A pipeline must have at least one command.')
+
+    last = len(commands) - 1
+    classes = [get_utility_class(command[0], last=i == last) for i, command in enumerate(commands)]
+    pipes = [RowPipe() for _ in commands[1:]]
+    inputs = [None, *pipes]
+    outputs = [*pipes, output_file]
+
+    utilities = []
+    for i, (cls, command) in enumerate(zip(classes, commands)):
+        utility = cls(command[1:], output_file=outputs[i], input_file=inputs[i])
+
+        if i and utility.args.input_path not in (None, '-'):
+            raise PipelineError(f'Only the first command in a pipeline can have an input file, not {command[0]}.')
+        if i < last and getattr(utility.args, 'output_path', None):
+            raise PipelineError(f'Only the last command in a pipeline can have an output file, not {command[0]}.')
+        # Rows aren't parsed or formatted between commands, so these options would be ignored.
+        if i and (options := _get_options(utility, INPUT_OPTIONS)):
+            raise PipelineError(
+                f'Only the first command in a pipeline can have input format options, not {command[0]} '
+                f'({", ".join(options)}).')
+        if i < last and (options := _get_options(utility, OUTPUT_OPTIONS)):
+            raise PipelineError(
+                f'Only the last command in a pipeline can have output format options, not {command[0]} '
+                f'({", ".join(options)}).')
+
+        utilities.append(utility)
+
+    threads = [
+        threading.Thread(target=_run_stage, args=(utility, inputs[i], outputs[i]), daemon=True)
+        for i, utility in enumerate(utilities[:-1])
+    ]
+    for thread in threads:
+        thread.start()
+
+    try:
+        utilities[-1].run()
+    finally:
+        # If the last tool fails, the other tools stop when they next write rows.
+        for pipe in pipes:
+            pipe.close()
+
+    for thread in threads:
+        thread.join()
+
+
+def _get_options(utility, options):
+    """
+    Return the options that are set to a value other than their default.
+    """
+    return [
+        option for dest, option in options.items()
+        if hasattr(utility.args, dest) and getattr(utility.args, dest) != utility.argparser.get_default(dest)
+    ]
+
+
+def _run_stage(utility, input_pipe, output_pipe):
+    """
+    Run a tool that writes to a pipe. An error is raised in the next tool, when it reads the pipe.
+    """
+    error = None
+    try:
+        utility.run()
+    except BrokenPipeError:
+        # The next tool exited without reading all rows, like `head`.
+        pass
+    except BaseException as e:
+        error = e
+    finally:
+        if input_pipe is not None:
+            input_pipe.close()
+        output_pipe.end(error)
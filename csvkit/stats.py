@@ -0,0 +1,668 @@
+#!/usr/bin/env python
+
+"""
+Statistics that are calculated in one pass over a column's values, without reading the values into memory, and that
+otherwise match the agate aggregations used by csvstat.
+"""
+
+import bisect
+import datetime
+import hashlib
+import heapq
+import itertools
+import math
+import random
+import re
+from collections import Counter
+from decimal import Decimal, getcontext
+from operator import itemgetter
+
+import agate
+
+from csvkit.inference import get_cast, get_check
+
+# The text of a decimal NaN, which isn't equal to itself, so that agate counts each NaN as a distinct value.
+NAN = re.compile(r'\s*[+-]?s?nan[0-9]*\s*', re.IGNORECASE)
+
+
+class TypeStats:
+    """
+    Statistics of a column's values, cast to a data type.
+    """
+
+    def __init__(self, data_type):
+        self.data_type = data_type
+        self.nulls = False
+        self.nonnulls = 0
+        # A HyperLogLog of the non-null values, if approximating the number of unique values.
+        self.distinct = None
+        self._set_functions()
+
+    def _set_functions(self):
+        self.check = get_check(self.data_type)
+        self.cast = get_cast(self.data_type)
+
+    def __getstate__(self):
+        # The functions are closures, which can't be pickled.
+        state = self.__dict__.copy()
+        del state['check'], state['cast']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._set_functions()
+
+    def add(self, value):
+        """
+        Cast a value and add it to the statistics.
+
+        :raises agate.CastError:
+            If the value can't be cast to the data type.
+        """
+        value = self.cast(value)
+
+        if value is None:
+            self.nulls = True
+        else:
+            self.nonnulls += 1
+            self.add_value(value)
+            if self.distinct is not None:
+                self.distinct.add(self.distinct_key(value))
+
+    def add_value(self, value):
+        pass
+
+    def distinct_key(self, value):
+        """
+        Return a string that is equal for equal values.
+        """
+        return str(value)
+
+    def update(self, other):
+        """
+        Merge the statistics of other values, cast to the same data type.
+        """
+        self.nulls = self.nulls or other.nulls
+        self.nonnulls += other.nonnulls
+        if self.distinct is not None:
+            self.distinct.update(other.distinct)
+
+    def results(self):
+        return {
+            'nulls': self.nulls,
+            'nonnulls': self.nonnulls,
+        }
+
+
+class RangeStats(TypeStats):
+    """
+    Statistics of a :class:`agate.Date` or :class:`agate.DateTime` column.
+    """
+
+    def __init__(self, data_type):
+        super().__init__(data_type)
+        self.min = None
+        self.max = None
+
+    def add_value(self, value):
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def update(self, other):
+        super().update(other)
+        if other.min is not None:
+            RangeStats.add_value(self, other.min)
+            RangeStats.add_value(self, other.max)
+
+    def results(self):
+        results = super().results()
+        results['min'] = self.min
+        results['max'] = self.max
+        return results
+
+
+class TimeDeltaStats(RangeStats):
+    """
+    Statistics of a :class:`agate.TimeDelta` column.
+    """
+
+    def __init__(self, data_type):
+        super().__init__(data_type)
+        self.sum = datetime.timedelta()
+
+    def add_value(self, value):
+        super().add_value(value)
+        self.sum += value
+
+    def update(self, other):
+        super().update(other)
+        self.sum += other.sum
+
+    def results(self):
+        results = super().results()
+        results['sum'] = self.sum
+        if self.nonnulls:
+            results['mean'] = self.sum / self.nonnulls
+        return results
+
+
+class NumberStats(RangeStats):
+    """
+    Statistics of a :class:`agate.Number` column. The standard deviation is calculated with Welford's algorithm.
+
+    NaN values are included in the sum, mean and standard deviation, but can't be compared. If the column has a NaN
+    value and another value, it has no minimum, maximum, median or quantiles, like with agate.
+    """
+
+    def __init__(self, data_type):
+        super().__init__(data_type)
+        # The first NaN value, if any.
+        self.nan = None
+        self.sum = 0
+        self.mean = Decimal(0)
+        self.m2 = Decimal(0)
+        self.max_whole_places = 1
+        self.max_decimal_places = 0
+        # A QuantileSketch of the non-null values, if approximating medians and quantiles.
+        self.sketch = None
+
+    def add_value(self, value):
+        if value.is_nan():
+            if self.nan is None:
+                self.nan = value
+        else:
+            super().add_value(value)
+            if self.sketch is not None:
+                self.sketch.add(value)
+        self.sum += value
+
+        delta = value - self.mean
+        self.mean += delta / self.nonnulls
+        self.m2 += delta * (value - self.mean)
+
+        # See agate.utils.max_precision.
+        if not math.isnan(value) and not math.isinf(value):
+            sign, digits, exponent = value.normalize().as_tuple()
+            whole_places = len(digits) + exponent
+            if whole_places > self.max_whole_places:
+                self.max_whole_places = whole_places
+            if -exponent > self.max_decimal_places:
+                self.max_decimal_places = -exponent
+
+    def distinct_key(self, value):
+        # Decimal('1.0') == Decimal('1') and Decimal('-0') == Decimal('0').
+        if not value:
+            return '0'
+        return str(value.normalize())
+
+    def update(self, other):
+        n = self.nonnulls + other.nonnulls
+        if n:
+            # See Chan et al.'s parallel algorithm for the variance.
+            delta = other.mean - self.mean
+            self.mean += delta * other.nonnulls / n
+            self.m2 += other.m2 + delta * delta * self.nonnulls * other.nonnulls / n
+
+        super().update(other)
+        if self.nan is None:
+            self.nan = other.nan
+        self.sum += other.sum
+        self.max_whole_places = max(self.max_whole_places, other.max_whole_places)
+        self.max_decimal_places = max(self.max_decimal_places, other.max_decimal_places)
+        if self.sketch is not None:
+            self.sketch.update(other.sketch)
+
+    def results(self):
+        results = super().results()
+        if self.nan is not None:
+            # A single value isn't compared.
+            results['min'] = results['max'] = self.nan if self.nonnulls == 1 else None
+        results['sum'] = self.sum
+        if self.nonnulls:
+            results['mean'] = self.sum / self.nonnulls
+        if self.nonnulls > 1:
+            results['stdev'] = (self.m2 / (self.nonnulls - 1)).sqrt()
+        elif self.nan is not None:
+            results['stdev'] = self.nan
+        results['maxprecision'] = min(self.max_decimal_places, getcontext().prec - self.max_whole_places)
+        return results
+
+
+class TextStats(TypeStats):
+    """
+    Statistics of a :class:`agate.Text` column.
+    """
+
+    def __init__(self, data_type):
+        super().__init__(data_type)
+        self.max_length = 0
+
+    def add_value(self, value):
+        if len(value) > self.max_length:
+            self.max_length = len(value)
+
+    def update(self, other):
+        super().update(other)
+        self.max_length = max(self.max_length, other.max_length)
+
+    def results(self):
+        results = super().results()
+        results['len'] = Decimal(self.max_length)
+        return results
+
+
+def type_stats(data_type):
+    """
+    Return the statistics class for a data type.
+    """
+    if isinstance(data_type, agate.Number):
+        return NumberStats(data_type)
+    if isinstance(data_type, agate.TimeDelta):
+        return TimeDeltaStats(data_type)
+    if isinstance(data_type, (agate.Date, agate.DateTime)):
+        return RangeStats(data_type)
+    if isinstance(data_type, agate.Text):
+        return TextStats(data_type)
+    return TypeStats(data_type)
+
+
+class Occurrence:
+    """
+    An occurrence of a value, which is only equal to itself, to count each occurrence separately.
+    """
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+
+class ColumnStats:
+    """
+    Statistics of a column whose data type is inferred from the same values, like :class:`agate.TypeTester`.
+
+    The statistics are calculated for each possible data type, until a value can't be cast to that data type. The
+    column's data type is the first possible data type that can cast all values.
+
+    Unique values, most common values and medians require counting the distinct values. If ``counts`` is ``False``,
+    these statistics are omitted, unless approximated, and memory use is constant.
+
+    :param possible_types:
+        The data types to test, in order of preference.
+    :param distinct:
+        If ``counts`` is ``False``, approximate the number of unique values with a :class:`HyperLogLog`.
+    :param top:
+        If ``counts`` is ``False``, approximate the most common values with a :class:`SpaceSaving` summary.
+    :param sketch_size:
+        If ``counts`` is ``False``, approximate medians and quantiles with a :class:`QuantileSketch` of this size.
+    """
+
+    def __init__(self, possible_types, counts=True, distinct=False, top=False, sketch_size=None):
+        self.candidates = [type_stats(data_type) for data_type in possible_types]
+        self.counts = Counter() if counts else None
+        # The values that are counted once per occurrence, as they might be cast to NaN.
+        self.nans = set()
+        self.top = SpaceSaving() if top and not counts else None
+
+        if not counts:
+            for candidate in self.candidates:
+                if distinct:
+                    candidate.distinct = HyperLogLog()
+                if sketch_size and isinstance(candidate, NumberStats):
+                    candidate.sketch = QuantileSketch(sketch_size)
+
+    def add(self, value):
+        if self.counts is not None:
+            if value in self.nans:
+                self.counts[Occurrence(value)] = 1
+            else:
+                count = self.counts[value]
+                # Only new values are matched against the regular expression.
+                if not count and isinstance(value, str) and NAN.fullmatch(value):
+                    self.nans.add(value)
+                    self.counts[Occurrence(value)] = 1
+                else:
+                    self.counts[value] = count + 1
+        if self.top is not None:
+            self.top.add(value)
+
+        if len(self.candidates) == 1:
+            self.candidates[0].add(value)
+            return
+
+        remaining = []
+        for candidate in self.candidates:
+            # Don't cast a value that is known not to match the data type.
+            if candidate.check(value) is False:
+                continue
+            try:
+                candidate.add(value)
+            except agate.CastError:
+                continue
+            remaining.append(candidate)
+        self.candidates = remaining
+
+    def update(self, other):
+        """
+        Merge the statistics of the next values of the column, calculated by another instance with the same
+        parameters, such that the statistics are the same as if this instance had added those values.
+        """
+        others = {type(candidate.data_type): candidate for candidate in other.candidates}
+
+        remaining = []
+        for candidate in self.candidates:
+            other_candidate = others.get(type(candidate.data_type))
+            if other_candidate is not None:
+                candidate.update(other_candidate)
+                remaining.append(candidate)
+        self.candidates = remaining
+
+        if self.counts is not None:
+            self.counts.update(other.counts)
+            self.nans.update(other.nans)
+        if self.top is not None:
+            self.top.update(other.top)
+
+    @property
+    def data_type(self):
+        return self.candidates[0].data_type
+
+    def value_counts(self):
+        """
+        Return a :class:`collections.Counter` of the cast values, in order of first appearance.
+        """
+        cast = self.candidates[0].cast
+        counts = Counter()
+        for value, count in self.counts.items():
+            if isinstance(value, Occurrence):
+                value = value.value
+            counts[cast(value)] += count
+        return counts
+
+    def results(self, freq_count=5, fractions=()):
+        """
+        Return a dictionary of statistics, keyed by the names of csvstat's operations.
+
+        :param fractions:
+            The quantiles to calculate, as fractions from 0 to 1.
+        """
+        candidate = self.candidates[0]
+        results = candidate.results()
+        results['type'] = self.data_type.__class__.__name__
+
+        if self.counts is not None:
+            counts = self.value_counts()
+            results['unique'] = len(counts)
+            results['freq'] = [{'value': value, 'count': count} for value, count in counts.most_common(freq_count)]
+            if isinstance(self.data_type, agate.Number) and (candidate.nan is None or candidate.nonnulls == 1):
+                results['median'] = median(counts)
+                if fractions:
+                    results['quantiles'] = quantile_list(fractions, quantiles(counts.items(), fractions))
+        else:
+            if isinstance(candidate, NumberStats) and candidate.sketch is not None and candidate.nan is None:
+                results['median'], *values = quantiles(candidate.sketch.items(), [0.5, *fractions])
+                if fractions:
+                    results['quantiles'] = quantile_list(fractions, values)
+
+            if candidate.distinct is not None:
+                # The null value is counted exactly.
+                results['unique'] = len(candidate.distinct) + candidate.nulls
+                results['unique_error'] = candidate.distinct.error
+
+            if self.top is not None:
+                cast = candidate.cast
+                top = {}
+                for value, (count, error) in self.top.items():
+                    value = cast(value)
+                    if value in top:
+                        top[value][0] += count
+                        top[value][1] += error
+                    else:
+                        top[value] = [count, error]
+
+                most_common = sorted(top.items(), key=lambda item: item[1][0], reverse=True)[:freq_count]
+                results['freq'] = [{'value': value, 'count': count} for value, (count, error) in most_common]
+                results['freq_error'] = max((error for value, (count, error) in most_common), default=0)
+
+        return results
+
+
+def median(counts):
+    """
+    Return the median of the counted values, like :class:`agate.Median`.
+    """
+    return quantiles(counts.items(), [0.5])[0]
+
+
+def quantiles(counts, fractions):
+    """
+    Return the quantiles of the counted values, like :class:`agate.Percentiles`, but for any fractions from 0 to 1.
+
+    :param counts:
+        An iterable of ``(value, count)`` pairs.
+    """
+    data = sorted(((value, count) for value, count in counts if value is not None), key=itemgetter(0))
+
+    if not data:
+        return [None] * len(fractions)
+
+    values = [value for value, count in data]
+    cumulative = list(itertools.accumulate(count for value, count in data))
+    n = cumulative[-1]
+
+    def nth(index):
+        return values[bisect.bisect_right(cumulative, index)]
+
+    results = []
+    for fraction in fractions:
+        # See agate.Percentiles.
+        k = n * fraction
+        low = max(1, int(math.ceil(k)))
+        high = min(n, int(math.floor(k + 1)))
+
+        if low == high:
+            results.append(nth(low - 1))
+        else:
+            results.append((nth(low - 1) + nth(high - 1)) / 2)
+
+    return results
+
+
+def quantile_list(fractions, values):
+    return [{'quantile': fraction, 'value': value} for fraction, value in zip(fractions, values)]
+
+
+class HyperLogLog:
+    """
+    An estimate of the number of distinct strings, using the HyperLogLog algorithm, with 2 ** ``precision`` registers
+    of one byte each.
+
+    Strings are hashed with BLAKE2, which, unlike :func:`hash`, is the same in every process, so that HyperLogLogs can
+    be merged with :meth:`update`.
+    """
+
+    def __init__(self, precision=14):
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add(self, value):
+        x = int.from_bytes(hashlib.blake2b(value.encode('utf-8', 'surrogatepass'), digest_size=8).digest(), 'big')
+        bits = 64 - self.precision
+        index = x >> bits
+        # The position of the leftmost 1-bit in the remaining bits.
+        rank = bits - (x & ((1 << bits) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def update(self, other):
+        """
+        Merge another HyperLogLog with the same precision into this one.
+        """
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    @property
+    def error(self):
+        """
+        The relative standard error of the estimate.
+        """
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def __len__(self):
+        m = len(self.registers)
+        estimate = 0.7213 / (1 + 1.079 / m) * m * m / math.fsum(2.0 ** -register for register in self.registers)
+
+        # Use linear counting for small cardinalities.
+        zeros = self.registers.count(0)
+        if zeros and estimate <= 2.5 * m:
+            estimate = m * math.log(m / zeros)
+
+        return round(estimate)
+
+
+class SpaceSaving:
+    """
+    The most common values, using the Space-Saving algorithm, which counts at most ``capacity`` values.
+
+    When a new value is added and ``capacity`` values are counted, the least common value is replaced, and the new
+    value's count and error are set to that value's count. A count therefore overestimates a value's frequency by at
+    most its error, and any value whose frequency exceeds ``n / capacity`` is counted.
+    """
+
+    def __init__(self, capacity=1000):
+        self.capacity = capacity
+        self.counts = {}
+        # The heap has an entry for each counted value, whose count is at most the value's count.
+        self.heap = []
+        self.sequence = itertools.count()
+
+    def add(self, value, count=1):
+        entry = self.counts.get(value)
+
+        if entry is not None:
+            entry[0] += count
+            return
+
+        if len(self.counts) < self.capacity:
+            self.counts[value] = [count, 0]
+            heapq.heappush(self.heap, (count, next(self.sequence), value))
+            return
+
+        # Find the least common value, updating entries whose counts are out-of-date.
+        while True:
+            minimum, _, replaced = self.heap[0]
+            current = self.counts[replaced][0]
+            if current == minimum:
+                break
+            heapq.heapreplace(self.heap, (current, next(self.sequence), replaced))
+
+        del self.counts[replaced]
+        self.counts[value] = [minimum + count, minimum]
+        heapq.heapreplace(self.heap, (minimum + count, next(self.sequence), value))
+
+    def update(self, other):
+        """
+        Merge another SpaceSaving summary with the same capacity into this one.
+
+        A value that isn't counted by a full summary might have occurred as often as that summary's least common value,
+        so its count and error in that summary are taken to be that value's count.
+        """
+        minimum = self._minimum()
+        other_minimum = other._minimum()
+
+        merged = {}
+        for value in itertools.chain(self.counts, other.counts):
+            if value not in merged:
+                count, error = self.counts.get(value, (minimum, minimum))
+                other_count, other_error = other.counts.get(value, (other_minimum, other_minimum))
+                merged[value] = [count + other_count, error + other_error]
+
+        if len(merged) > self.capacity:
+            kept = set(sorted(merged, key=lambda value: merged[value][0], reverse=True)[:self.capacity])
+            merged = {value: entry for value, entry in merged.items() if value in kept}
+
+        self.counts = merged
+        self.heap = [(entry[0], next(self.sequence), value) for value, entry in merged.items()]
+        heapq.heapify(self.heap)
+
+    def _minimum(self):
+        if len(self.counts) < self.capacity:
+            return 0
+        return min(entry[0] for entry in self.counts.values())
+
+    def items(self):
+        """
+        Return ``(value, (count, error))`` pairs, in the order in which the values started to be counted.
+        """
+        return ((value, tuple(entry)) for value, entry in self.counts.items())
+
+
+class QuantileSketch:
+    """
+    A weighted sample of values from which to estimate quantiles, using the KLL algorithm.
+
+    Values are added to the first of a stack of compactors. When the sample is full, a compactor is sorted, and either
+    its odd-ranked or its even-ranked values are moved to the next compactor, in which each value's weight is double.
+    The capacity of a compactor is ``size`` at the top of the stack, and shrinks by a factor of 2/3 at each lower
+    level. Larger sizes are more accurate and use more memory; a size of 200 has a rank error of about 1%.
+
+    The choice of odd or even is random, with a fixed seed, so that the same input has the same estimates.
+    """
+
+    def __init__(self, size=200):
+        self.size = size
+        self.compactors = [[]]
+        self.count = 0
+        self.max_count = self._capacity(0)
+        self.random = random.Random(0)
+
+    def _capacity(self, height):
+        depth = len(self.compactors) - height - 1
+        return int(math.ceil((2 / 3) ** depth * self.size)) + 1
+
+    def _grow(self):
+        self.compactors.append([])
+        self.max_count = sum(self._capacity(height) for height in range(len(self.compactors)))
+
+    def _compress(self):
+        for height, compactor in enumerate(self.compactors):
+            if len(compactor) >= self._capacity(height):
+                if height + 1 == len(self.compactors):
+                    self._grow()
+
+                compactor.sort()
+                # If there is an odd number of values, the smallest value stays.
+                start = len(compactor) % 2
+                self.compactors[height + 1].extend(compactor[start + self.random.randint(0, 1)::2])
+                del compactor[start:]
+
+                self.count = sum(map(len, self.compactors))
+                if self.count < self.max_count:
+                    break
+
+    def add(self, value):
+        self.compactors[0].append(value)
+        self.count += 1
+        if self.count >= self.max_count:
+            self._compress()
+
+    def update(self, other):
+        """
+        Merge another QuantileSketch into this one.
+        """
+        while len(self.compactors) < len(other.compactors):
+            self._grow()
+        for compactor, other_compactor in zip(self.compactors, other.compactors):
+            compactor.extend(other_compactor)
+
+        self.count = sum(map(len, self.compactors))
+        while self.count >= self.max_count:
+            self._compress()
+
+    def items(self):
+        """
+        Return ``(value, weight)`` pairs, whose weights sum to the number of values added.
+        """
+        for height, compactor in enumerate(self.compactors):
+            for value in compactor:
+                yield value, 2 ** height
@@ -9,11 +9,17 @@ https://gist.github.com/561347/9846ebf8d0a69b06681da9255ffe3d3f59ec2c97
 Used and modified with permission.
 """
 
+import csv
+import itertools
 import sys
+from operator import itemgetter
 
 import agate
 
-from csvkit.cli import CSVKitUtility
+from csvkit.cli import CSVKitUtility, RowPipe
+
+# The number of lines with special characters after which to parse all lines, if they are at least a quarter of lines.
+PARSE_ALL_THRESHOLD = 1000
 
 
 class CSVCut(CSVKitUtility):
@@ -50,16 +56,126 @@ class CSVCut(CSVKitUtility):
 
         rows, column_names, column_ids = self.get_rows_and_column_names_and_column_ids(**self.reader_kwargs)
 
-        output = agate.csv.writer(self.output_file, **self.writer_kwargs)
+        output = self.get_output_writer()
         output.writerow([column_names[column_id] for column_id in column_ids])
 
-        for row in rows:
-            out_row = [row[column_id] if column_id < len(row) else None for column_id in column_ids]
+        if not column_ids or not self.can_split_lines():
+            self.write_rows(output, rows, column_ids)
+            return
 
-            if not self.args.delete_empty or any(out_row):
+        if self.args.no_header_row:
+            # The first row was read to count the columns.
+            self.write_rows(output, [next(rows)], column_ids)
+
+        self.write_lines(output, column_ids)
+
+    def can_split_lines(self):
+        """
+        Return whether records without quote characters can be split on the delimiter, instead of being parsed.
+        """
+        if self.args.line_numbers or self.args.skipinitialspace or self.args.quoting == csv.QUOTE_NONNUMERIC:
+            return False
+        # A pipe's rows are already parsed, and a pipe's rows needn't be formatted.
+        if isinstance(self.input_file, RowPipe) or isinstance(self.output_file, RowPipe):
+            return False
+
+        return self.reader_kwargs.get('delimiter', ',') not in self.special_characters()
+
+    def special_characters(self):
+        """
+        Return the characters that require a record to be parsed by the CSV reader, or a field to be quoted by the
+        CSV writer.
+        """
+        characters = {'"', ',', '\r', '\n', '\0', self.reader_kwargs.get('quotechar', '"')}
+        if self.args.escapechar:
+            characters.add(self.args.escapechar)
+        if self.reader_kwargs.get('delimiter', ',') == ',':
+            characters.remove(',')
+
+        return characters
+
+    def write_rows(self, output, rows, column_ids):
+        out_rows = ([row[column_id] if column_id < len(row) else None for column_id in column_ids] for row in rows)
+        if self.args.delete_empty:
+            out_rows = filter(any, out_rows)
+
+        output.writerows(out_rows)
+
+    def write_lines(self, output, column_ids):
+        """
+        Split each line of the input that has no special characters on the delimiter, and write the selected fields
+        without quoting them. Other lines are read as usual, from the same iterator, because a quoted field can span
+        many lines. If many lines have special characters, all remaining lines are read as usual.
+        """
+        delimiter = self.reader_kwargs.get('delimiter', ',')
+        # Searching for each character is faster than searching for a character class.
+        special = tuple(self.special_characters() - {'\n'})
+        limit = csv.field_size_limit()
+        width = max(column_ids) + 1
+
+        if len(column_ids) == 1:
+            getter = itemgetter(slice(column_ids[0], column_ids[0] + 1))
+        else:
+            getter = itemgetter(*column_ids)
+
+        lines = PushbackIterator(self.input_file)
+        reader = agate.csv.reader(lines, **self.reader_kwargs)
+        write = output.write
+
+        parsed = 0
+
+        for i, line in enumerate(lines):
+            if any(character in line for character in special) or len(line) > limit:
+                parsed += 1
+                # If many lines have special characters, parse the remaining lines, which is faster than switching.
+                if parsed >= PARSE_ALL_THRESHOLD and parsed * 4 > i:
+                    rows = agate.csv.reader(itertools.chain([line], lines.iterator), **self.reader_kwargs)
+                    self.write_rows(output, rows, column_ids)
+                    return
+
+                lines.push(line)
+                self.write_rows(output, [next(reader)], column_ids)
+                continue
+
+            # Fields after the last selected column are left unsplit.
+            fields = line.rstrip('\n').split(delimiter, width)
+            if len(fields) < width:
+                self.write_rows(output, [fields], column_ids)
+                continue
+
+            out_row = getter(fields)
+            if self.args.delete_empty and not any(out_row):
+                continue
+
+            text = ','.join(out_row)
+            # The CSV writer quotes a row with a single empty field, to distinguish it from a blank line.
+            if text:
+                write(text + '\n')
+            else:
                 output.writerow(out_row)
 
 
+class PushbackIterator:
+    """
+    An iterator whose items can be pushed back, to be returned by the next call to :code:`next`.
+    """
+
+    def __init__(self, iterable):
+        self.iterator = iter(iterable)
+        self.pushed = []
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.pushed:
+            return self.pushed.pop()
+        return next(self.iterator)
+
+    def push(self, item):
+        self.pushed.append(item)
+
+
 def launch_new_instance():
     utility = CSVCut()
     utility.run()
@@ -2,9 +2,7 @@
 import itertools
 import sys
 
-import agate
-
-from csvkit.cli import QUOTING_CHOICES, CSVKitUtility, make_default_headers
+from csvkit.cli import QUOTING_CHOICES, CSVKitUtility, csv_reader, make_default_headers, table_from_csv
 
 
 class CSVFormat(CSVKitUtility):
@@ -72,10 +70,10 @@ class CSVFormat(CSVKitUtility):
         if self.additional_input_expected():
             sys.stderr.write('No input file or piped data provided. Waiting for standard input:\n')
 
-        writer = agate.csv.writer(self.output_file, **self.writer_kwargs)
+        writer = self.get_output_writer()
 
         if self.args.out_quoting == 2:
-            table = agate.Table.from_csv(
+            table = table_from_csv(
                 self.input_file,
                 skip_lines=self.args.skip_lines,
                 column_types=self.get_column_types(),
@@ -88,7 +86,7 @@ class CSVFormat(CSVKitUtility):
 
             writer.writerows(table.rows)
         else:
-            reader = agate.csv.reader(self.skip_lines(), **self.reader_kwargs)
+            reader = csv_reader(self.skip_lines(), **self.reader_kwargs)
             if self.args.no_header_row:
                 # Peek at a row to get the number of columns.
                 _row = next(reader)
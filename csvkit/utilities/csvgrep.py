@@ -1,13 +1,17 @@
 #!/usr/bin/env python
 
+import functools
+import io
+import itertools
 import re
 import sys
 from argparse import FileType
 
 import agate
 
-from csvkit.cli import CSVKitUtility
-from csvkit.grep import FilteringCSVReader
+from csvkit.cli import CSVKitUtility, make_default_headers, process_map, read_range_rows
+from csvkit.grep import (AhoCorasick, FilteringCSVReader, NumberRange, PrefilteringCSVReader, RowExpression,
+                         required_substring)
 
 
 class CSVGrep(CSVKitUtility):
@@ -31,12 +35,38 @@ class CSVGrep(CSVKitUtility):
             '-f', '--file', dest='matchfile', type=FileType('r'), action='store',
             help='A path to a file. For each row, if any line in the file (stripped of line separators) is an exact '
                  'match of the cell value, the row matches.')
+        self.argparser.add_argument(
+            '--match-any-substring-file', dest='substring_file', type=FileType('r'), action='store',
+            help='A path to a file. For each row, if any line in the file (stripped of line separators) is a '
+                 'substring of the cell value, the row matches. Blank lines are ignored.')
+        self.argparser.add_argument(
+            '--gt', dest='gt', type=float,
+            help='A number. For each row, if the cell value is a number greater than this number, the row matches.')
+        self.argparser.add_argument(
+            '--lt', dest='lt', type=float,
+            help='A number. For each row, if the cell value is a number less than this number, the row matches.')
+        self.argparser.add_argument(
+            '--between', dest='between', type=float, nargs=2, metavar=('MIN', 'MAX'),
+            help='Two numbers. For each row, if the cell value is a number from MIN to MAX, inclusive, the row '
+                 'matches. May be combined with --gt and --lt.')
+        self.argparser.add_argument(
+            '--where', dest='where',
+            help='A Python expression of column names to test each row against, e.g. "amount > 100 and region == '
+                 '\'EU\'". Other column names and indices can be written between backticks. May be combined with '
+                 '-c and a pattern, in which case both must match.')
         self.argparser.add_argument(
             '-i', '--invert-match', dest='inverse', action='store_true',
             help='Select non-matching rows, instead of matching rows.')
         self.argparser.add_argument(
             '-a', '--any-match', dest='any_match', action='store_true',
             help='Select rows in which any column matches, instead of all columns.')
+        self.argparser.add_argument(
+            '--jobs', dest='jobs', type=int, default=1,
+            help='The number of processes in which to search the input file, in parallel, up to the number of CPU '
+                 'cores. Standard input, compressed files and files smaller than 1 MiB are searched in one process.')
+        self.argparser.add_argument(
+            '--unordered', dest='ordered', action='store_false',
+            help='With --jobs, output matching rows as soon as they are found, instead of in input order.')
 
     def main(self):
         if self.args.names_only:
@@ -46,40 +76,189 @@ class CSVGrep(CSVKitUtility):
         if self.additional_input_expected():
             sys.stderr.write('No input file or piped data provided. Waiting for standard input:\n')
 
-        if not self.args.columns:
-            self.argparser.error('You must specify at least one column to search using the -c option.')
+        has_pattern = not (
+            self.args.regex is None
+            and self.args.pattern is None
+            and self.args.matchfile is None
+            and self.args.substring_file is None
+            and self.args.gt is None
+            and self.args.lt is None
+            and self.args.between is None
+        )
+
+        if self.args.where is None or self.args.columns or has_pattern:
+            if not self.args.columns:
+                self.argparser.error('You must specify at least one column to search using the -c option.')
+
+            if not has_pattern:
+                if self.args.where is None:
+                    self.argparser.error(
+                        'One of -r, -m, -f, --match-any-substring-file, --gt, --lt, --between or --where must be '
+                        'specified, unless using the -n option.')
+                self.argparser.error('-c requires one of -r, -m, -f, --match-any-substring-file, --gt, --lt or '
+                                     '--between.')
+
+        if self.args.jobs < 1:
+            self.argparser.error('--jobs must be greater than 0.')
 
-        if self.args.regex is None and self.args.pattern is None and self.args.matchfile is None:
-            self.argparser.error('One of -r, -m or -f must be specified, unless using the -n option.')
+        jobs = self.get_jobs()
+        if jobs > 1:
+            split = self.get_input_ranges(jobs)
+        else:
+            split = None
 
         reader_kwargs = self.reader_kwargs
         writer_kwargs = self.writer_kwargs
         # Move the line_numbers option from the writer to the reader.
-        if writer_kwargs.pop('line_numbers', False):
+        line_numbers = writer_kwargs.pop('line_numbers', False)
+        if line_numbers:
             reader_kwargs['line_numbers'] = True
 
-        rows, column_names, column_ids = self.get_rows_and_column_names_and_column_ids(**reader_kwargs)
-
         if self.args.regex:
             pattern = re.compile(self.args.regex)
         elif self.args.matchfile:
             lines = {line.rstrip() for line in self.args.matchfile}
             self.args.matchfile.close()
+            # A bound method, unlike a closure, can be sent to another process.
+            pattern = lines.__contains__
+        elif self.args.substring_file:
+            pattern = AhoCorasick({line.rstrip() for line in self.args.substring_file} - {''})
+            self.args.substring_file.close()
+        elif self.args.pattern is not None:
+            pattern = self.args.pattern
+        elif self.args.gt is not None or self.args.lt is not None or self.args.between is not None:
+            minimum, maximum = self.args.between or (None, None)
+            pattern = NumberRange(gt=self.args.gt, lt=self.args.lt, ge=minimum, le=maximum)
+        else:
+            pattern = None
+
+        # A matching cell's text is in its record's text, so records without the text needn't be parsed. An inverse
+        # match must parse all records.
+        literal = None
+        if not self.args.inverse:
+            if isinstance(pattern, re.Pattern):
+                literal = required_substring(pattern)
+            elif isinstance(pattern, str):
+                literal = pattern
 
-            def pattern(x):
-                return x in lines
+        if literal:
+            reader = functools.partial(PrefilteringCSVReader, literal=literal)
         else:
-            pattern = self.args.pattern
+            reader = agate.csv.reader
+
+        if split is None:
+            rows, column_names, column_ids = self.get_rows_and_column_names_and_column_ids(reader, **reader_kwargs)
+        else:
+            header_row, range_reader_kwargs, ranges = split
 
-        patterns = {column_id: pattern for column_id in column_ids}
-        filter_reader = FilteringCSVReader(rows, header=False, patterns=patterns,
-                                           inverse=self.args.inverse, any_match=self.args.any_match)
+            if not line_numbers:
+                column_names = header_row
+            elif self.args.no_header_row:
+                column_names = make_default_headers(len(header_row) + 1)
+            else:
+                column_names = ['line_numbers', *header_row]
 
-        output = agate.csv.writer(self.output_file, **writer_kwargs)
+            column_ids = self.get_column_ids(column_names, line_numbers)
+
+        if has_pattern:
+            patterns = {column_id: pattern for column_id in column_ids}
+        else:
+            patterns = {}
+
+        where = None
+        if self.args.where is not None and column_names:
+            try:
+                where = RowExpression(self.args.where, column_names,
+                                      self.get_column_offset() - (1 if line_numbers else 0))
+            except ValueError as e:
+                self.argparser.error(str(e))
+
+        output = self.get_output_writer()
         output.writerow(column_names)
 
-        for row in filter_reader:
-            output.writerow(row)
+        if split is None:
+            output.writerows(filter_rows(rows, patterns, self.args.inverse, self.args.any_match, where))
+        else:
+            if line_numbers:
+                # A row's line number is the number of lines read by the CSV reader up to the end of the row, less
+                # the header row, so each range's line numbers start after the lines in the preceding ranges.
+                first_line = 0 if self.args.no_header_row else -1
+                line_offsets = [count - self.args.skip_lines + first_line
+                                for count in count_newlines(self.args.input_path, [start for start, _ in ranges])]
+            else:
+                line_offsets = [None] * len(ranges)
+
+            search = functools.partial(
+                search_range, self.args.input_path, self.args.encoding, reader, range_reader_kwargs, writer_kwargs,
+                patterns, self.args.inverse, self.args.any_match, where,
+            )
+
+            for text in process_map(search, [(*r, o) for r, o in zip(ranges, line_offsets)], jobs,
+                                    ordered=self.args.ordered):
+                output.write(text, rows=text.count('\n'))
+
+
+def filter_rows(rows, patterns, inverse=False, any_match=False, where=None):
+    """
+    Return the rows that match the patterns, like :class:`csvkit.grep.FilteringCSVReader`, and that satisfy the
+    ``where`` expression, if any. If ``inverse`` is set, return the other rows.
+    """
+    if where is None:
+        return FilteringCSVReader(rows, header=False, patterns=patterns, inverse=inverse, any_match=any_match)
+
+    if patterns:
+        test_row = FilteringCSVReader(iter(()), header=False, patterns=patterns, any_match=any_match).test_row
+
+        def predicate(row):
+            return test_row(row) and where(row)
+    else:
+        predicate = where
+
+    if inverse:
+        return itertools.filterfalse(predicate, rows)
+    return filter(predicate, rows)
+
+
+def count_newlines(path, offsets):
+    """
+    Return the number of newlines before each of the sorted byte offsets in a file.
+    """
+    counts = []
+    count = 0
+    position = 0
+
+    with open(path, 'rb') as f:
+        for offset in offsets:
+            while position < offset:
+                block = f.read(min(1 << 20, offset - position))
+                if not block:
+                    break
+                count += block.count(b'\n')
+                position += len(block)
+            counts.append(count)
+
+    return counts
+
+
+def search_range(path, encoding, reader, reader_kwargs, writer_kwargs, patterns, inverse, any_match, where, start,
+                 end, line_offset):
+    """
+    Return the matching rows in a byte range of a CSV file, as CSV text. If ``line_offset`` isn't ``None``, the rows
+    are prefixed with their line numbers, counted from the line offset.
+    """
+    reader = read_range_rows(path, start, end, encoding, reader, **reader_kwargs)
+
+    if line_offset is None:
+        rows = reader
+    else:
+        rows = ([str(line_offset + reader.line_num), *row] for row in reader)
+
+    f = io.StringIO()
+    output = agate.csv.writer(f, **writer_kwargs)
+    for row in filter_rows(rows, patterns, inverse, any_match, where):
+        output.writerow(row)
+
+    return f.getvalue()
 
 
 def launch_new_instance():
@@ -1,15 +1,20 @@
 #!/usr/bin/env python
 
+import functools
+import os
 import sys
+import tempfile
 
 import agate
 
 from csvkit.cli import CSVKitUtility, isatty, match_column_identifier
+from csvkit.join import StreamingTable, hash_join, merge_join
 
 
 class CSVJoin(CSVKitUtility):
     description = 'Execute a SQL-like join to merge CSV files on a specified column or columns.'
-    epilog = "Note that the join operation requires reading all files into memory. Don't try this on very large files."
+    epilog = "Note that the join operation requires reading all files into memory. Use --stream to join a very " \
+             "large file to smaller files."
     # Override 'f' because the utility accepts multiple files.
     override_flags = ['f']
 
@@ -41,6 +46,14 @@ class CSVJoin(CSVKitUtility):
             '-I', '--no-inference', dest='no_inference', action='store_true',
             help='Disable type inference (and --locale, --date-format, --datetime-format, --no-leading-zeroes) '
                  'when parsing the input.')
+        self.argparser.add_argument(
+            '--stream', dest='stream', action='store_true',
+            help='Read one file a row at a time, instead of reading all files into memory: the last file for a right '
+                 'join, the larger of two files for an inner join, and the first file otherwise.')
+        self.argparser.add_argument(
+            '--presorted', dest='presorted', action='store_true',
+            help='Read all files a row at a time, if all files are sorted by their join columns in ascending order, '
+                 'with nulls last, as csvsort sorts them. Errors if a file is not sorted.')
 
     def main(self):
         if isatty(sys.stdin) and self.args.input_paths == ['-']:
@@ -67,8 +80,13 @@ class CSVJoin(CSVKitUtility):
         if self.args.left_join and self.args.right_join:
             self.argparser.error('It is not valid to specify both a left and a right join.')
 
-        tables = []
         sniff_limit = self.args.sniff_limit if self.args.sniff_limit != -1 else None
+
+        if self.args.stream or self.args.presorted:
+            self.main_stream(join_column_names if self.args.columns else None, sniff_limit)
+            return
+
+        tables = []
         column_types = self.get_column_types()
 
         for f in self.input_files:
@@ -117,6 +135,92 @@ class CSVJoin(CSVKitUtility):
 
         jointab.to_csv(self.output_file, **self.writer_kwargs)
 
+    def main_stream(self, join_column_names, sniff_limit):
+        n = len(self.input_files)
+        inner_join = self.args.columns and not (self.args.left_join or self.args.right_join or self.args.outer_join)
+
+        if self.args.presorted:
+            stream_indices = range(n)
+        elif self.args.right_join:
+            stream_indices = [n - 1]
+        elif inner_join and n == 2:
+            sizes = [self._input_size(path) for path in self.args.input_paths]
+            stream_indices = [sizes.index(max(sizes))]
+        else:
+            stream_indices = [0]
+
+        column_types = self.get_column_types()
+
+        with tempfile.TemporaryDirectory(prefix='csvjoin') as directory:
+            if self.args.presorted:
+                join = functools.partial(merge_join, directory=directory)
+            else:
+                join = hash_join
+
+            tables = []
+
+            for i, f in enumerate(self.input_files):
+                if i in stream_indices:
+                    rows, column_names = self.get_rows_and_column_names(f, sniff_limit=sniff_limit)
+                    types, rows = self.get_column_types_and_cast_rows(rows, column_names, directory)
+                    tables.append(StreamingTable(rows, column_names, types))
+                else:
+                    tables.append(agate.Table.from_csv(
+                        f,
+                        skip_lines=self.args.skip_lines,
+                        sniff_limit=sniff_limit,
+                        column_types=column_types,
+                        **self.reader_kwargs,
+                    ))
+                    f.close()
+
+            join_column_ids = []
+
+            if join_column_names:
+                for i, table in enumerate(tables):
+                    join_column_ids.append(match_column_identifier(table.column_names, join_column_names[i]))
+
+            jointab = tables[0]
+
+            if self.args.left_join:
+                for i, table in enumerate(tables[1:]):
+                    jointab = join(jointab, table, join_column_ids[0], join_column_ids[i + 1])
+            elif self.args.right_join:
+                jointab = tables[-1]
+
+                remaining_tables = tables[:-1]
+                remaining_tables.reverse()
+
+                for i, table in enumerate(remaining_tables):
+                    jointab = join(jointab, table, join_column_ids[-1], join_column_ids[-(i + 2)])
+            elif self.args.outer_join:
+                for i, table in enumerate(tables[1:]):
+                    jointab = join(jointab, table, join_column_ids[0], join_column_ids[i + 1], full_outer=True)
+            elif self.args.columns:
+                kwargs = {}
+                # If the second of two files is larger, build the hash index on the first file.
+                if stream_indices == [1]:
+                    kwargs['build_left'] = True
+
+                for i, table in enumerate(tables[1:]):
+                    jointab = join(jointab, table, join_column_ids[0], join_column_ids[i + 1], inner=True, **kwargs)
+            else:
+                for table in tables[1:]:
+                    jointab = join(jointab, table)
+
+            jointab.to_csv(self.output_file, **self.writer_kwargs)
+
+            for i in stream_indices:
+                self.input_files[i].close()
+
+    def _input_size(self, path):
+        """
+        Return the size of the input file in bytes, or infinity if it is standard input.
+        """
+        if path == '-':
+            return float('inf')
+        return os.path.getsize(path)
+
     def _parse_join_column_names(self, join_string):
         """
         Parse a list of join columns.
@@ -4,9 +4,7 @@ import json
 import sys
 from collections import OrderedDict
 
-import agate
-
-from csvkit.cli import CSVKitUtility, default_str_decimal, match_column_identifier
+from csvkit.cli import CSVKitUtility, csv_reader, default_str_decimal, match_column_identifier, table_from_csv
 
 
 class CSVJSON(CSVKitUtility):
@@ -113,7 +111,7 @@ class CSVJSON(CSVKitUtility):
 
     def read_csv_to_table(self):
         sniff_limit = self.args.sniff_limit if self.args.sniff_limit != -1 else None
-        return agate.Table.from_csv(
+        return table_from_csv(
             self.input_file,
             skip_lines=self.args.skip_lines,
             sniff_limit=sniff_limit,
@@ -140,7 +138,7 @@ class CSVJSON(CSVKitUtility):
             self.dump_json(geojson_generator.generate_feature_collection(table))
 
     def streaming_output_ndjson(self):
-        rows = agate.csv.reader(self.input_file, **self.reader_kwargs)
+        rows = csv_reader(self.input_file, **self.reader_kwargs)
         column_names = next(rows)
 
         for row in rows:
@@ -153,7 +151,7 @@ class CSVJSON(CSVKitUtility):
             self.dump_json(data, newline=True)
 
     def streaming_output_ndgeojson(self):
-        rows = agate.csv.reader(self.input_file, **self.reader_kwargs)
+        rows = csv_reader(self.input_file, **self.reader_kwargs)
         column_names = next(rows)
         geojson_generator = self.GeoJsonGenerator(self.args, column_names)
 
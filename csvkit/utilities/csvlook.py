@@ -1,9 +1,8 @@
 #!/usr/bin/env python
 
-import agate
 from agate import config
 
-from csvkit.cli import CSVKitUtility
+from csvkit.cli import CSVKitUtility, table_from_csv
 
 
 class CSVLook(CSVKitUtility):
@@ -47,7 +46,7 @@ class CSVLook(CSVKitUtility):
             config.set_option('number_truncation_chars', '')
 
         sniff_limit = self.args.sniff_limit if self.args.sniff_limit != -1 else None
-        table = agate.Table.from_csv(
+        table = table_from_csv(
             self.input_file,
             skip_lines=self.args.skip_lines,
             sniff_limit=sniff_limit,
@@ -0,0 +1,38 @@
+#!/usr/bin/env python
+
+import argparse
+import shlex
+
+from csvkit.pipeline import LAST_TOOLS, ROW_TOOLS, PipelineError, run_pipeline
+
+
+def launch_new_instance():
+    parser = argparse.ArgumentParser(
+        prog='csvpipe',
+        description='Run a pipeline of csvkit commands in one process, passing rows from one command to the next '
+                    'without formatting and parsing CSV between them.',
+        epilog=f'Supported commands: {", ".join(sorted(ROW_TOOLS))}, and as the last command '
+               f'{", ".join(sorted(LAST_TOOLS))}. Example: csvpipe "csvcut -c 1,3 data.csv" "csvgrep -c 1 -m x" '
+               '"csvsort -c 2"',
+    )
+    parser.add_argument(
+        metavar='COMMAND', nargs='+', dest='commands',
+        help='A command, quoted as a single argument. Only the first command can have an input file. If it has no '
+             'input file, it reads standard input. The last command writes to standard output.')
+    parser.add_argument(
+        '-V', '--version', action='version', version='%(prog)s 2.2.0',
+        help='Display version information and exit.')
+    args = parser.parse_args()
+
+    commands = [shlex.split(command) for command in args.commands]
+    if not all(commands):
+        parser.error('Commands must not be empty.')
+
+    try:
+        run_pipeline(commands)
+    except PipelineError as e:
+        parser.error(str(e))
+
+
+if __name__ == '__main__':
+    launch_new_instance()
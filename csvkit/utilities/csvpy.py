@@ -10,7 +10,7 @@ from csvkit.cli import CSVKitUtility
 
 class CSVPy(CSVKitUtility):
     description = 'Load a CSV file into a CSV reader and then drop into a Python shell.'
-    override_flags = ['l', 'zero', 'add-bom']
+    override_flags = ['l', 'zero', 'add-bom', 'o']
 
     def add_arguments(self):
         self.argparser.add_argument(
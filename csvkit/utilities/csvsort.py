@@ -1,8 +1,14 @@
 #!/usr/bin/env python
 
+import heapq
+import tempfile
+
 import agate
 
-from csvkit.cli import CSVKitUtility, parse_column_identifiers
+from csvkit.cli import CSVKitUtility, chunks, parse_column_identifiers, read_rows, table_from_csv, write_rows
+
+# The maximum number of run files to merge at once.
+MERGE_FAN_IN = 64
 
 
 def ignore_case_sort(key):
@@ -16,6 +22,38 @@ def ignore_case_sort(key):
     return inner
 
 
+def sort_key(key):
+    """
+    Return a function that returns a row's sort key, like :meth:`agate.Table.order_by`.
+    """
+    if callable(key):
+        def inner(row):
+            k = key(row)
+            return agate.NullOrder() if k is None else k
+    else:
+        def inner(row):
+            return tuple(agate.NullOrder() if row[n] is None else row[n] for n in key)
+
+    return inner
+
+
+def external_sort(rows, key, reverse=False, buffer_size=100000, directory=None):
+    """
+    Sort rows that might not fit in memory. Runs of at most ``buffer_size`` rows are sorted in memory and written to
+    temporary files in ``directory``, then the runs are merged. Like :func:`sorted`, the sort is stable.
+    """
+    runs = [write_rows(directory, sorted(chunk, key=key, reverse=reverse)) for chunk in chunks(rows, buffer_size)]
+
+    # Merge in passes, to limit the number of open files.
+    while len(runs) > MERGE_FAN_IN:
+        runs = [
+            write_rows(directory, heapq.merge(*map(read_rows, runs[i:i + MERGE_FAN_IN]), key=key, reverse=reverse))
+            for i in range(0, len(runs), MERGE_FAN_IN)
+        ]
+
+    return heapq.merge(*map(read_rows, runs), key=key, reverse=reverse)
+
+
 class CSVSort(CSVKitUtility):
     description = 'Sort CSV files. Like the Unix "sort" command, but for tabular data.'
 
@@ -41,6 +79,13 @@ class CSVSort(CSVKitUtility):
             '-I', '--no-inference', dest='no_inference', action='store_true',
             help='Disable type inference (and --locale, --date-format, --datetime-format, --no-leading-zeroes) '
                  'when parsing the input.')
+        self.argparser.add_argument(
+            '--external', dest='external', action='store_true',
+            help='Sort files that are larger than memory, by sorting batches of rows and merging them via temporary '
+                 'files.')
+        self.argparser.add_argument(
+            '--buffer-size', dest='buffer_size', type=int, default=100000,
+            help='The number of rows to sort in memory at a time, if --external is set.')
 
     def main(self):
         if self.args.names_only:
@@ -50,8 +95,16 @@ class CSVSort(CSVKitUtility):
         if self.additional_input_expected():
             self.argparser.error('You must provide an input file or piped data.')
 
+        if self.args.buffer_size < 1:
+            self.argparser.error('--buffer-size must be greater than 0.')
+
         sniff_limit = self.args.sniff_limit if self.args.sniff_limit != -1 else None
-        table = agate.Table.from_csv(
+
+        if self.args.external:
+            self.main_external(sniff_limit)
+            return
+
+        table = table_from_csv(
             self.input_file,
             skip_lines=self.args.skip_lines,
             sniff_limit=sniff_limit,
@@ -69,7 +122,37 @@ class CSVSort(CSVKitUtility):
             key = ignore_case_sort(key)
 
         table = table.order_by(key, reverse=self.args.reverse)
-        table.to_csv(self.output_file, **self.writer_kwargs)
+
+        # Like table.to_csv().
+        output = self.get_output_writer()
+        output.writerow(table.column_names)
+
+        csv_funcs = [column_type.csvify for column_type in table.column_types]
+        output.writerows(tuple(csv_funcs[i](d) for i, d in enumerate(row)) for row in table.rows)
+
+    def main_external(self, sniff_limit):
+        rows, column_names = self.get_rows_and_column_names(sniff_limit=sniff_limit)
+
+        key = parse_column_identifiers(
+            self.args.columns,
+            column_names,
+            self.get_column_offset(),
+        )
+
+        if self.args.ignore_case:
+            key = ignore_case_sort(key)
+
+        with tempfile.TemporaryDirectory(prefix='csvsort') as directory:
+            column_types, rows = self.get_column_types_and_cast_rows(rows, column_names, directory)
+            rows = external_sort(
+                rows, sort_key(key), reverse=self.args.reverse, buffer_size=self.args.buffer_size, directory=directory
+            )
+
+            output = self.get_output_writer()
+            output.writerow(column_names)
+
+            csv_funcs = [column_type.csvify for column_type in column_types]
+            output.writerows(tuple(csv_funcs[i](d) for i, d in enumerate(row)) for row in rows)
 
 
 def launch_new_instance():
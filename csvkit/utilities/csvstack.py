@@ -102,10 +102,10 @@ class CSVStack(CSVKitUtility):
             headers.insert(0, group_name)
 
         if use_fieldnames:
-            output = agate.csv.DictWriter(self.output_file, fieldnames=headers, **self.writer_kwargs)
+            output = self.get_output_writer(fieldnames=headers)
             output.writeheader()
         else:
-            output = agate.csv.writer(self.output_file, **self.writer_kwargs)
+            output = self.get_output_writer()
             output.writerow(headers)
 
         for i, path in enumerate(self.args.input_paths):
@@ -133,18 +133,24 @@ class CSVStack(CSVKitUtility):
             if file_is_stdin and stdin_first_row:
                 output.writerow(stdin_first_row)
 
-            for row in rows:
-                if has_groups:
-                    if use_fieldnames:
-                        row[group_name] = group
-                    else:
-                        row.insert(0, group)
+            if has_groups:
+                rows = _add_group(rows, group_name if use_fieldnames else None, group)
 
-                output.writerow(row)
+            output.writerows(rows)
 
             f.close()
 
 
+def _add_group(rows, group_name, group):
+    for row in rows:
+        if group_name is None:
+            row.insert(0, group)
+        else:
+            row[group_name] = group
+
+        yield row
+
+
 def launch_new_instance():
     utility = CSVStack()
     utility.run()
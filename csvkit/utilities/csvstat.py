@@ -1,5 +1,6 @@
 #!/usr/bin/env python
 
+import functools
 import json
 import locale
 import warnings
@@ -8,9 +9,10 @@ from decimal import Decimal
 
 import agate
 
-from csvkit.cli import CSVKitUtility, default_float_decimal, parse_column_identifiers
+from csvkit.cli import (CSVKitUtility, csv_reader, default_float_decimal, parse_column_identifiers, process_map,
+                        read_range_rows, table_from_csv)
+from csvkit.stats import ColumnStats, quantile_list, quantiles
 
-locale.setlocale(locale.LC_ALL, '')
 OPERATIONS = OrderedDict([
     ('type', {
         'aggregation': None,
@@ -65,6 +67,8 @@ OPERATIONS = OrderedDict([
         'label': 'Most common values: ',
     }),
 ])
+# The relative standard error of the unique values, and the maximum overestimate of the most common values' counts.
+APPROX_ERRORS = ['unique_error', 'freq_error']
 
 
 class CSVStat(CSVKitUtility):
@@ -129,6 +133,9 @@ class CSVStat(CSVKitUtility):
         self.argparser.add_argument(
             '--freq-count', dest='freq_count', type=int,
             help='The maximum number of frequent values to display.')
+        self.argparser.add_argument(
+            '--quantiles', dest='quantiles',
+            help='Only output the quantiles at these comma-separated fractions from 0 to 1, e.g. "0.5,0.9,0.99".')
         self.argparser.add_argument(
             '--count', dest='count_only', action='store_true',
             help='Only output total row count.')
@@ -147,6 +154,23 @@ class CSVStat(CSVKitUtility):
             '-I', '--no-inference', dest='no_inference', action='store_true',
             help='Disable type inference (and --locale, --date-format, --datetime-format, --no-leading-zeroes) '
                  'when parsing the input.')
+        self.argparser.add_argument(
+            '--stream', dest='stream', action='store_true',
+            help='Calculate statistics in one pass over the input, instead of reading it into memory. Counting '
+                 'unique values, most common values and medians still requires memory for each distinct value.')
+        self.argparser.add_argument(
+            '--approx', dest='approx', action='store_true',
+            help='Approximate unique values, most common values, medians and quantiles in constant memory, like '
+                 '--stream. Error bounds are reported with --csv and --json.')
+        self.argparser.add_argument(
+            '--jobs', dest='jobs', type=int, default=1,
+            help='Calculate statistics in this many processes, like --stream, up to the number of CPU cores. Each '
+                 'process reads a part of the input file. The input is read in one process if it is piped data, '
+                 'compressed or smaller than 1 MiB.')
+        self.argparser.add_argument(
+            '--sketch-size', dest='sketch_size', type=int, default=200,
+            help='The size of the quantile sketch, if --approx is set. Larger sizes are more accurate and use more '
+                 'memory.')
 
     def main(self):
         if self.args.names_only:
@@ -156,8 +180,15 @@ class CSVStat(CSVKitUtility):
         if self.additional_input_expected():
             self.argparser.error('You must provide an input file or piped data.')
 
+        # Numbers are formatted in the user's locale. It is set when the tool runs, not when the module is imported, so
+        # that importing the module has no side effects.
+        locale.setlocale(locale.LC_ALL, '')
+
         operations = [op for op in OPERATIONS.keys() if getattr(self.args, op + '_only')]
 
+        if self.args.quantiles is not None:
+            operations.append('quantiles')
+
         if len(operations) > 1:
             self.argparser.error('Only one operation argument may be specified (--mean, --median, etc).')
 
@@ -171,8 +202,13 @@ class CSVStat(CSVKitUtility):
             self.argparser.error(
                 'You may not specify --count and an operation (--mean, --median, etc) at the same time.')
 
+        if self.args.sketch_size < 1:
+            self.argparser.error('--sketch-size must be greater than 0.')
+        if self.args.jobs < 1:
+            self.argparser.error('--jobs must be greater than 0.')
+
         if self.args.count_only:
-            count = len(list(agate.csv.reader(self.skip_lines(), **self.reader_kwargs)))
+            count = len(list(csv_reader(self.skip_lines(), **self.reader_kwargs)))
 
             if not self.args.no_header_row:
                 count -= 1
@@ -182,44 +218,69 @@ class CSVStat(CSVKitUtility):
             return
 
         sniff_limit = self.args.sniff_limit if self.args.sniff_limit != -1 else None
-        table = agate.Table.from_csv(
-            self.input_file,
-            skip_lines=self.args.skip_lines,
-            sniff_limit=sniff_limit,
-            column_types=self.get_column_types(),
-            **self.reader_kwargs,
-        )
-
-        column_ids = parse_column_identifiers(
-            self.args.columns,
-            table.column_names,
-            self.get_column_offset(),
-        )
 
         kwargs = {}
 
         if self.args.freq_count:
             kwargs['freq_count'] = self.args.freq_count
 
+        if self.args.quantiles is not None:
+            try:
+                kwargs['fractions'] = [float(fraction) for fraction in self.args.quantiles.split(',')]
+            except ValueError:
+                kwargs['fractions'] = []
+            if not kwargs['fractions'] or not all(0 <= fraction <= 1 for fraction in kwargs['fractions']):
+                self.argparser.error('--quantiles must be a comma-separated list of numbers from 0 to 1.')
+
+        if self.args.stream or self.args.approx or self.args.jobs > 1:
+            column_names, column_types, row_count, column_ids, stats = self.calculate_stats_stream(
+                sniff_limit, operations, **kwargs
+            )
+        else:
+            table = table_from_csv(
+                self.input_file,
+                skip_lines=self.args.skip_lines,
+                sniff_limit=sniff_limit,
+                column_types=self.get_column_types(),
+                **self.reader_kwargs,
+            )
+
+            column_names = table.column_names
+            column_types = table.column_types
+            row_count = len(table.rows)
+
+            column_ids = parse_column_identifiers(
+                self.args.columns,
+                table.column_names,
+                self.get_column_offset(),
+            )
+
+            stats = {}
+
+            for column_id in column_ids:
+                if operations:
+                    op_name = operations[0]
+                    stats[column_id] = {
+                        op_name: self._calculate_stat(table, column_id, op_name, OPERATIONS.get(op_name), **kwargs),
+                    }
+                else:
+                    stats[column_id] = self.calculate_stats(table, column_id, **kwargs)
+
         # Output a single stat
         if operations:
+            op_name = operations[0]
             if len(column_ids) == 1:
-                self.print_one(table, column_ids[0], operations[0], label=False, **kwargs)
+                self.print_one(column_names, column_ids[0], op_name, stats[column_ids[0]][op_name], label=False)
             else:
                 for column_id in column_ids:
-                    self.print_one(table, column_id, operations[0], **kwargs)
+                    self.print_one(column_names, column_id, op_name, stats[column_id][op_name])
         else:
-            stats = {}
-
-            for column_id in column_ids:
-                stats[column_id] = self.calculate_stats(table, column_id, **kwargs)
-
             if self.args.csv_output:
-                self.print_csv(table, column_ids, stats)
+                self.print_csv(column_names, column_ids, stats)
             elif self.args.json_output:
-                self.print_json(table, column_ids, stats)
+                self.print_json(column_names, column_ids, stats)
             else:
-                self.print_stats(table, column_ids, stats)
+                self.print_stats(column_names, column_types, row_count, column_ids, stats)
 
     def is_finite_decimal(self, value):
         return isinstance(value, Decimal) and value.is_finite()
@@ -235,27 +296,31 @@ class CSVStat(CSVKitUtility):
                     return getter(table, column_id, **kwargs)
 
                 op = op_data['aggregation']
-                v = table.aggregate(op(column_id))
-
-                if self.is_finite_decimal(v) and not self.args.json_output:
-                    return format_decimal(v, self.args.decimal_format, self.args.no_grouping_separator)
-
-                return v
+                return self._format_stat(table.aggregate(op(column_id)))
             except Exception:
                 pass
 
-    def print_one(self, table, column_id, op_name, label=True, **kwargs):
+    def _format_stat(self, v):
+        if self.is_finite_decimal(v) and not self.args.json_output:
+            return format_decimal(v, self.args.decimal_format, self.args.no_grouping_separator)
+
+        return v
+
+    def print_one(self, column_names, column_id, op_name, stat, label=True):
         """
         Print data for a single statistic.
         """
-        column_name = table.column_names[column_id]
-
-        stat = self._calculate_stat(table, column_id, op_name, OPERATIONS[op_name], **kwargs)
+        column_name = column_names[column_id]
 
         # Formatting
         if op_name == 'freq':
             stat = ', '.join([f"\"{str(row['value'])}\": {row['count']}" for row in stat])
             stat = '{ %s }' % stat
+        elif op_name == 'quantiles' and stat is not None:
+            stat = ', '.join([
+                f"\"{str(row['quantile']).removesuffix('.0')}\": {self._format_stat(row['value'])}" for row in stat
+            ])
+            stat = '{ %s }' % stat
 
         if label:
             self.output_file.write('%3i. %s: %s\n' % (column_id + 1, column_name, stat))
@@ -271,15 +336,94 @@ class CSVStat(CSVKitUtility):
             for op_name, op_data in OPERATIONS.items()
         }
 
-    def print_stats(self, table, column_ids, stats):
+    def calculate_stats_stream(self, sniff_limit, operations, freq_count=5, fractions=()):
+        """
+        Calculate stats for all valid operations, or for the given operation, in one pass over the input, without
+        reading it into memory.
+        """
+        def needs(op_name):
+            return not operations or operations[0] == op_name
+
+        if self.args.approx:
+            kwargs = {'counts': False, 'distinct': needs('unique'), 'top': needs('freq')}
+            if needs('median') or needs('quantiles'):
+                kwargs['sketch_size'] = self.args.sketch_size
+        else:
+            # Only these operations require counting the distinct values.
+            kwargs = {'counts': needs('unique') or needs('freq') or needs('median') or needs('quantiles')}
+
+        possible_types = self.get_possible_column_types()
+        jobs = self.get_jobs()
+        split = self.get_input_ranges(jobs, sniff_limit) if jobs > 1 else None
+
+        if split is None:
+            rows, column_names = self.get_rows_and_column_names(sniff_limit=sniff_limit)
+        else:
+            column_names, reader_kwargs, ranges = split
+            column_names = tuple(agate.utils.deduplicate(column_names, column_names=True))
+
+        column_ids = parse_column_identifiers(
+            self.args.columns,
+            column_names,
+            self.get_column_offset(),
+        )
+
+        len_column_names = len(column_names)
+
+        if split is None:
+            accumulators = [(column_id, ColumnStats(possible_types, **kwargs)) for column_id in column_ids]
+            row_count, len_row = add_rows(rows, accumulators, len_column_names)
+        else:
+            accumulators = None
+            row_count = 0
+            len_row = None
+
+            calculate = functools.partial(
+                calculate_range_stats, self.args.input_path, self.args.encoding, reader_kwargs, len_column_names,
+                column_ids, possible_types, kwargs,
+            )
+
+            # The ranges are merged in order, so that the statistics are the same as if read in one process.
+            results = process_map(calculate, ranges, jobs)
+            for range_row_count, len_row, range_accumulators in results:
+                row_count += range_row_count
+                if len_row is not None:
+                    results.close()
+                    break
+                if accumulators is None:
+                    accumulators = range_accumulators
+                else:
+                    for (_, accumulator), (_, range_accumulator) in zip(accumulators, range_accumulators):
+                        accumulator.update(range_accumulator)
+
+        if len_row is not None:
+            raise ValueError(
+                'Row %i has %i values, but Table only has %i columns.' % (row_count, len_row, len_column_names))
+
+        column_types = {}
+        stats = {}
+
+        for column_id, accumulator in accumulators:
+            column_types[column_id] = accumulator.data_type
+            results = accumulator.results(freq_count, fractions)
+            stats[column_id] = {
+                op_name: self._format_stat(results.get(op_name)) for op_name in (operations or OPERATIONS)
+            }
+            for op_name in APPROX_ERRORS:
+                if op_name in results:
+                    stats[column_id][op_name] = results[op_name]
+
+        return column_names, column_types, row_count, column_ids, stats
+
+    def print_stats(self, column_names, column_types, row_count, column_ids, stats):
         """
         Print data for all statistics.
         """
         label_column_width = max(len(op_data['label']) for op_data in OPERATIONS.values())
 
         for column_id in column_ids:
-            column_name = table.column_names[column_id]
-            column = table.columns[column_id]
+            column_name = column_names[column_id]
+            column_type = column_types[column_id]
             column_stats = stats[column_id]
 
             self.output_file.write('%3i. "%s"\n\n' % (column_id + 1, column_name))
@@ -303,7 +447,7 @@ class CSVStat(CSVKitUtility):
                                 'label': '',
                             }))
 
-                        if isinstance(column.data_type, agate.Number):
+                        if isinstance(column_type, agate.Number):
                             v = row['value']
 
                             if self.is_finite_decimal(v):
@@ -326,43 +470,79 @@ class CSVStat(CSVKitUtility):
 
             self.output_file.write('\n')
 
-        self.output_file.write(f'Row count: {len(table.rows)}\n')
+        self.output_file.write(f'Row count: {row_count}\n')
 
-    def print_csv(self, table, column_ids, stats):
+    def print_csv(self, column_names, column_ids, stats):
         """
         Print data for all statistics as a CSV table.
         """
         header = ['column_id', 'column_name'] + list(OPERATIONS)
+        if self.args.approx:
+            header += APPROX_ERRORS
 
         writer = agate.csv.DictWriter(self.output_file, fieldnames=header)
         writer.writeheader()
 
-        for row in self._rows(table, column_ids, stats):
+        for row in self._rows(column_names, column_ids, stats):
             if 'freq' in row:
                 row['freq'] = ', '.join([str(row['value']) for row in row['freq']])
             writer.writerow(row)
 
-    def print_json(self, table, column_ids, stats):
+    def print_json(self, column_names, column_ids, stats):
         """
         Print data for all statistics as a JSON text.
         """
-        data = list(self._rows(table, column_ids, stats))
+        data = list(self._rows(column_names, column_ids, stats))
 
         json.dump(data, self.output_file, default=default_float_decimal, ensure_ascii=False, indent=self.args.indent)
 
-    def _rows(self, table, column_ids, stats):
+    def _rows(self, column_names, column_ids, stats):
         for column_id in column_ids:
-            column_name = table.column_names[column_id]
+            column_name = column_names[column_id]
             column_stats = stats[column_id]
 
             output_row = {'column_id': column_id + 1, 'column_name': column_name}
             for op_name, _op_data in OPERATIONS.items():
                 if column_stats[op_name] is not None:
                     output_row[op_name] = column_stats[op_name]
+            for op_name in APPROX_ERRORS:
+                if column_stats.get(op_name) is not None:
+                    output_row[op_name] = column_stats[op_name]
 
             yield output_row
 
 
+def add_rows(rows, accumulators, len_column_names):
+    """
+    Add the values of the rows to the accumulators of their columns. Return the number of rows, and the length of the
+    row with too many values, if any, at which point the rows are no longer read.
+    """
+    row_count = 0
+
+    for row in rows:
+        len_row = len(row)
+        if len_row > len_column_names:
+            return row_count, len_row
+
+        for column_id, accumulator in accumulators:
+            accumulator.add(row[column_id] if column_id < len_row else None)
+
+        row_count += 1
+
+    return row_count, None
+
+
+def calculate_range_stats(path, encoding, reader_kwargs, len_column_names, column_ids, possible_types, kwargs, start,
+                          end):
+    """
+    Calculate stats for the rows in a byte range of a file, in a worker process.
+    """
+    rows = read_range_rows(path, start, end, encoding, **reader_kwargs)
+    accumulators = [(column_id, ColumnStats(possible_types, **kwargs)) for column_id in column_ids]
+
+    return *add_rows(rows, accumulators, len_column_names), accumulators
+
+
 def format_decimal(d, f='%.3f', no_grouping_separator=False):
     return locale.format_string(f, d, grouping=not no_grouping_separator).rstrip('0').rstrip('.')
 
@@ -376,6 +556,13 @@ def get_unique(table, column_id, **kwargs):
     return len(table.columns[column_id].values_distinct())
 
 
+def get_quantiles(table, column_id, fractions=(), **kwargs):
+    column = table.columns[column_id]
+    if not isinstance(column.data_type, agate.Number):
+        return None
+    return quantile_list(fractions, quantiles(Counter(column.values()).items(), fractions))
+
+
 def get_freq(table, column_id, freq_count=5, **kwargs):
     values = table.columns[column_id].values()
     return [
@@ -6,10 +6,6 @@ from io import BytesIO
 from os.path import splitext
 
 import agate
-import agatedbf  # noqa: F401
-import agateexcel  # noqa: F401
-import openpyxl
-import xlrd
 
 from csvkit import convert
 from csvkit.cli import CSVKitUtility
@@ -78,8 +74,12 @@ class In2CSV(CSVKitUtility):
     def sheet_names(self, path, filetype):
         input_file = self.open_excel_input_file(path)
         if filetype == 'xls':
+            import xlrd
+
             sheet_names = xlrd.open_workbook(file_contents=input_file.read()).sheet_names()
         else:  # 'xlsx'
+            import openpyxl
+
             sheet_names = openpyxl.load_workbook(input_file, read_only=True, data_only=True).sheetnames
         input_file.close()
         return sheet_names
@@ -102,6 +102,12 @@ class In2CSV(CSVKitUtility):
                 self.argparser.error('Unable to automatically determine the format of the input file. Try specifying '
                                      'a format with --format.')
 
+        # Excel and DBF support is slow to import, so it is imported only for those formats.
+        if filetype in ('xls', 'xlsx'):
+            import agateexcel  # noqa: F401
+        elif filetype == 'dbf':
+            import agatedbf  # noqa: F401
+
         if self.args.names_only:
             if filetype in ('xls', 'xlsx'):
                 sheets = self.sheet_names(path, filetype)
@@ -1,6 +1,5 @@
 #!/usr/bin/env python
 import agate
-from sqlalchemy import create_engine
 
 from csvkit.cli import CSVKitUtility, parse_list
 
@@ -55,6 +54,9 @@ class SQL2CSV(CSVKitUtility):
         if self.additional_input_expected() and not self.args.query:
             self.argparser.error('You must provide an input file or piped data.')
 
+        # SQLAlchemy is slow to import, so it is imported only once the arguments are valid.
+        from sqlalchemy import create_engine
+
         try:
             engine = create_engine(self.args.connection_string, **parse_list(self.args.engine_option))
         except ImportError as e:
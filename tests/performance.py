@@ -1,9 +1,29 @@
 import os.path
+import re
 import subprocess
+import sys
 import timeit
 
 num_repeats = 100  # number of repeats for timeit
 
+# The maximum time in milliseconds to import each tool's module, which is most of the time to start the tool.
+import_time_budgets = {
+    'csvclean': 250,
+    'csvcut': 250,
+    'csvformat': 250,
+    'csvgrep': 250,
+    'csvjoin': 250,
+    'csvjson': 250,
+    'csvlook': 250,
+    'csvpy': 250,
+    'csvsort': 250,
+    'csvsql': 600,  # SQLAlchemy is needed to list the SQL dialects in the --dialect option.
+    'csvstack': 250,
+    'csvstat': 250,
+    'in2csv': 250,
+    'sql2csv': 250,
+}
+
 
 def test_csvformat_performance():
     command = ['csvformat', os.path.join('examples', 'iris.csv')]
@@ -59,6 +79,21 @@ def test_csvstat_performance():
     print(f"CSVKit csvstat performance test elapsed time: {elapsed} seconds")
 
 
+def test_import_time():
+    for name, budget in import_time_budgets.items():
+        module = f'csvkit.utilities.{name}'
+        elapsed = float('inf')
+        # The fastest of several runs is the least affected by other processes.
+        for _ in range(5):
+            result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                                    stderr=subprocess.PIPE, text=True)
+            match = re.search(rf'^import time:\s*\d+ \|\s*(\d+) \| {re.escape(module)}$', result.stderr, re.MULTILINE)
+            elapsed = min(elapsed, int(match.group(1)) / 1000)
+        print(f"CSVKit {name} import time: {elapsed:.1f} ms (budget {budget} ms)")
+        assert elapsed <= budget, f'{name} took {elapsed:.1f} ms to import, over its budget of {budget} ms'
+
+
+test_import_time()
 test_csvformat_performance()
 test_csvjson_performance()
 test_csvlook_performance()
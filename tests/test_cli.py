@@ -1,6 +1,20 @@
+import bz2
+import gzip
+import io
+import lzma
+import os
+import subprocess
+import sys
+import tempfile
 import unittest
+from unittest.mock import Mock, patch
 
-from csvkit.cli import ColumnIdentifierError, match_column_identifier, parse_column_identifiers
+from csvkit.cli import (BackgroundReader, BackgroundWriter, BatchWriter, ColumnIdentifierError, LazyFile, MappedFile,
+                        get_compression_opener, match_column_identifier, open_in_background, parse_column_identifiers,
+                        process_map, record_offsets, sniff_compression)
+from csvkit.utilities.csvcut import CSVCut
+from csvkit.utilities.csvpy import CSVPy
+from csvkit.utilities.csvstat import CSVStat
 
 
 class TestCli(unittest.TestCase):
@@ -90,3 +104,358 @@ class TestCli(unittest.TestCase):
         self.assertEqual(target, parse_column_identifiers('1,4:', self.headers))
 
         self.assertEqual(list(range(0, len(self.headers))), parse_column_identifiers('1:', self.headers))
+
+    def test_process_map(self):
+        arguments = [(2, i) for i in range(10)]
+        self.assertEqual(list(process_map(pow, arguments, 2)), [2 ** i for i in range(10)])
+        self.assertEqual(sorted(process_map(pow, arguments, 2, ordered=False)), [2 ** i for i in range(10)])
+
+    def test_process_map_close(self):
+        results = process_map(pow, [(2, i) for i in range(10)], 2)
+        self.assertEqual(next(results), 1)
+        results.close()
+
+    def test_override_output(self):
+        self.assertIn('--compression-level', CSVCut(['examples/dummy.csv']).argparser.format_help())
+
+        help_text = CSVPy(['examples/dummy.csv']).argparser.format_help()
+        self.assertNotIn('--output', help_text)
+        self.assertNotIn('--compression-level', help_text)
+
+
+class TestRecordOffsets(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.csv')
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def write(self, data):
+        with open(self.path, 'wb') as f:
+            f.write(data)
+        return data
+
+    def assertOffsets(self, data, parts, expected, **kwargs):
+        self.assertEqual(record_offsets(self.path, 0, len(data), parts, **kwargs), expected)
+
+    def test_quoted_newlines(self):
+        data = self.write(b'"a\nb",c\n"d\n\ne",f\ng,h\n')
+
+        self.assertOffsets(data, 2, [0, 17, len(data)])
+        self.assertOffsets(data, 8, [0, 8, 17, len(data)])
+
+    def test_doubled_quotes(self):
+        data = self.write(b'"a""\n""b",c\nd,e\n')
+
+        self.assertOffsets(data, 3, [0, 12, len(data)])
+
+    def test_quote_none(self):
+        data = self.write(b'"a\nb",c\n')
+
+        self.assertOffsets(data, 3, [0, 3, len(data)], quoting=3)
+
+    def test_escapechar(self):
+        data = self.write(b'"a\\"\nb",c\nd,e\n')
+
+        self.assertOffsets(data, 2, [0, 10, len(data)], escapechar='\\')
+
+    def test_odd_quotes(self):
+        # The quote character in the unquoted field is a literal.
+        data = self.write(b'12" pipe,a\n"b\nc",d\ne,f\n')
+
+        self.assertOffsets(data, 3, [0, 11, 19, len(data)])
+
+    def test_stray_quote(self):
+        # The number of quote characters is even, but the first is a literal at the end of an unquoted field.
+        data = self.write(b'ba",1\n"x\ny",2\ng,h"\n')
+
+        self.assertOffsets(data, 3, [0, 6, 14, len(data)])
+
+    def test_empty_quoted_field(self):
+        data = self.write(b'"",a\n"""b""",c\nd,""\n')
+
+        self.assertOffsets(data, 4, [0, 5, 15, len(data)])
+
+    def test_one_record(self):
+        data = self.write(b'"a\nb\nc\nd"\n')
+
+        self.assertOffsets(data, 4, [0, len(data)])
+
+    def test_input_ranges(self):
+        utility = CSVStat(['examples/test_geo.csv'])
+        column_names, reader_kwargs, ranges = utility.get_input_ranges(3, sniff_limit=1024)
+
+        self.assertEqual(column_names[0], 'slug')
+        self.assertEqual(reader_kwargs['delimiter'], ',')
+        self.assertEqual(len(ranges), 3)
+
+        with open('examples/test_geo.csv', 'rb') as f:
+            data = f.read()
+
+        self.assertEqual(data[:ranges[0][0]].count(b'\n'), 1)
+        self.assertEqual(ranges[-1][1], len(data))
+        for start, end in ranges:
+            self.assertEqual(data[start - 1:start], b'\n')
+            self.assertEqual(data[:start].count(b'"') % 2, 0)
+
+    def test_input_ranges_stdin(self):
+        self.assertIsNone(CSVStat([]).get_input_ranges(3))
+        self.assertIsNone(CSVStat(['examples/dummy.csv.gz']).get_input_ranges(3))
+
+
+class TestMappedFile(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.csv')
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def write(self, data):
+        with open(self.path, 'wb') as f:
+            f.write(data)
+
+    def mapped_file(self, encoding='utf-8-sig'):
+        f = MappedFile(self.path, encoding)
+        self.addCleanup(f.close)
+        return f
+
+    def test_lines(self):
+        self.write(b'\xef\xbb\xbfa,b\r\n1,\x002\r3,4\n\n5,\xc3\xa9')
+
+        for block_size in (1, 2, 3, 1 << 20):
+            with self.subTest(block_size=block_size), patch('csvkit.cli.READ_BLOCK_SIZE', block_size):
+                self.assertEqual(list(self.mapped_file()), ['a,b\n', '1,2\n', '3,4\n', '\n', '5,é'])
+
+    def test_read(self):
+        self.write(b'a,b\r\n1,2\r\n')
+
+        with patch('csvkit.cli.READ_BLOCK_SIZE', 2):
+            f = self.mapped_file()
+            self.assertEqual(f.readline(), 'a,b\n')
+            self.assertEqual(f.read(3), '1,2')
+            self.assertEqual(f.read(), '\n')
+            self.assertEqual(f.read(), '')
+
+    def test_seek(self):
+        self.write(b'a,b\n1,2\n3,4\n')
+
+        with patch('csvkit.cli.READ_BLOCK_SIZE', 4):
+            f = self.mapped_file()
+            f.readline()
+            offset = f.tell()
+            self.assertEqual(f.read(6), '1,2\n3,')
+            f.seek(offset)
+            self.assertEqual(list(f), ['1,2\n', '3,4\n'])
+            f.seek(0)
+            self.assertEqual(f.readline(), 'a,b\n')
+
+    def test_empty(self):
+        self.write(b'')
+
+        self.assertEqual(list(self.mapped_file()), [])
+        self.assertEqual(self.mapped_file().read(), '')
+
+    def test_supports(self):
+        self.assertTrue(MappedFile.supports('utf-8-sig'))
+        self.assertTrue(MappedFile.supports('latin-1'))
+        self.assertFalse(MappedFile.supports('utf-16'))
+        self.assertFalse(MappedFile.supports('unknown'))
+
+    def test_open_input_file(self):
+        for args, cls in (
+            (['examples/dummy.csv'], MappedFile),
+            (['examples/dummy.csv.gz'], LazyFile),
+            (['-e', 'utf-16', 'examples/dummy.csv'], LazyFile),
+        ):
+            with self.subTest(args=args):
+                utility = CSVCut(args)
+                f = utility._open_input_file(utility.args.input_path)
+                self.addCleanup(f.close)
+                self.assertIsInstance(f, cls)
+
+
+class TestLazyFile(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.csv.gz')
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def lazy_file(self, text, encoding='utf-8'):
+        with gzip.open(self.path, 'wt', encoding=encoding, newline='') as f:
+            f.write(text)
+
+        f = LazyFile(gzip.open, self.path, mode='rt', encoding=encoding)
+        self.addCleanup(f.close)
+        return f
+
+    def test_lines(self):
+        for block_size in (1, 2, 3, 1 << 20):
+            with self.subTest(block_size=block_size), patch('csvkit.cli.READ_BLOCK_SIZE', block_size):
+                f = self.lazy_file('a,b\r\n1,\x002\r3,4\n\n5,é', 'utf-16')
+                self.assertEqual(list(f), ['a,b\n', '1,2\n', '3,4\n', '\n', '5,é'])
+
+    def test_seek(self):
+        with patch('csvkit.cli.READ_BLOCK_SIZE', 4):
+            f = self.lazy_file('a,b\n1,2\n3,4\n')
+            f.readline()
+            offset = f.tell()
+            self.assertEqual(f.read(6), '1,2\n3,')
+            f.seek(offset)
+            self.assertEqual(list(f), ['1,2\n', '3,4\n'])
+
+
+class TestBackgroundReader(unittest.TestCase):
+
+    def test_read(self):
+        with patch('csvkit.cli.READ_BLOCK_SIZE', 3), BackgroundReader(io.BytesIO(b'abcdefgh'), blocks=1) as f:
+            self.assertEqual(f.read(2), b'ab')
+            self.assertEqual(f.tell(), 2)
+            self.assertEqual(f.read(), b'cdefgh')
+            self.assertEqual(f.read(), b'')
+
+    def test_seek(self):
+        with patch('csvkit.cli.READ_BLOCK_SIZE', 3), BackgroundReader(io.BytesIO(b'abcdefgh'), blocks=1) as f:
+            self.assertEqual(f.read(3), b'abc')
+            self.assertEqual(f.read(3), b'def')
+            f.seek(1)
+            self.assertEqual(f.read(), b'bcdefgh')
+
+    def test_error(self):
+        with BackgroundReader(gzip.GzipFile(fileobj=io.BytesIO(b'not gzip'))) as f:
+            with self.assertRaises(gzip.BadGzipFile):
+                f.read()
+
+    def test_open_in_background(self):
+        with open_in_background(gzip.open, 'examples/dummy.csv.gz', encoding='utf-8') as f:
+            self.assertEqual(f.read(), 'a,b,c\n1,2,3\n')
+
+
+class TestSniffCompression(unittest.TestCase):
+
+    def test_sniff_compression(self):
+        for data, expected in (
+            (gzip.compress(b'a,b\n'), gzip.open),
+            (bz2.compress(b'a,b\n'), bz2.open),
+            (bz2.compress(b''), bz2.open),
+            (lzma.compress(b'a,b\n'), lzma.open),
+            (b'BZh,a\n1,2\n', None),
+            (b'', None),
+        ):
+            with self.subTest(data=data):
+                self.assertIs(sniff_compression(data), expected)
+
+    def test_get_compression_opener(self):
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+
+        with gzip.open(path, 'wb') as f:
+            f.write(b'a,b\n')
+
+        self.assertIs(get_compression_opener(path), gzip.open)
+        self.assertIs(get_compression_opener('examples/dummy.csv.bz2'), bz2.open)
+        self.assertIsNone(get_compression_opener('examples/dummy.csv'))
+
+
+class TestBackgroundWriter(unittest.TestCase):
+
+    def test_write(self):
+        f = io.BytesIO()
+        f.close = lambda: None
+
+        with BackgroundWriter(f, blocks=1) as writer:
+            for data in (b'ab', b'cd', b'e'):
+                writer.write(data)
+
+        self.assertEqual(f.getvalue(), b'abcde')
+
+    def test_error(self):
+        f = Mock()
+        f.write.side_effect = OSError('No space left on device')
+
+        writer = BackgroundWriter(f)
+        writer.write(b'a')
+
+        with self.assertRaises(OSError):
+            writer.close()
+        f.close.assert_called_once()
+
+
+class TestBatchWriter(unittest.TestCase):
+
+    def test_writerows(self):
+        f = io.StringIO()
+        writer = BatchWriter(f, buffer_size=10)
+        writer.writerow(['a', 'b'])
+        self.assertEqual(f.getvalue(), '')
+
+        writer.writerows([['1', 'x\ry'], ['2', None]])
+        self.assertEqual(f.getvalue(), 'a,b\n1,"x\ny"\n2,\n')
+        self.assertEqual(writer.row_count, 3)
+
+    def test_lineterminator(self):
+        f = io.StringIO()
+        writer = BatchWriter(f, lineterminator='\r\n')
+        writer.writerows([['a', 'b'], ['x\ry', '1']])
+        writer.flush()
+
+        self.assertEqual(f.getvalue(), 'a,b\r\n"x\ny",1\r\n')
+
+    def test_line_numbers(self):
+        f = io.StringIO()
+        writer = BatchWriter(f, line_numbers=True)
+        writer.writerow(['a'])
+        writer.writerows([['x'], ['y']])
+        writer.flush()
+
+        self.assertEqual(f.getvalue(), 'line_number,a\n1,x\n2,y\n')
+
+    def test_fieldnames(self):
+        f = io.StringIO()
+        writer = BatchWriter(f, ['a', 'b'], line_numbers=True)
+        writer.writeheader()
+        writer.writerows([{'a': '1', 'b': '2'}, {'b': '3'}])
+        writer.flush()
+
+        self.assertEqual(f.getvalue(), 'line_number,a,b\n1,1,2\n2,,3\n')
+
+    def test_write(self):
+        f = io.StringIO()
+        writer = BatchWriter(f)
+        writer.writerow(['a'])
+        writer.write('b\nc\n', rows=2)
+        writer.flush()
+
+        self.assertEqual(f.getvalue(), 'a\nb\nc\n')
+        self.assertEqual(writer.row_count, 3)
+
+
+class TestImports(unittest.TestCase):
+
+    def imported(self, module):
+        code = f'import sys, {module}; print(" ".join(sys.modules))'
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+        return set(result.stdout.split())
+
+    def test_compression_and_multiprocessing(self):
+        modules = self.imported('csvkit.utilities.csvcut')
+
+        # bz2 and lzma are imported by shutil.
+        for name in ('gzip', 'zstandard', 'concurrent.futures', 'multiprocessing'):
+            self.assertNotIn(name, modules)
+
+    def test_in2csv(self):
+        modules = self.imported('csvkit.utilities.in2csv')
+
+        for name in ('agatedbf', 'agateexcel', 'openpyxl', 'xlrd'):
+            self.assertNotIn(name, modules)
+
+    def test_sql2csv(self):
+        self.assertNotIn('sqlalchemy', self.imported('csvkit.utilities.sql2csv'))
@@ -0,0 +1,119 @@
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from csvkit.daemon import SOCKET_ENVIRONMENT_VARIABLE, _handle, _peer_uid, is_supported
+
+
+@unittest.skipUnless(is_supported(), 'csvkitd requires Unix sockets and fork()')
+class TestDaemon(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.directory.name, 'csvkitd.sock')
+        cls.server = subprocess.Popen([sys.executable, '-m', 'csvkit.daemon', '--socket', cls.path, '--no-preload'])
+
+        for _ in range(100):
+            if os.path.exists(cls.path):
+                break
+            time.sleep(0.1)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.terminate()
+        cls.server.wait()
+        cls.directory.cleanup()
+
+    def run_code(self, code, args, path=None, **kwargs):
+        env = dict(os.environ, **{SOCKET_ENVIRONMENT_VARIABLE: path or self.path})
+        return subprocess.run([sys.executable, '-c', code, *args], env=env, capture_output=True, text=True, **kwargs)
+
+    def run_tool(self, name, args, **kwargs):
+        return self.run_code(f'from csvkit.daemon import {name}; {name}()', args, **kwargs)
+
+    def test_forward(self):
+        code = 'import sys; from csvkit.daemon import forward; print(forward("csvcut"), "agate" in sys.modules)'
+        result = self.run_code(code, ['-c', '1', 'examples/dummy.csv'])
+
+        self.assertEqual(result.stdout, 'a\n1\n0 False\n')
+
+    def test_file(self):
+        result = self.run_tool('csvcut', ['-c', '1,3', 'examples/dummy.csv'])
+
+        self.assertEqual(result.stdout, 'a,c\n1,3\n')
+        self.assertEqual(result.returncode, 0)
+
+    def test_stdin(self):
+        result = self.run_tool('csvformat', ['-D', '|'], input='a,b\n1,2\n')
+
+        self.assertEqual(result.stdout, 'a|b\n1|2\n')
+        self.assertEqual(result.returncode, 0)
+
+    def test_error(self):
+        result = self.run_tool('csvcut', ['-c', '9', 'examples/dummy.csv'])
+
+        self.assertEqual(result.stdout, '')
+        self.assertIn('Column 9 is invalid.', result.stderr)
+        self.assertEqual(result.returncode, 1)
+
+    def test_usage_error(self):
+        result = self.run_tool('csvcut', ['--unknown'])
+
+        self.assertIn('unrecognized arguments: --unknown', result.stderr)
+        self.assertEqual(result.returncode, 2)
+
+    def test_working_directory(self):
+        result = self.run_tool('csvcut', ['-c', '1', 'dummy.csv'], cwd='examples')
+
+        self.assertEqual(result.stdout, 'a\n1\n')
+
+    def test_no_server(self):
+        code = 'from csvkit.daemon import forward; print(forward("csvcut"))'
+        result = self.run_code(code, ['-c', '1', 'examples/dummy.csv'], path=self.path + '.missing')
+
+        self.assertEqual(result.stdout, 'None\n')
+
+    def test_fallback(self):
+        result = self.run_tool('csvcut', ['-c', '1', 'examples/dummy.csv'], path=self.path + '.missing')
+
+        self.assertEqual(result.stdout, 'a\n1\n')
+        self.assertEqual(result.returncode, 0)
+
+    def test_not_a_socket(self):
+        path = os.path.join(self.directory.name, 'data.csv')
+        with open(path, 'w') as f:
+            f.write('a,b\n1,2\n')
+
+        result = subprocess.run(
+            [sys.executable, '-m', 'csvkit.daemon', '--socket', path, '--no-preload'], capture_output=True, text=True,
+        )
+
+        self.assertIn(f'{path} exists and is not a socket.', result.stderr)
+        self.assertEqual(result.returncode, 2)
+        with open(path) as f:
+            self.assertEqual(f.read(), 'a,b\n1,2\n')
+
+    def test_peer_uid(self):
+        server, client = socket.socketpair(socket.AF_UNIX)
+        with server, client:
+            self.assertEqual(_peer_uid(server), os.getuid())
+
+    def test_other_user(self):
+        server, client = socket.socketpair(socket.AF_UNIX)
+        with server, client:
+            socket.send_fds(client, [b'\0'], [0, 1, 2])
+            client.sendall(b'{"utility": "csvcut", "argv": ["csvcut"], "cwd": ".", "environ": {}}')
+            client.shutdown(socket.SHUT_WR)
+
+            with patch('os.getuid', return_value=os.getuid() + 1), patch('os.fork') as fork:
+                _handle(server)
+            server.shutdown(socket.SHUT_WR)
+
+            fork.assert_not_called()
+            self.assertEqual(client.recv(1), b'')
@@ -1,8 +1,11 @@
+import io
+import pickle
 import re
 import unittest
 
 from csvkit.exceptions import ColumnIdentifierError
-from csvkit.grep import FilteringCSVReader
+from csvkit.grep import (AhoCorasick, FilteringCSVReader, NumberRange, PrefilteringCSVReader, RowExpression,
+                         parse_number, required_substring)
 
 
 class TestGrep(unittest.TestCase):
@@ -141,3 +144,205 @@ class TestGrep(unittest.TestCase):
             self.fail("Should be no more rows left.")
         except StopIteration:
             pass
+
+    def test_aho_corasick(self):
+        fcr = FilteringCSVReader(iter(self.tab1), patterns={1: AhoCorasick(['Sun', 'Trib'])})
+        self.assertEqual(self.tab1[0], next(fcr))
+        self.assertEqual(self.tab1[2], next(fcr))
+        self.assertEqual(self.tab1[3], next(fcr))
+        with self.assertRaises(StopIteration):
+            next(fcr)
+
+
+class TestAhoCorasick(unittest.TestCase):
+
+    def test_match(self):
+        matcher = AhoCorasick(['he', 'she', 'his', 'hers'])
+        self.assertTrue(matcher('ushers'))
+        self.assertTrue(matcher('this'))
+        self.assertTrue(matcher('he'))
+        self.assertFalse(matcher('hi'))
+        self.assertFalse(matcher(''))
+
+    def test_suffix(self):
+        # "abcd" fails after "abc", and "bc" is found through the failure state of "abc".
+        matcher = AhoCorasick(['abcd', 'bc'])
+        self.assertTrue(matcher('abce'))
+        self.assertFalse(matcher('abd'))
+
+    def test_no_keywords(self):
+        self.assertFalse(AhoCorasick([])('abc'))
+
+    def test_empty_keyword(self):
+        self.assertTrue(AhoCorasick([''])('abc'))
+
+
+class TestPrefilteringCSVReader(unittest.TestCase):
+
+    def read(self, text, **kwargs):
+        return list(PrefilteringCSVReader(io.StringIO(text), 'x', **kwargs))
+
+    def test_skip(self):
+        self.assertEqual(self.read('a,b\n1,2\nx,3\n4,5\n'), [['a', 'b'], ['x', '3']])
+
+    def test_header(self):
+        self.assertEqual(self.read('a,b\n1,2\n'), [['a', 'b']])
+
+    def test_quoted_newlines(self):
+        # The second line of a record is not parsed as a record.
+        self.assertEqual(self.read('a,b\n"1\nx,3",2\n4,5\n'), [['a', 'b'], ['1\nx,3', '2']])
+        self.assertEqual(self.read('a,b\n"1\n2",x\n4,5\n'), [['a', 'b'], ['1\n2', 'x']])
+
+    def test_escapechar(self):
+        self.assertEqual(self.read('a,b\n1\\\nx,3\n', escapechar='\\'), [['a', 'b'], ['1\nx', '3']])
+
+    def test_line_numbers(self):
+        self.assertEqual(self.read('a,b\n1,2\n"3\n4",5\nx,6\n', line_numbers=True), [
+            ['line_numbers', 'a', 'b'],
+            ['3', '3\n4', '5'],
+            ['4', 'x', '6'],
+        ])
+        self.assertEqual(self.read('1,2\nx,3\n', line_numbers=True, header=False), [
+            ['1', '1', '2'],
+            ['2', 'x', '3'],
+        ])
+
+
+class TestRequiredSubstring(unittest.TestCase):
+
+    def test_required_substring(self):
+        for pattern, expected in (
+            ('abc', 'abc'),
+            ('^ab.cde$', 'cde'),
+            (r'\d+foo\.bar', 'foo.bar'),
+            ('ab*c', 'a'),
+            ('a|b', None),
+            ('(?i)abc', None),
+            ('', None),
+        ):
+            with self.subTest(pattern=pattern):
+                self.assertEqual(required_substring(re.compile(pattern)), expected)
+
+
+class TestParseNumber(unittest.TestCase):
+
+    def test_parse_number(self):
+        for value, expected in (
+            ('1', 1),
+            ('-1.5', -1.5),
+            ('1,234.5', 1234.5),
+            ('$1,000', 1000),
+            ('-$5', -5),
+            ('50%', 50),
+            (' 2 ', 2),
+            ('', None),
+            ('a', None),
+            ('1-2', None),
+        ):
+            with self.subTest(value=value):
+                self.assertEqual(parse_number(value), expected)
+
+
+class TestNumberRange(unittest.TestCase):
+
+    def test_bounds(self):
+        number_range = NumberRange(gt=1, le=10)
+        for value, expected in (
+            ('1', False),
+            ('1.5', True),
+            ('$10', True),
+            ('1,000', False),
+            ('', False),
+            ('a', False),
+        ):
+            with self.subTest(value=value):
+                self.assertEqual(number_range(value), expected)
+
+    def test_filter(self):
+        rows = [['id', 'amount'], ['1', '5'], ['2', 'n/a'], ['3', '50%'], ['4', '-1']]
+        filtered = FilteringCSVReader(iter(rows), patterns={1: NumberRange(ge=0, lt=50)})
+
+        self.assertEqual(list(filtered), [['id', 'amount'], ['1', '5']])
+
+    def test_pickle(self):
+        number_range = pickle.loads(pickle.dumps(NumberRange(lt=0)))
+
+        self.assertTrue(number_range('-1'))
+        self.assertFalse(number_range('0'))
+
+
+class TestRowExpression(unittest.TestCase):
+
+    def setUp(self):
+        self.column_names = ['id', 'amount', 'region', 'State Name']
+
+    def test_compare(self):
+        expression = RowExpression("amount > 100 and region == 'EU'", self.column_names)
+        self.assertTrue(expression(['1', '150', 'EU', 'x']))
+        self.assertFalse(expression(['1', '50', 'EU', 'x']))
+        self.assertFalse(expression(['1', '150', 'US', 'x']))
+
+    def test_number(self):
+        expression = RowExpression('amount + id >= 3', self.column_names)
+        self.assertTrue(expression(['1', '2']))
+        self.assertTrue(expression(['1', '$2,000']))
+        self.assertFalse(expression(['1', '1']))
+
+    def test_not_a_number(self):
+        self.assertFalse(RowExpression('amount > 1', self.column_names)(['1', '']))
+        self.assertFalse(RowExpression('amount < 1', self.column_names)(['1', 'x']))
+        self.assertTrue(RowExpression('amount != 1', self.column_names)(['1', 'x']))
+
+    def test_invalid_arithmetic(self):
+        self.assertFalse(RowExpression('amount / 0 > 1', self.column_names)(['1', '2']))
+        self.assertFalse(RowExpression('amount // id == 0', self.column_names)(['0', '2']))
+        self.assertFalse(RowExpression('amount % id == 0', self.column_names)(['0', '2']))
+        self.assertFalse(RowExpression('10.0 ** amount > 1', self.column_names)(['1', '1000']))
+        self.assertFalse(RowExpression('(0 - amount) ** 0.5 > 0', self.column_names)(['1', '2']))
+        self.assertTrue(RowExpression('amount / 0 > 1 or id == 1', self.column_names)(['1', '2']))
+        self.assertTrue(RowExpression('amount / id == 0.5 and amount % id == 2', self.column_names)(['4', '2']))
+
+    def test_power(self):
+        self.assertTrue(RowExpression('amount ** 2 == 16 and 2 ** 3 == 8', self.column_names)(['2', '4']))
+        self.assertFalse(RowExpression('amount > 9 ** 9 ** 9', self.column_names)(['1', '2']))
+        self.assertTrue(RowExpression('amount > 9 ** 9 ** 9 or id == 1', self.column_names)(['1', '2']))
+
+    def test_text(self):
+        self.assertTrue(RowExpression("region in ('EU', 'US')", self.column_names)(['1', '2', 'EU']))
+        self.assertTrue(RowExpression("region.lower().startswith('e')", self.column_names)(['1', '2', 'EU']))
+        self.assertTrue(RowExpression('not region', self.column_names)(['1', '2', '']))
+        self.assertTrue(RowExpression("region == '1'", self.column_names)(['1', '2', '1']))
+
+    def test_backticks(self):
+        self.assertTrue(RowExpression("`State Name` == 'IL' and `1` == 'a'", self.column_names)(['a', '', '', 'IL']))
+        self.assertTrue(RowExpression("`0` == 'a'", self.column_names, 0)(['a']))
+
+    def test_short_row(self):
+        self.assertTrue(RowExpression("region == ''", self.column_names)(['1']))
+
+    def test_pickle(self):
+        expression = pickle.loads(pickle.dumps(RowExpression('amount > 1', self.column_names)))
+        self.assertTrue(expression(['1', '2']))
+
+    def test_invalid(self):
+        for expression in (
+            'amount >',
+            '__import__("os")',
+            'amount.__class__',
+            'amount[0]',
+            'lambda: 1',
+            'amount == None',
+            "'x' * 10 ** 12 == region",
+            "region == ('x' + 'y') * 10",
+            'region.strip() * 10 == region',
+            '[1] * 10 ** 12 == region',
+        ):
+            with self.subTest(expression=expression):
+                with self.assertRaises(ValueError):
+                    RowExpression(expression, self.column_names)
+
+    def test_unknown_column(self):
+        with self.assertRaises(ColumnIdentifierError):
+            RowExpression('foo > 1', self.column_names)
+        with self.assertRaises(ColumnIdentifierError):
+            RowExpression('`9` > 1', self.column_names)
@@ -0,0 +1,234 @@
+import datetime
+import unittest
+
+import agate
+
+from csvkit.inference import SampleTypeTester, TypeTester, get_cast, get_check
+
+
+class TestGetCheck(unittest.TestCase):
+
+    def assertChecks(self, data_type, values):
+        check = get_check(data_type)
+        for value, expected in values.items():
+            with self.subTest(value=value):
+                self.assertEqual(check(value), expected)
+                if expected is not None:
+                    self.assertEqual(data_type.test(value), expected)
+
+    def test_boolean(self):
+        self.assertChecks(agate.Boolean(), {
+            'True': True, ' no ': True, '1,': True, 'N/A': True, '': True, None: True, 'maybe': False, '2': False,
+            1: None,
+        })
+
+    def test_number(self):
+        self.assertChecks(agate.Number(), {
+            '1': True, '-0.5': True, ' 007 ': True, 'null': True, None: True, '1,000': None, '$1': None, 'x': None,
+            '1.': None,
+        })
+
+    def test_number_no_leading_zeroes(self):
+        self.assertChecks(agate.Number(no_leading_zeroes=True), {
+            '0': True, '0.5': True, '-0.5': True, '10': True, '007': False, '-01': False, '00.5': False,
+        })
+
+    def test_number_locale(self):
+        self.assertChecks(agate.Number(locale='de_DE'), {'1': None, '1.5': None, ' ': True})
+
+    def test_date(self):
+        self.assertChecks(agate.Date(), {
+            '2020-01-31': True, ' 1800-01-01 ': True, '': True, '2020-02-30': None, '1799-12-31': None,
+            '2020-01-01T12:00:00': None, '01/02/2020': None,
+        })
+        self.assertChecks(agate.Date(date_format='%Y-%m-%d'), {'2020-01-31': None})
+
+    def test_datetime(self):
+        self.assertChecks(agate.DateTime(), {
+            '2020-01-31': True, '2020-01-31 23:59:59': True, '2020-01-31T00:00:00': True, '2020-01-31 24:00:00': None,
+            '2020-01-31T12:00:00Z': None,
+        })
+
+    def test_text(self):
+        self.assertChecks(agate.Text(), {'x': True, '': True, None: True, 1: True})
+
+    def test_other(self):
+        self.assertChecks(agate.TimeDelta(), {'1 day': None, 'x': None})
+
+
+class TestGetCast(unittest.TestCase):
+
+    def test_cast(self):
+        values = [
+            None, '', ' n/a ', 'true', 'No', '1,', '1', '-0', ' -0.50 ', '007', '1234567890123456789012345678901234.5',
+            '2020-01-31', '2020-01-31 23:59:59', '2020-01-31T00:00:00', '2020-02-30', '1799-12-31', 'x',
+        ]
+        for data_type in (
+            agate.Boolean(),
+            agate.Number(),
+            agate.Number(no_leading_zeroes=True),
+            agate.Date(),
+            agate.DateTime(),
+            agate.Text(),
+        ):
+            cast = get_cast(data_type)
+            for value in values:
+                with self.subTest(data_type=data_type, value=value):
+                    try:
+                        expected = data_type.cast(value)
+                    except agate.CastError:
+                        with self.assertRaises(agate.CastError):
+                            cast(value)
+                    else:
+                        actual = cast(value)
+                        self.assertIs(type(actual), type(expected))
+                        self.assertEqual(str(actual), str(expected))
+
+
+class TestTypeTester(unittest.TestCase):
+
+    def setUp(self):
+        self.possible_types = [
+            agate.Boolean(),
+            agate.Number(),
+            agate.TimeDelta(),
+            agate.Date(),
+            agate.DateTime(),
+            agate.Text(),
+        ]
+
+    def assertTypes(self, path):
+        with open(path) as f:
+            column_names, *rows = agate.csv.reader(f)
+
+        self.assertEqual(
+            TypeTester(self.possible_types).run(rows, column_names),
+            agate.TypeTester(types=self.possible_types).run(rows, column_names),
+        )
+
+    def test_examples(self):
+        for path in (
+            'examples/dummy.csv',
+            'examples/testxls_converted.csv',
+            'examples/test_utf8.csv',
+            'examples/realdata/FY09_EDU_Recipients_by_State.csv',
+            'examples/realdata/ks_1033_data.csv',
+            'examples/sort_ints_nulls.csv',
+        ):
+            with self.subTest(path=path):
+                self.assertTypes(path)
+
+    def test_iterator(self):
+        rows = [('1', 'x'), ('2', 'y')]
+        consumed = []
+
+        def generate():
+            for row in rows:
+                consumed.append(row)
+                yield row
+
+        column_types = TypeTester(self.possible_types).run(generate(), ['a', 'b'])
+
+        self.assertEqual([type(column_type) for column_type in column_types], [agate.Number, agate.Text])
+        self.assertEqual(consumed, rows)
+
+    def test_short_rows(self):
+        rows = [('1', 'true'), ('2',), ('3', 'false', 'x')]
+        self.assertEqual(
+            TypeTester(self.possible_types).run(rows, ['a', 'b']),
+            agate.TypeTester(types=self.possible_types).run(rows, ['a', 'b']),
+        )
+
+
+class TestSampleTypeTester(unittest.TestCase):
+
+    def setUp(self):
+        self.possible_types = [
+            agate.Boolean(),
+            agate.Number(),
+            agate.TimeDelta(),
+            agate.Date(),
+            agate.DateTime(),
+            agate.Text(),
+        ]
+        self.rows = (
+            ('1', 'true', '2020-01-01', 'a', ''),
+            ('2', 'false', '2020-01-02', 'b', ''),
+            ('3', 'true', '2020-01-03', 'c', '4'),
+            ('4', 'false', '2020-01-04', 'd', ''),
+        )
+        self.column_names = ['a', 'b', 'c', 'd', 'e']
+
+    def assertTypes(self, column_types, expected):
+        self.assertEqual([type(column_type) for column_type in column_types], expected)
+
+    def test_all_rows(self):
+        tester = SampleTypeTester(self.possible_types, 10)
+        self.assertTypes(tester.run(self.rows, self.column_names), [
+            agate.Number, agate.Boolean, agate.Date, agate.Text, agate.Number,
+        ])
+        self.assertEqual(
+            tester.run(self.rows, self.column_names),
+            agate.TypeTester(types=self.possible_types).run(self.rows, self.column_names),
+        )
+
+    def test_head(self):
+        tester = SampleTypeTester(self.possible_types, 2)
+        self.assertTypes(tester.run(self.rows, self.column_names), [
+            agate.Number, agate.Boolean, agate.Date, agate.Text, agate.Number,
+        ])
+
+    def test_iterator(self):
+        tester = SampleTypeTester(self.possible_types, 2, sample='random')
+        self.assertTypes(tester.run(iter(self.rows), self.column_names), [
+            agate.Number, agate.Boolean, agate.Date, agate.Text, agate.Number,
+        ])
+
+    def test_fallback(self):
+        rows = self.rows + (('x', '2', '2020-01-05', 'e', ''),)
+        tester = SampleTypeTester(self.possible_types, 2)
+        column_types = tester.run(rows, self.column_names)
+
+        self.assertTypes(column_types, [agate.Text, agate.Text, agate.Date, agate.Text, agate.Number])
+        self.assertIs(column_types[0], self.possible_types[-1])
+
+        table = agate.Table(rows, self.column_names, tester)
+        self.assertEqual(table.columns['a'].values(), ('1', '2', '3', '4', 'x'))
+
+    def test_fallback_remaining_types(self):
+        rows = (('1', '2020-01-01'), ('0', '2020-01-02'), ('1', '2020-01-03'), ('2', '2020-01-04 12:00:00'))
+        expected = [agate.Number, agate.DateTime]
+
+        for sample in ('head', 'random'):
+            with self.subTest(sample=sample):
+                tester = SampleTypeTester(self.possible_types, 2, sample=sample)
+                self.assertTypes(tester.run(rows, ['a', 'b']), expected)
+                self.assertTypes(tester.run(iter(rows), ['a', 'b']), expected)
+
+        table = agate.Table(rows, ['a', 'b'], SampleTypeTester(self.possible_types, 2))
+        self.assertEqual(table.columns['a'].values(), (1, 0, 1, 2))
+
+    def test_fallback_previous_values(self):
+        # "true" matches the inferred boolean type, so the column can't be a number.
+        rows = (('1',), ('0',), ('true',), ('2',))
+        tester = SampleTypeTester(self.possible_types, 2)
+
+        self.assertTypes(tester.run(rows, ['a']), [agate.Text])
+        self.assertTypes(tester.run(iter(rows), ['a']), [agate.Text])
+
+    def test_fallback_too_many_values(self):
+        dates = [datetime.date(2000, 1, 1) + datetime.timedelta(days=i) for i in range(2000)]
+        rows = (*((date.isoformat(),) for date in dates), ('2020-01-01 12:00:00',))
+        tester = SampleTypeTester(self.possible_types, 2)
+
+        self.assertTypes(tester.run(rows, ['a']), [agate.DateTime])
+        self.assertTypes(tester.run(iter(rows), ['a']), [agate.Text])
+
+    def test_random(self):
+        rows = tuple((str(i),) for i in range(1000)) + (('x',),)
+        self.assertTypes(SampleTypeTester(self.possible_types, 10, sample='random').run(rows, ['a']), [agate.Text])
+        self.assertTypes(SampleTypeTester(self.possible_types, 10).run(rows, ['a']), [agate.Text])
+
+    def test_short_rows(self):
+        rows = (('10', '20'), ('30',), ('50', 'x'))
+        self.assertTypes(SampleTypeTester(self.possible_types, 1).run(rows, ['a', 'b']), [agate.Number, agate.Text])
@@ -0,0 +1,120 @@
+import unittest
+
+import agate
+
+from csvkit.exceptions import UnsortedInputError
+from csvkit.join import StreamingTable, hash_join, merge_join
+
+
+class TestJoin(unittest.TestCase):
+
+    def setUp(self):
+        text = agate.Text()
+
+        self.left = agate.Table([
+            ('1', 'a'),
+            ('2', 'b'),
+            ('2', 'c'),
+            ('3', 'd'),
+            (None, 'e'),
+        ], ['id', 'name'], [text, text])
+
+        self.right = agate.Table([
+            ('2', 'x'),
+            ('4', 'y'),
+            ('1', 'z'),
+            ('4', 'w'),
+            ('2', 'v'),
+            (None, 'u'),
+        ], ['id', 'name'], [text, text])
+
+    def stream(self, table):
+        return StreamingTable(iter(table.rows), table.column_names, table.column_types)
+
+    def assertJoin(self, streaming, table):
+        self.assertEqual(streaming.column_names, table.column_names)
+        self.assertEqual(streaming.column_types, table.column_types)
+        self.assertEqual(list(streaming.rows), [tuple(row) for row in table.rows])
+
+    def test_left(self):
+        self.assertJoin(
+            hash_join(self.stream(self.left), self.right, 0, 0),
+            self.left.join(self.right, 0, 0),
+        )
+
+    def test_inner(self):
+        self.assertJoin(
+            hash_join(self.stream(self.left), self.right, 0, 0, inner=True),
+            self.left.join(self.right, 0, 0, inner=True),
+        )
+
+    def test_full_outer(self):
+        self.assertJoin(
+            hash_join(self.stream(self.left), self.right, 0, 0, full_outer=True),
+            self.left.join(self.right, 0, 0, full_outer=True),
+        )
+
+    def test_sequential(self):
+        self.assertJoin(
+            hash_join(self.stream(self.right), self.left),
+            self.right.join(self.left, full_outer=True),
+        )
+
+    def test_chained(self):
+        table = self.left.join(self.right, 0, 0, full_outer=True).join(self.right, 0, 0, full_outer=True)
+        streaming = hash_join(
+            hash_join(self.stream(self.left), self.right, 0, 0, full_outer=True), self.right, 0, 0, full_outer=True
+        )
+        self.assertJoin(streaming, table)
+
+    def test_build_left(self):
+        streaming = hash_join(self.left, self.stream(self.right), 0, 0, inner=True, build_left=True)
+        table = self.left.join(self.right, 0, 0, inner=True)
+
+        self.assertEqual(streaming.column_names, table.column_names)
+        self.assertEqual(list(streaming.rows), [
+            ('2', 'b', 'x'),
+            ('2', 'c', 'x'),
+            ('1', 'a', 'z'),
+            ('2', 'b', 'v'),
+            ('2', 'c', 'v'),
+            (None, 'e', 'u'),
+        ])
+        self.assertEqual(len(table.rows), 6)
+
+    def test_build_left_not_inner(self):
+        with self.assertRaises(ValueError):
+            hash_join(self.left, self.right, 0, 0, build_left=True)
+
+    def sort(self, table):
+        return self.stream(table.order_by(0))
+
+    def test_merge_left(self):
+        self.assertJoin(
+            merge_join(self.sort(self.left), self.sort(self.right), 0, 0),
+            self.left.order_by(0).join(self.right.order_by(0), 0, 0),
+        )
+
+    def test_merge_inner(self):
+        self.assertJoin(
+            merge_join(self.sort(self.left), self.sort(self.right), 0, 0, inner=True),
+            self.left.order_by(0).join(self.right.order_by(0), 0, 0, inner=True),
+        )
+
+    def test_merge_full_outer(self):
+        self.assertJoin(
+            merge_join(self.sort(self.left), self.sort(self.right), 0, 0, full_outer=True),
+            self.left.order_by(0).join(self.right.order_by(0), 0, 0, full_outer=True),
+        )
+
+    def test_merge_unsorted(self):
+        rows = merge_join(self.stream(self.right), self.sort(self.left), 0, 0).rows
+
+        with self.assertRaises(UnsortedInputError):
+            list(rows)
+
+    def test_merge_column_types(self):
+        left = agate.Table([(1,)], ['id'], [agate.Number()])
+
+        with self.assertRaises(ValueError):
+            merge_join(self.stream(left), self.sort(self.right), 0, 0)
@@ -0,0 +1,85 @@
+import io
+import subprocess
+import sys
+import unittest
+
+from csvkit.exceptions import ColumnIdentifierError
+from csvkit.pipeline import PipelineError, run_pipeline
+
+
+class TestPipeline(unittest.TestCase):
+
+    def run_pipeline(self, *commands):
+        output_file = io.StringIO()
+        run_pipeline([command.split() for command in commands], output_file=output_file)
+        return output_file.getvalue()
+
+    def run_shell(self, *commands):
+        text = None
+        for command in commands:
+            name, *args = command.split()
+            text = subprocess.run([sys.executable, '-m', f'csvkit.utilities.{name}', *args], input=text,
+                                  capture_output=True, text=True, check=True).stdout
+        return text
+
+    def assertPipeline(self, *commands):
+        self.assertEqual(self.run_pipeline(*commands), self.run_shell(*commands))
+
+    def test_cut_grep_sort(self):
+        self.assertPipeline(
+            'csvcut -c 1,2,5 examples/realdata/FY09_EDU_Recipients_by_State.csv',
+            'csvgrep -c 3 -r ^1',
+            'csvsort -c 2 -r',
+        )
+
+    def test_line_numbers(self):
+        self.assertPipeline('csvcut -l -c 1 examples/dummy.csv', 'csvformat -D |')
+
+    def test_no_header_row(self):
+        self.assertPipeline('csvcut -H -c 2 examples/no_header_row.csv', 'csvgrep -c 1 -m 2')
+
+    def test_skip_lines(self):
+        self.assertPipeline('csvcut -c 1,2 examples/test_skip_lines.csv -K 3', 'csvsort -K 1 -c 2')
+
+    def test_last(self):
+        self.assertEqual(self.run_pipeline('csvcut -c 1,3 examples/dummy.csv', 'csvjson'), '[{"a": true, "c": 3.0}]')
+
+    def test_error(self):
+        with self.assertRaises(ColumnIdentifierError):
+            self.run_pipeline('csvcut -c 9 examples/dummy.csv', 'csvsort')
+
+    def test_last_error(self):
+        with self.assertRaises(ColumnIdentifierError):
+            self.run_pipeline('csvcut examples/dummy.csv', 'csvsort -c 9')
+
+    def test_early_exit(self):
+        self.assertEqual(
+            self.run_pipeline('csvcut -c 1 examples/realdata/FY09_EDU_Recipients_by_State.csv', 'csvstat --count'),
+            '53\n'
+        )
+
+    def test_last_tool(self):
+        with self.assertRaises(PipelineError):
+            self.run_pipeline('csvlook examples/dummy.csv', 'csvcut')
+
+    def test_unsupported_tool(self):
+        with self.assertRaises(PipelineError):
+            self.run_pipeline('csvcut examples/dummy.csv', 'csvsql')
+
+    def test_input_file(self):
+        with self.assertRaises(PipelineError):
+            self.run_pipeline('csvcut examples/dummy.csv', 'csvsort examples/dummy.csv')
+
+    def test_input_options(self):
+        for option in ('-d ;', '-t', '-e latin1'):
+            with self.subTest(option=option):
+                with self.assertRaisesRegex(PipelineError, 'Only the first command .* input format options'):
+                    self.run_pipeline('csvcut examples/dummy.csv', f'csvsort {option}')
+
+        self.assertPipeline('csvcut -t -c 1 examples/dummy.tsv', 'csvformat -D |')
+
+    def test_output_options(self):
+        for option in ('-D ;', '-T', '-U 1', '--add-bom'):
+            with self.subTest(option=option):
+                with self.assertRaisesRegex(PipelineError, 'Only the last command .* output format options'):
+                    self.run_pipeline(f'csvformat {option} examples/dummy.csv', 'csvcut -c a,b')
@@ -0,0 +1,297 @@
+import datetime
+import pickle
+import unittest
+from decimal import Decimal, InvalidOperation
+
+import agate
+
+from csvkit.stats import ColumnStats, HyperLogLog, QuantileSketch, SpaceSaving, median, quantiles
+
+
+class TestStats(unittest.TestCase):
+
+    def setUp(self):
+        self.possible_types = [
+            agate.Boolean(),
+            agate.Number(),
+            agate.TimeDelta(),
+            agate.Date(),
+            agate.DateTime(),
+            agate.Text(),
+        ]
+
+    def stats(self, values, **kwargs):
+        stats = ColumnStats(self.possible_types, **kwargs)
+        for value in values:
+            stats.add(value)
+        return stats
+
+    def assertAggregations(self, values, aggregations):
+        stats = self.stats(values)
+        results = stats.results()
+
+        table = agate.Table([[value] for value in values], ['a'], agate.TypeTester(types=self.possible_types))
+        self.assertIsInstance(stats.data_type, type(table.column_types[0]))
+
+        for name, aggregation in aggregations.items():
+            with self.subTest(name=name):
+                try:
+                    expected = table.aggregate(aggregation('a'))
+                except InvalidOperation:
+                    # csvstat omits the statistics that agate can't calculate.
+                    expected = None
+
+                if isinstance(expected, Decimal) and expected.is_nan():
+                    self.assertTrue(results[name].is_nan())
+                else:
+                    self.assertEqual(results.get(name), expected)
+
+    def test_number(self):
+        self.assertAggregations(['3', '1.50', '', '-2', '1.50', '10'], {
+            'nulls': agate.HasNulls,
+            'nonnulls': agate.Count,
+            'min': agate.Min,
+            'max': agate.Max,
+            'sum': agate.Sum,
+            'mean': agate.Mean,
+            'median': agate.Median,
+            'maxprecision': agate.MaxPrecision,
+        })
+
+    def test_stdev(self):
+        values = ['3', '1.50', '', '-2', '1.50', '10']
+        table = agate.Table([[value] for value in values], ['a'], [agate.Number()])
+
+        self.assertAlmostEqual(self.stats(values).results()['stdev'], table.aggregate(agate.StDev('a')))
+
+    def test_nan(self):
+        values = ['1', 'nan', '', '3']
+        self.assertAggregations(values, {
+            'nulls': agate.HasNulls,
+            'nonnulls': agate.Count,
+            'min': agate.Min,
+            'max': agate.Max,
+            'sum': agate.Sum,
+            'mean': agate.Mean,
+            'stdev': agate.StDev,
+            'median': agate.Median,
+            'maxprecision': agate.MaxPrecision,
+        })
+
+        for kwargs in ({'counts': False, 'sketch_size': 8}, {}):
+            with self.subTest(kwargs=kwargs):
+                stats = self.stats(values[:2], **kwargs)
+                stats.update(self.stats(values[2:], **kwargs))
+                results = stats.results(fractions=[0.25])
+
+                self.assertIsNone(results['min'])
+                self.assertIsNone(results.get('median'))
+                self.assertIsNone(results.get('quantiles'))
+                self.assertTrue(results['sum'].is_nan())
+
+    def test_single_nan(self):
+        self.assertAggregations(['', 'nan'], {
+            'min': agate.Min,
+            'max': agate.Max,
+            'sum': agate.Sum,
+            'mean': agate.Mean,
+            'stdev': agate.StDev,
+            'median': agate.Median,
+        })
+
+    def test_nan_counts(self):
+        # Like agate, each NaN is a distinct value.
+        stats = self.stats(['1', 'nan', '2', 'nan'])
+        stats.update(pickle.loads(pickle.dumps(self.stats(['nan', '2']))))
+        results = stats.results()
+
+        self.assertEqual(results['unique'], 5)
+        self.assertEqual([item['count'] for item in results['freq']], [2, 1, 1, 1, 1])
+        self.assertEqual(results['freq'][0]['value'], 2)
+        self.assertTrue(all(item['value'].is_nan() for item in results['freq'][2:]))
+
+        # Text values are counted together.
+        results = self.stats(['a', 'nan', 'nan']).results()
+
+        self.assertEqual(results['unique'], 2)
+        self.assertEqual(results['freq'], [{'value': 'nan', 'count': 2}, {'value': 'a', 'count': 1}])
+
+    def test_pickle(self):
+        stats = self.stats(['2020-01-02', '2019-12-31'])
+        stats = pickle.loads(pickle.dumps(stats))
+        stats.add('2020-01-03 12:00:00')
+
+        self.assertIsInstance(stats.data_type, agate.DateTime)
+        self.assertEqual(stats.results()['max'], datetime.datetime(2020, 1, 3, 12))
+
+    def test_date(self):
+        self.assertAggregations(['2020-01-02', '', '2019-12-31'], {
+            'nulls': agate.HasNulls,
+            'min': agate.Min,
+            'max': agate.Max,
+        })
+
+    def test_timedelta(self):
+        self.assertAggregations(['1 day', '3 hours'], {
+            'sum': agate.Sum,
+            'mean': agate.Mean,
+        })
+
+    def test_text(self):
+        self.assertAggregations(['abc', '1', '', 'abcdef'], {
+            'nulls': agate.HasNulls,
+            'nonnulls': agate.Count,
+            'len': agate.MaxLength,
+        })
+
+    def test_boolean(self):
+        stats = self.stats(['true', 'false', '', 'true'])
+        results = stats.results()
+
+        self.assertIsInstance(stats.data_type, agate.Boolean)
+        self.assertEqual(results['nulls'], True)
+        self.assertEqual(results['nonnulls'], 3)
+        self.assertEqual(results['unique'], 3)
+        self.assertEqual(results['freq'][0], {'value': True, 'count': 2})
+
+    def test_empty(self):
+        stats = self.stats([])
+
+        self.assertIsInstance(stats.data_type, agate.Boolean)
+        self.assertEqual(stats.results()['unique'], 0)
+
+    def test_value_counts(self):
+        stats = self.stats(['1', '1.0', '2', '', None])
+
+        self.assertEqual(list(stats.value_counts().items()), [(Decimal('1'), 2), (Decimal('2'), 1), (None, 2)])
+
+    def test_counts(self):
+        results = self.stats(['1', '2'], counts=False).results()
+
+        self.assertNotIn('unique', results)
+        self.assertNotIn('freq', results)
+        self.assertNotIn('median', results)
+        self.assertEqual(results['sum'], Decimal('3'))
+
+    def test_median(self):
+        self.assertIsNone(median({None: 2}))
+        self.assertEqual(median({Decimal('3'): 1, Decimal('1'): 2, None: 1}), Decimal('1'))
+        self.assertEqual(median({Decimal('3'): 2, Decimal('1'): 2}), Decimal('2'))
+        self.assertEqual(median({datetime.date(2020, 1, 1): 1}), datetime.date(2020, 1, 1))
+
+    def test_approx(self):
+        stats = self.stats(['1', '1.0', '2', '', '-0', '0'], counts=False, distinct=True, top=True)
+        results = stats.results()
+
+        self.assertEqual(results['unique'], 4)
+        self.assertEqual(results['unique_error'], HyperLogLog().error)
+        self.assertEqual(results['freq'], [
+            {'value': Decimal('1'), 'count': 2},
+            {'value': Decimal('0'), 'count': 2},
+            {'value': Decimal('2'), 'count': 1},
+            {'value': None, 'count': 1},
+        ])
+        self.assertEqual(results['freq_error'], 0)
+
+    def test_hyperloglog(self):
+        hll = HyperLogLog()
+        other = HyperLogLog()
+        for i in range(50000):
+            hll.add(str(i))
+            other.add(str(i + 25000))
+
+        self.assertAlmostEqual(len(hll), 50000, delta=50000 * hll.error * 3)
+
+        hll.update(other)
+
+        self.assertAlmostEqual(len(hll), 75000, delta=75000 * hll.error * 3)
+
+    def test_space_saving(self):
+        top = SpaceSaving(capacity=3)
+        for value in 'aabcdaeb':
+            top.add(value)
+
+        items = dict(top.items())
+
+        self.assertEqual(len(items), 3)
+        self.assertEqual(items['a'], (3, 0))
+        for value, (count, error) in items.items():
+            self.assertLessEqual(count - error, 'aabcdaeb'.count(value))
+            self.assertGreaterEqual(count, 'aabcdaeb'.count(value))
+
+    def test_quantiles(self):
+        counts = [(Decimal('3'), 1), (Decimal('1'), 2), (None, 1), (Decimal('10'), 1)]
+
+        self.assertEqual(
+            quantiles(counts, [0, 0.5, 0.9, 1]), [Decimal('1'), Decimal('2'), Decimal('10'), Decimal('10')]
+        )
+        self.assertEqual(quantiles([(None, 1)], [0.5, 0.9]), [None, None])
+
+    def test_quantiles_results(self):
+        values = ['3', '1', '', '4', '1', '5', '9', '2', '6']
+        table = agate.Table([[value] for value in values], ['a'], [agate.Number()])
+        percentiles = table.aggregate(agate.Percentiles('a'))
+
+        results = self.stats(values).results(fractions=[0.25, 0.5, 0.75])
+
+        self.assertEqual(results['quantiles'], [
+            {'quantile': 0.25, 'value': percentiles[25]},
+            {'quantile': 0.5, 'value': percentiles[50]},
+            {'quantile': 0.75, 'value': percentiles[75]},
+        ])
+
+        results = self.stats(values, counts=False, sketch_size=200).results(fractions=[0.25, 0.5, 0.75])
+
+        self.assertEqual(results['median'], percentiles[50])
+        self.assertEqual(results['quantiles'][0], {'quantile': 0.25, 'value': percentiles[25]})
+
+    def test_quantile_sketch(self):
+        sketch = QuantileSketch()
+        other = QuantileSketch()
+        for i in range(20000):
+            sketch.add(i)
+            other.add(i + 20000)
+
+        self.assertEqual(sum(weight for value, weight in sketch.items()), 20000)
+        self.assertLess(sum(len(compactor) for compactor in sketch.compactors), 1000)
+        self.assertAlmostEqual(quantiles(sketch.items(), [0.5])[0], 10000, delta=20000 * 0.02)
+
+        sketch.update(other)
+
+        self.assertEqual(sum(weight for value, weight in sketch.items()), 40000)
+        self.assertAlmostEqual(quantiles(sketch.items(), [0.9])[0], 36000, delta=40000 * 0.02)
+
+    def test_update(self):
+        values = ['3', '1.50', '', '-2', '1.50', '10', 'true', '1 day', 'abc', '2020-01-01', '-0', '0']
+
+        for i in range(len(values) + 1):
+            for kwargs in ({}, {'counts': False, 'distinct': True, 'top': True, 'sketch_size': 200}):
+                with self.subTest(i=i, kwargs=kwargs):
+                    for j in range(len(values) + 1):
+                        expected = self.stats(values[:j], **kwargs)
+                        stats = self.stats(values[:i][:j], **kwargs)
+                        stats.update(self.stats(values[i:j], **kwargs))
+
+                        self.assertEqual(stats.data_type, expected.data_type)
+                        results = stats.results(fractions=[0.5])
+                        expected_results = expected.results(fractions=[0.5])
+                        if 'stdev' in results:
+                            self.assertAlmostEqual(results.pop('stdev'), expected_results.pop('stdev'))
+                        self.assertEqual(results, expected_results)
+
+    def test_space_saving_update(self):
+        top = SpaceSaving(capacity=3)
+        other = SpaceSaving(capacity=3)
+        for value in 'aabcd':
+            top.add(value)
+        for value in 'aeeb':
+            other.add(value)
+
+        top.update(other)
+        items = dict(top.items())
+
+        self.assertEqual(len(items), 3)
+        self.assertEqual(items['a'], (3, 0))
+        for value, (count, error) in items.items():
+            self.assertLessEqual(count - error, 'aabcdaeeb'.count(value))
+            self.assertGreaterEqual(count, 'aabcdaeeb'.count(value))
@@ -1,8 +1,13 @@
+import gzip
+import io
+import lzma
+import os
 import sys
+import tempfile
 from unittest.mock import patch
 
 from csvkit.utilities.csvcut import CSVCut, launch_new_instance
-from tests.utils import ColumnsTests, CSVKitTestCase, EmptyFileTests, NamesTests
+from tests.utils import ColumnsTests, CSVKitTestCase, EmptyFileTests, NamesTests, stdin_as_string
 
 
 class TestCSVCut(CSVKitTestCase, ColumnsTests, EmptyFileTests, NamesTests):
@@ -106,3 +111,90 @@ class TestCSVCut(CSVKitTestCase, ColumnsTests, EmptyFileTests, NamesTests):
     def test_null_byte(self):
         # Test that csvcut doesn't error on a null byte.
         self.get_output(['-C', '', 'examples/null_byte.csv'])
+
+    def test_output(self):
+        for suffix, func in (('.csv', open), ('.gz', gzip.open), ('.xz', lzma.open)):
+            with self.subTest(suffix=suffix):
+                fd, path = tempfile.mkstemp(suffix=suffix)
+                os.close(fd)
+                self.addCleanup(os.remove, path)
+
+                self.assertEqual(self.get_output(['-c', '1,3', '-o', path, '--compression-level', '1',
+                                                  'examples/dummy.csv']), '')
+                with func(path, 'rt') as f:
+                    self.assertEqual(f.read(), 'a,c\n1,3\n')
+
+    def test_invalid_compression_level(self):
+        fd, path = tempfile.mkstemp(suffix='.gz')
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+
+        self.assertError(launch_new_instance, ['-o', path, '--compression-level', '12'],
+                         '--compression-level 12 is invalid for .gz files.')
+
+    def test_gzip_stdin(self):
+        input_file = io.BytesIO(gzip.compress(b'a,b,c\n1,2,3\n'))
+
+        with stdin_as_string(input_file):
+            self.assertRows(['-c', '1,3'], [
+                ['a', 'c'],
+                ['1', '3'],
+            ])
+
+    def test_quoted_lines(self):
+        # Lines with quote characters are parsed, and other lines are split on the delimiter.
+        input_file = io.BytesIO(b'a,b,c\n1,2,3\n"x\ny",",",z\n4,,\n7\n')
+
+        with stdin_as_string(input_file):
+            self.assertLines(['-c', '2,1'], [
+                'b,a',
+                '2,1',
+                '",","x',
+                'y"',
+                ',4',
+                ',7',
+            ])
+
+    def test_tabs(self):
+        # Fields with commas are quoted in the output.
+        input_file = io.BytesIO(b'a\tb\n1,2\t3\n')
+
+        with stdin_as_string(input_file):
+            self.assertLines(['-t', '-c', '1'], [
+                'a',
+                '"1,2"',
+            ])
+
+    def test_single_empty_field(self):
+        input_file = io.BytesIO(b'a,b\n,1\n\n2,3\n')
+
+        with stdin_as_string(input_file):
+            self.assertLines(['-c', '1'], [
+                'a',
+                '""',
+                '""',
+                '2',
+            ])
+
+    def test_no_header_row_quoted_lines(self):
+        input_file = io.BytesIO(b'"1\n2",3\n4,5\n')
+
+        with stdin_as_string(input_file):
+            self.assertLines(['-H', '-c', '2'], [
+                'b',
+                '3',
+                '5',
+            ])
+
+    def test_many_quoted_lines(self):
+        input_file = io.BytesIO(b'a,b\n"1",2\n3,4\n"5\n6",7\n8,9\n')
+
+        with stdin_as_string(input_file), patch('csvkit.utilities.csvcut.PARSE_ALL_THRESHOLD', 1):
+            self.assertLines(['-c', '2,1'], [
+                'b,a',
+                '2,1',
+                '4,3',
+                '7,"5',
+                '6"',
+                '9,8',
+            ])
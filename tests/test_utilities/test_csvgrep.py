@@ -1,8 +1,11 @@
+import io
+import os
 import sys
+import tempfile
 from unittest.mock import patch
 
 from csvkit.utilities.csvgrep import CSVGrep, launch_new_instance
-from tests.utils import ColumnsTests, CSVKitTestCase, EmptyFileTests, NamesTests
+from tests.utils import ColumnsTests, CSVKitTestCase, EmptyFileTests, NamesTests, stdin_as_string
 
 
 class TestCSVGrep(CSVKitTestCase, ColumnsTests, EmptyFileTests, NamesTests):
@@ -17,7 +20,12 @@ class TestCSVGrep(CSVKitTestCase, ColumnsTests, EmptyFileTests, NamesTests):
     def test_options(self):
         for args, message in (
             ([], 'You must specify at least one column to search using the -c option.'),
-            (['-c', '1'], 'One of -r, -m or -f must be specified, unless using the -n option.'),
+            (['-c', '1'], 'One of -r, -m, -f, --match-any-substring-file, --gt, --lt, --between or --where must be '
+                          'specified, unless using the -n option.'),
+            (['-c', '1', '--where', 'a'],
+             '-c requires one of -r, -m, -f, --match-any-substring-file, --gt, --lt or --between.'),
+            (['--where', 'a +'], 'The expression "a +" is invalid: invalid syntax.'),
+            (['-c', '1', '-m', '1', '--jobs', '0'], '--jobs must be greater than 0.'),
         ):
             with self.subTest(args=args):
                 self.assertError(launch_new_instance, args, message)
@@ -85,6 +93,73 @@ class TestCSVGrep(CSVKitTestCase, ColumnsTests, EmptyFileTests, NamesTests):
             ['ILLINOIS', 'IL', '17', '15,659', '2,491', '2,025', '1,770', '19', '21,964', ''],
         ])
 
+    def test_match_any_substring_file(self):
+        self.assertRows(['-c', '1', '--match-any-substring-file', 'examples/test_substrings.txt',
+                         'examples/realdata/FY09_EDU_Recipients_by_State.csv'], [
+            ['State Name', 'State Abbreviate', 'Code', 'Montgomery GI Bill-Active Duty',
+                'Montgomery GI Bill- Selective Reserve', 'Dependents\' Educational Assistance',
+                'Reserve Educational Assistance Program', 'Post-Vietnam Era Veteran\'s Educational Assistance Program',
+                'TOTAL', ''],
+            ['ALABAMA', 'AL', '01', '6,718', '1,728', '2,703', '1,269', '8', '12,426', ''],
+            ['ALASKA', 'AK', '02', '776', '154', '166', '60', '2', '1,158', ''],
+            ['ILLINOIS', 'IL', '17', '15,659', '2,491', '2,025', '1,770', '19', '21,964', ''],
+        ])
+
+    def test_between(self):
+        self.assertRows(['-c', 'TOTAL', '--between', '1100', '1200', '--gt', '1150',
+                         'examples/realdata/FY09_EDU_Recipients_by_State.csv'], [
+            ['State Name', 'State Abbreviate', 'Code', 'Montgomery GI Bill-Active Duty',
+                'Montgomery GI Bill- Selective Reserve', 'Dependents\' Educational Assistance',
+                'Reserve Educational Assistance Program', 'Post-Vietnam Era Veteran\'s Educational Assistance Program',
+                'TOTAL', ''],
+            ['ALASKA', 'AK', '02', '776', '154', '166', '60', '2', '1,158', ''],
+            ['RHODE ISLAND', 'RI', '44', '555', '203', '226', '189', '2', '1,175', ''],
+        ])
+
+    def test_lt_invert_match(self):
+        self.assertLines(['-c', '2', '--lt', '3', '-i', 'examples/dummy3.csv'], [
+            'a,b,c',
+            '1,4,5',
+        ])
+
+    def test_where(self):
+        self.assertRows(['--where', 'TOTAL > 40000 and `1` != "TEXAS"',
+                         'examples/realdata/FY09_EDU_Recipients_by_State.csv'], [
+            ['State Name', 'State Abbreviate', 'Code', 'Montgomery GI Bill-Active Duty',
+                'Montgomery GI Bill- Selective Reserve', 'Dependents\' Educational Assistance',
+                'Reserve Educational Assistance Program', 'Post-Vietnam Era Veteran\'s Educational Assistance Program',
+                'TOTAL', ''],
+            ['CALIFORNIA', 'CA', '06', '34,942', '2,987', '7,017', '1,903', '48', '46,897', ''],
+        ])
+
+    def test_where_division_by_zero(self):
+        self.assertLines(['--where', 'a / 0 > 1 or b / 0 < 1', 'examples/dummy.csv'], [
+            'a,b,c',
+        ])
+        self.assertLines(['--where', 'a / (b - 2) > 1 or c == 3', 'examples/dummy.csv'], [
+            'a,b,c',
+            '1,2,3',
+        ])
+
+    def test_where_with_pattern(self):
+        self.assertRows(['--where', '`State Abbreviate`.startswith("N")', '-c', '1', '-m', 'NEW', '-l',
+                         'examples/realdata/FY09_EDU_Recipients_by_State.csv'], [
+            ['line_numbers', 'State Name', 'State Abbreviate', 'Code', 'Montgomery GI Bill-Active Duty',
+                'Montgomery GI Bill- Selective Reserve', 'Dependents\' Educational Assistance',
+                'Reserve Educational Assistance Program', 'Post-Vietnam Era Veteran\'s Educational Assistance Program',
+                'TOTAL', ''],
+            ['30', 'NEW HAMPSHIRE', 'NH', '33', '706', '231', '263', '124', '2', '1,326', ''],
+            ['31', 'NEW JERSEY', 'NJ', '34', '3,473', '754', '833', '443', '8', '5,511', ''],
+            ['32', 'NEW MEXICO', 'NM', '35', '2,623', '415', '1,304', '205', '4', '4,551', ''],
+            ['33', 'NEW YORK', 'NY', '36', '8,795', '1,695', '2,319', '1,136', '22', '13,967', ''],
+        ])
+
+    def test_where_invert_match(self):
+        self.assertRows(['--where', 'b < 2 or c == "x"', '-i', 'examples/dummy.csv'], [
+            ['a', 'b', 'c'],
+            ['1', '2', '3'],
+        ])
+
     def test_match_with_line_numbers(self):
         self.assertRows(['-c', '1', '-m', 'ILLINOIS', '--linenumbers',
                          'examples/realdata/FY09_EDU_Recipients_by_State.csv'], [
@@ -100,3 +175,87 @@ class TestCSVGrep(CSVKitTestCase, ColumnsTests, EmptyFileTests, NamesTests):
             ['line_numbers', 'a', 'b', 'c'],
             ['1', '1', '2', '3'],
         ])
+
+    def test_prefilter_quoted_newlines(self):
+        fd, path = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(fd, 'w', newline='') as f:
+            f.write('a,b\n1,"x\nfoo"\nfoo,"y\nz"\n2,"foo\nbar"\n')
+
+        try:
+            self.assertRows(['-c', 'a', '-m', 'foo', '--linenumbers', path], [
+                ['line_numbers', 'a', 'b'],
+                ['4', 'foo', 'y\nz'],
+            ])
+            self.assertRows(['-c', 'b', '-r', '^foo', '--linenumbers', path], [
+                ['line_numbers', 'a', 'b'],
+                ['6', '2', 'foo\nbar'],
+            ])
+        finally:
+            os.remove(path)
+
+    @patch('csvkit.cli.JOBS_MIN_INPUT_SIZE', 0)
+    @patch('os.cpu_count', return_value=4)
+    def test_jobs(self, cpu_count):
+        for args in (
+            ['-c', '1', '-r', '^[AN]', 'examples/realdata/FY09_EDU_Recipients_by_State.csv'],
+            ['-c', '1,2', '-r', '^[AN]', '-a', '-i', 'examples/realdata/FY09_EDU_Recipients_by_State.csv'],
+            ['-c', '1', '-r', '^[AN]', '--linenumbers', 'examples/realdata/FY09_EDU_Recipients_by_State.csv'],
+            ['-c', '2', '-r', '^[AN]', '--linenumbers', '-H', 'examples/realdata/FY09_EDU_Recipients_by_State.csv'],
+            ['-c', '1', '-f', 'examples/test_geo.csv', 'examples/test_geo.csv'],
+            ['-c', '1', '--match-any-substring-file', 'examples/test_substrings.txt',
+             'examples/realdata/FY09_EDU_Recipients_by_State.csv'],
+            ['--skip-lines', '3', '-c', '1', '-m', '1', '--linenumbers', 'examples/test_skip_lines.csv'],
+            ['--where', 'TOTAL > 10000', '-i', 'examples/realdata/FY09_EDU_Recipients_by_State.csv'],
+        ):
+            with self.subTest(args=args):
+                self.assertEqual(self.get_output(['--jobs', '3', *args]), self.get_output(args))
+
+    @patch('csvkit.cli.JOBS_MIN_INPUT_SIZE', 0)
+    @patch('os.cpu_count', return_value=4)
+    def test_jobs_quoted_newlines(self, cpu_count):
+        fd, path = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(fd, 'w', newline='') as f:
+            f.write('a,b\r\n')
+            for i in range(20):
+                f.write('%d,"x\r\ny%d"\r\n' % (i, i))
+
+        try:
+            args = ['-c', 'b', '-r', '[02468]$', '--linenumbers', path]
+            output = self.get_output(args)
+            self.assertEqual(output.splitlines()[1:3], ['2,0,"x', 'y0"'])
+            self.assertEqual(self.get_output(['--jobs', '4', *args]), output)
+        finally:
+            os.remove(path)
+
+    @patch('csvkit.cli.JOBS_MIN_INPUT_SIZE', 0)
+    @patch('os.cpu_count', return_value=4)
+    def test_jobs_unordered(self, cpu_count):
+        args = ['-c', '1', '-r', '^[AN]', 'examples/realdata/FY09_EDU_Recipients_by_State.csv']
+        output = self.get_output(['--jobs', '3', '--unordered', *args]).splitlines()
+        expected = self.get_output(args).splitlines()
+
+        self.assertEqual(output[0], expected[0])
+        self.assertEqual(sorted(output[1:]), sorted(expected[1:]))
+
+    def test_jobs_serial(self):
+        args = ['--jobs', '3', '-c', '1', '-r', '^[AN]', 'examples/realdata/FY09_EDU_Recipients_by_State.csv']
+        output = self.get_output(args[2:])
+
+        for cpu_count, min_input_size in ((1, 0), (4, 1 << 20)):
+            with self.subTest(cpu_count=cpu_count, min_input_size=min_input_size), \
+                    patch('os.cpu_count', return_value=cpu_count), \
+                    patch('csvkit.cli.JOBS_MIN_INPUT_SIZE', min_input_size), \
+                    patch('csvkit.utilities.csvgrep.process_map') as process_map:
+                self.assertEqual(self.get_output(args), output)
+                process_map.assert_not_called()
+
+    def test_jobs_stdin(self):
+        input_file = io.BytesIO(b'a,b\n1,2\n3,4\n')
+
+        with stdin_as_string(input_file):
+            self.assertRows(['--jobs', '2', '-c', 'b', '-m', '4'], [
+                ['a', 'b'],
+                ['3', '4'],
+            ])
+
+        input_file.close()
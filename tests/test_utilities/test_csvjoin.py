@@ -1,8 +1,10 @@
+import io
 import os
 import sys
 import unittest
 from unittest.mock import patch
 
+from csvkit.exceptions import UnsortedInputError
 from csvkit.utilities.csvjoin import CSVJoin, launch_new_instance
 from tests.utils import CSVKitTestCase, EmptyFileTests
 
@@ -104,6 +106,53 @@ class TestCSVJoin(CSVKitTestCase, EmptyFileTests):
             ['3', 'b', 'c', '', '', '', '', ''],
         ])
 
+    def test_stream(self):
+        for args in (
+            ['examples/join_a.csv', 'examples/join_b.csv'],
+            ['-c', 'a', '--left', 'examples/join_a.csv', 'examples/join_b.csv'],
+            ['-c', 'a', '--right', 'examples/join_a.csv', 'examples/join_b.csv'],
+            ['-c', 'a', '--outer', 'examples/join_a.csv', 'examples/join_b.csv'],
+            ['-c', 'a', '--outer', 'examples/join_a.csv', 'examples/join_b.csv', 'examples/join_short.csv'],
+            ['-c', 'a', 'examples/join_a.csv', 'examples/join_b.csv', 'examples/join_short.csv'],
+            ['-c', 'a', 'examples/join_a_short.csv', 'examples/join_b.csv'],
+            ['--no-inference', 'examples/join_a.csv', 'examples/join_short.csv'],
+            ['examples/join_a.csv', 'examples/sniff_limit.csv'],
+            ['examples/dummy.csv'],
+        ):
+            with self.subTest(args=args):
+                self.assertEqual(self.get_output(['--stream'] + args), self.get_output(args))
+
+    def test_stream_inner_larger_second_file(self):
+        # The second file is larger, so it is streamed, and the rows are in its order.
+        self.assertRows(['--stream', '-c', 'a', 'examples/join_short.csv', 'examples/join_a.csv'], [
+            ['a', 'b', 'c', 'b2', 'c2', 'b2_2', 'c2_2'],
+            ['True', 'b', '', 'b', 'c', 'b', 'c'],
+            ['True', 'b', '', 'b', 'c', 'b', 'c'],
+        ])
+
+    def test_presorted(self):
+        for args in (
+            ['-c', 'a', 'examples/join_a.csv', 'examples/join_b.csv'],
+            ['-c', 'a', '--left', 'examples/join_a.csv', 'examples/join_b.csv'],
+            ['-c', 'a', '--right', 'examples/join_a.csv', 'examples/join_b.csv'],
+            ['-c', 'a', '--outer', 'examples/join_a.csv', 'examples/join_b.csv'],
+            ['-c', 'a', '--outer', 'examples/join_a.csv', 'examples/join_b.csv', 'examples/join_a.csv'],
+            ['-c', 'a', 'examples/join_a_short.csv', 'examples/join_b.csv'],
+            ['examples/join_a.csv', 'examples/join_b.csv'],
+        ):
+            with self.subTest(args=args):
+                self.assertEqual(self.get_output(['--presorted'] + args), self.get_output(args))
+
+    def test_presorted_unsorted(self):
+        output_file = io.StringIO()
+        args = ['--presorted', '-c', 'a', 'examples/test_ignore_case.csv', 'examples/join_a.csv']
+        utility = CSVJoin(args, output_file)
+
+        with self.assertRaises(UnsortedInputError):
+            utility.run()
+
+        output_file.close()
+
     def test_sniff_limit_no_limit(self):
         self.assertRows(['examples/join_a.csv', 'examples/sniff_limit.csv'], [
             ['a', 'b', 'c', 'a2', 'b2', 'c2'],
@@ -13,6 +13,18 @@ class TestCSVSort(CSVKitTestCase, ColumnsTests, EmptyFileTests, NamesTests):
         with patch.object(sys, 'argv', [self.Utility.__name__.lower(), 'examples/dummy.csv']):
             launch_new_instance()
 
+    def test_options(self):
+        self.assertError(
+            launch_new_instance,
+            ['--external', '--buffer-size', '0'],
+            '--buffer-size must be greater than 0.',
+        )
+        self.assertError(
+            launch_new_instance,
+            ['--infer-rows', '0'],
+            '--infer-rows must be greater than 0.',
+        )
+
     def test_runs(self):
         self.assertRows(['examples/test_utf8.csv'], [
             ['foo', 'bar', 'baz'],
@@ -81,12 +93,65 @@ class TestCSVSort(CSVKitTestCase, ColumnsTests, EmptyFileTests, NamesTests):
         new_order = [str(r[0]) for r in reader]
         self.assertEqual(test_order, new_order)
 
+    def test_infer_rows(self):
+        for args in (['--infer-sample', 'random'], ['--external'], []):
+            with self.subTest(args=args):
+                args += ['--infer-rows', '1', '-c', '2', 'examples/sort_ints_nulls.csv']
+                reader = self.get_output_as_reader(args)
+                self.assertEqual([r[1] for r in reader], ['b', '1', '2', ''])
+
+        input_file = io.BytesIO(b'a\n3\n20\nx\n')
+
+        with stdin_as_string(input_file):
+            self.assertLines(['--infer-rows', '2'], [
+                'a',
+                '20',
+                '3',
+                'x',
+            ])
+
+        input_file.close()
+
     def test_sort_t_and_nulls(self):
         reader = self.get_output_as_reader(['-c', '2', 'examples/sort_ints_nulls.csv'])
         test_order = ['b', '1', '2', '']
         new_order = [str(r[1]) for r in reader]
         self.assertEqual(test_order, new_order)
 
+    def test_external(self):
+        for args in (
+            ['-c', '1', 'examples/testxls_converted.csv'],
+            ['-c', '2', '-r', 'examples/testxls_converted.csv'],
+            ['-c', '2', 'examples/sort_ints_nulls.csv'],
+            ['-c', '2', '-r', 'examples/sort_ints_nulls.csv'],
+            ['-i', 'examples/test_ignore_case.csv'],
+            ['--no-inference', '-c', '1', 'examples/test_literal_order.csv'],
+            ['--no-header-row', 'examples/no_header_row.csv'],
+        ):
+            with self.subTest(args=args):
+                expected = self.get_output(args)
+                for buffer_size in ('1', '2', '100'):
+                    self.assertEqual(self.get_output(['--external', '--buffer-size', buffer_size] + args), expected)
+
+    def test_external_merge_passes(self):
+        with patch('csvkit.utilities.csvsort.MERGE_FAN_IN', 2):
+            self.assertEqual(
+                self.get_output(['--external', '--buffer-size', '1', '-c', '2', 'examples/testxls_converted.csv']),
+                self.get_output(['-c', '2', 'examples/testxls_converted.csv']),
+            )
+
+    def test_external_stdin(self):
+        input_file = io.BytesIO(b'a,b,c\n4,5,6\n1,2,3\n')
+
+        with stdin_as_string(input_file):
+            self.assertLines(['--external', '--buffer-size', '1'], [
+                'a,b,c',
+                '1,2,3',
+                '4,5,6',
+            ])
+
+        input_file.close()
+
     def test_stdin(self):
         input_file = io.BytesIO(b'a,b,c\n4,5,6\n1,2,3\n')
 
@@ -1,3 +1,4 @@
+import io
 import json
 import sys
 from unittest.mock import patch
@@ -5,7 +6,7 @@ from unittest.mock import patch
 import agate
 
 from csvkit.utilities.csvstat import CSVStat, launch_new_instance
-from tests.utils import ColumnsTests, CSVKitTestCase, EmptyFileTests, NamesTests
+from tests.utils import ColumnsTests, CSVKitTestCase, EmptyFileTests, NamesTests, stdin_as_string
 
 
 class TestCSVStat(CSVKitTestCase, ColumnsTests, EmptyFileTests, NamesTests):
@@ -22,6 +23,23 @@ class TestCSVStat(CSVKitTestCase, ColumnsTests, EmptyFileTests, NamesTests):
             'Only one operation argument may be specified (--mean, --median, etc).',
         )
 
+    def test_quantiles_options(self):
+        for value in ('', '2', '0.5,a'):
+            with self.subTest(value=value):
+                self.assertError(
+                    launch_new_instance,
+                    ['--quantiles', value],
+                    '--quantiles must be a comma-separated list of numbers from 0 to 1.',
+                )
+
+        self.assertError(
+            launch_new_instance,
+            ['--median', '--quantiles', '0.5'],
+            'Only one operation argument may be specified (--mean, --median, etc).',
+        )
+        self.assertError(launch_new_instance, ['--sketch-size', '0'], '--sketch-size must be greater than 0.')
+        self.assertError(launch_new_instance, ['--jobs', '0'], '--jobs must be greater than 0.')
+
     def test_format_options(self):
         for option in ('csv', 'json', 'count'):
             with self.subTest(option=option):
@@ -169,3 +187,110 @@ class TestCSVStat(CSVKitTestCase, ColumnsTests, EmptyFileTests, NamesTests):
         ])
 
         self.assertEqual(output, '9,748.35\n')
+
+    def test_stream(self):
+        for args in (
+            ['examples/realdata/ks_1033_data.csv'],
+            ['--csv', 'examples/realdata/ks_1033_data.csv'],
+            ['--json', 'examples/realdata/ks_1033_data.csv'],
+            ['-c', '2', 'examples/testxls_converted.csv'],
+            ['--no-header-row', 'examples/no_header_row.csv'],
+            ['--no-inference', 'examples/dummy.csv'],
+            ['examples/test_empty_columns.csv'],
+        ):
+            with self.subTest(args=args):
+                self.assertEqual(self.get_output(['--stream', *args]), self.get_output(args))
+
+    def test_stream_operations(self):
+        for option in ('type', 'nulls', 'non-nulls', 'unique', 'min', 'max', 'sum', 'mean', 'median', 'stdev',
+                       'len', 'max-precision', 'freq'):
+            with self.subTest(option=option):
+                args = [f'--{option}', 'examples/realdata/FY09_EDU_Recipients_by_State.csv']
+                self.assertEqual(self.get_output(['--stream', *args]), self.get_output(args))
+
+    def test_approx(self):
+        output = self.get_output(['--approx', '--json', 'examples/realdata/ks_1033_data.csv'])
+        data = json.loads(output)
+        expected = json.loads(self.get_output(['--json', 'examples/realdata/ks_1033_data.csv']))
+
+        for row, expected_row in zip(data, expected):
+            self.assertAlmostEqual(
+                row['unique'], expected_row['unique'], delta=max(1, 3 * row['unique_error'] * expected_row['unique'])
+            )
+            self.assertEqual(row['freq'], expected_row['freq'])
+            self.assertEqual(row['freq_error'], 0)
+            if 'median' in expected_row:
+                self.assertAlmostEqual(row['median'], expected_row['median'], delta=0.05 * expected_row['median'])
+
+    def test_approx_csv(self):
+        reader = agate.csv.reader(self.get_output_as_io(['--approx', '--csv', 'examples/realdata/ks_1033_data.csv']))
+        header = next(reader)
+
+        self.assertEqual(header[-2:], ['unique_error', 'freq_error'])
+
+    def test_quantiles(self):
+        args = ['-c', 'TOTAL', '--quantiles', '0,0.5,0.9,1', 'examples/realdata/FY09_EDU_Recipients_by_State.csv']
+
+        self.assertEqual(self.get_output(args), '{ "0": 768, "0.5": 6520, "0.9": 20541, "1": 46897 }\n')
+        self.assertEqual(self.get_output(['--stream', *args]), self.get_output(args))
+
+    def test_quantiles_text(self):
+        output = self.get_output([
+            '-c', '1', '--quantiles', '0.5', 'examples/realdata/FY09_EDU_Recipients_by_State.csv',
+        ])
+
+        self.assertEqual(output, 'None\n')
+
+    def test_approx_quantiles(self):
+        args = ['-c', 'TOTAL', '--approx', 'examples/realdata/FY09_EDU_Recipients_by_State.csv']
+
+        # The sketch holds all the values of a small file.
+        self.assertEqual(self.get_output([*args, '--median']), '6520\n')
+        self.assertEqual(self.get_output([*args, '--quantiles', '0,1']), '{ "0": 768, "1": 46897 }\n')
+
+        output = self.get_output([*args, '--median', '--sketch-size', '8'])
+
+        with open('examples/realdata/FY09_EDU_Recipients_by_State.csv') as f:
+            values = sorted(int(row['TOTAL'].replace(',', '')) for row in agate.csv.DictReader(f) if row['TOTAL'])
+        median = int(output.replace(',', ''))
+
+        # The 52 values' median is between the 26th and 27th values. Compacting a level moves a value's rank by at
+        # most the level's weight. The sketch compacts level 0 (weight 1) four times and level 1 (weight 2) twice,
+        # so the estimate's rank is off by at most 4 * 1 + 2 * 2 = 8.
+        self.assertEqual(len(values), 52)
+        self.assertIn(median, values)
+        self.assertGreaterEqual(values.index(median) + 1, 26 - 8)
+        self.assertLessEqual(values.index(median) + 1, 27 + 8)
+
+    @patch('csvkit.cli.JOBS_MIN_INPUT_SIZE', 0)
+    @patch('os.cpu_count', return_value=4)
+    def test_jobs(self, cpu_count):
+        for args in (
+            ['examples/realdata/ks_1033_data.csv'],
+            ['--csv', 'examples/test_geo.csv'],
+            ['--json', '--approx', '-c', '1,2', 'examples/realdata/ks_1033_data.csv'],
+            ['--skip-lines', '3', 'examples/test_skip_lines.csv'],
+            ['--no-header-row', 'examples/no_header_row.csv'],
+            ['--freq', 'examples/realdata/FY09_EDU_Recipients_by_State.csv'],
+        ):
+            with self.subTest(args=args):
+                self.assertEqual(self.get_output(['--jobs', '3', *args]), self.get_output(args))
+
+    def test_jobs_serial(self):
+        args = ['--jobs', '3', '--non-nulls', '-c', 'county', 'examples/realdata/ks_1033_data.csv']
+
+        for cpu_count, min_input_size in ((1, 0), (4, 1 << 20)):
+            with self.subTest(cpu_count=cpu_count, min_input_size=min_input_size), \
+                    patch('os.cpu_count', return_value=cpu_count), \
+                    patch('csvkit.cli.JOBS_MIN_INPUT_SIZE', min_input_size), \
+                    patch('csvkit.utilities.csvstat.process_map') as process_map:
+                self.assertEqual(self.get_output(args), '1575\n')
+                process_map.assert_not_called()
+
+    def test_jobs_stdin(self):
+        input_file = io.BytesIO(b'a,b\n1,2\n3,4\n')
+
+        with stdin_as_string(input_file):
+            self.assertEqual(self.get_output(['--jobs', '2', '--sum', '-c', 'b']), '6\n')
+
+        input_file.close()